@@ -0,0 +1,39 @@
+def normalize_barcode(barcode: str | None) -> str | None:
+    if not barcode:
+        return None
+    cleaned = "".join(ch for ch in barcode if ch.isdigit())
+    if not cleaned:
+        return None
+    gtin_from_gs1 = extract_gtin_from_gs1(cleaned)
+    if gtin_from_gs1:
+        cleaned = gtin_from_gs1
+
+    # Normalize UPC/EAN variants so the same product maps to one key.
+    if len(cleaned) == 14 and cleaned.startswith("0"):
+        cleaned = cleaned[1:]
+    if len(cleaned) == 13 and cleaned.startswith("0"):
+        return cleaned[1:]
+    if len(cleaned) == 12:
+        return cleaned
+    return cleaned
+
+
+def extract_gtin_from_gs1(digits: str) -> str | None:
+    marker = "01"
+    marker_index = digits.find(marker)
+    if marker_index == -1:
+        return None
+    start = marker_index + len(marker)
+    end = start + 14
+    if len(digits) < end:
+        return None
+    return digits[start:end]
+
+
+def is_valid_gtin(code: str) -> bool:
+    # GTIN-8/12/13/14: the last digit is a mod-10 check, weighting the others 3, 1, 3, ... from the right.
+    if len(code) not in (8, 12, 13, 14) or not code.isdigit():
+        return False
+    body = code[:-1]
+    total = sum(int(digit) * (3 if index % 2 == 0 else 1) for index, digit in enumerate(reversed(body)))
+    return (10 - total % 10) % 10 == int(code[-1])
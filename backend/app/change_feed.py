@@ -0,0 +1,55 @@
+import asyncio
+import threading
+from contextlib import contextmanager
+
+
+class ChangeSubscription:
+    def __init__(self, loop: asyncio.AbstractEventLoop) -> None:
+        self.loop = loop
+        self.event = asyncio.Event()
+
+    async def wait(self, timeout: float) -> bool:
+        try:
+            await asyncio.wait_for(self.event.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            self.event.clear()
+
+
+# Wakes this process's change streams when a change-log write commits. Writers run on threadpool
+# threads, so the wake-up is handed to each subscriber's event loop. Changes committed by other
+# workers are picked up by the streams' periodic poll instead.
+class ChangeFeed:
+    def __init__(self) -> None:
+        self._subscriptions: set[ChangeSubscription] = set()
+        self._lock = threading.Lock()
+
+    def notify(self) -> None:
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.event.set)
+            except RuntimeError:
+                # The subscriber's loop is already closed.
+                pass
+
+    @contextmanager
+    def subscribe(self):
+        subscription = ChangeSubscription(asyncio.get_running_loop())
+        with self._lock:
+            self._subscriptions.add(subscription)
+        try:
+            yield subscription
+        finally:
+            with self._lock:
+                self._subscriptions.discard(subscription)
+
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return len(self._subscriptions)
+
+
+change_feed = ChangeFeed()
@@ -0,0 +1,89 @@
+import threading
+import time
+from typing import Callable
+
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+# Remembers that a dependency is failing. After `failure_threshold` consecutive failures the
+# circuit opens and callers are turned away without trying; once `reset_seconds` have passed it
+# goes half-open and lets a single probe through. A successful probe closes the circuit again,
+# a failed one re-opens it for another `reset_seconds`.
+class CircuitBreaker:
+    def __init__(
+        self,
+        failure_threshold: int,
+        reset_seconds: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_seconds = reset_seconds
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._counters = {"successes": 0, "failures": 0, "rejected": 0, "opened": 0}
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def allow(self) -> bool:
+        with self._lock:
+            state = self._current_state()
+            if state == CLOSED:
+                return True
+            if state == HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            self._counters["rejected"] += 1
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._counters["successes"] += 1
+            self._state = CLOSED
+            self._failures = 0
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._counters["failures"] += 1
+            self._failures += 1
+            if self._probing or self._failures >= self.failure_threshold:
+                if self._state != OPEN or self._probing:
+                    self._counters["opened"] += 1
+                self._state = OPEN
+                self._opened_at = self.clock()
+            self._probing = False
+
+    def release(self) -> None:
+        # A call that ended without a verdict (cancelled) gives its probe slot back.
+        with self._lock:
+            self._probing = False
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            state = self._current_state()
+            retry_in = None
+            if state == OPEN:
+                retry_in = round(max(0.0, self._opened_at + self.reset_seconds - self.clock()), 3)
+            return {
+                "state": state,
+                "consecutive_failures": self._failures,
+                "failure_threshold": self.failure_threshold,
+                "reset_seconds": self.reset_seconds,
+                "retry_in_seconds": retry_in,
+                **self._counters,
+            }
+
+    def _current_state(self) -> str:
+        if self._state == OPEN and self.clock() - self._opened_at >= self.reset_seconds:
+            return HALF_OPEN
+        return self._state
@@ -0,0 +1,157 @@
+import argparse
+import gzip
+import sys
+
+from app.core.database import ReadSessionLocal, SessionLocal, engine
+from app.core.migrations import LATEST_VERSION, MIGRATIONS, current_version, migrate
+from app.product_lookup import local_product_names
+from app.scan_log import ScanLogImport, read_lines
+from app.schemas.catalog import CatalogImportSummary
+from app.services.backup_service import BackupService
+from app.services.catalog_service import CatalogService
+from app.services.inventory_service import InventoryService
+
+
+def run_migrations(args: argparse.Namespace) -> None:
+    with engine.connect() as connection:
+        version = current_version(connection)
+    if args.status:
+        print(f"Schema version {version} of {LATEST_VERSION}.")
+        for migration in MIGRATIONS:
+            marker = "x" if migration.version <= version else " "
+            print(f"  [{marker}] {migration.version:04d} {migration.name}")
+        return
+
+    applied = migrate(engine, target=args.target)
+    for migration in applied:
+        print(f"Applied {migration.version:04d} {migration.name}")
+    if not applied:
+        print(f"Schema already at version {version}.")
+
+
+def catalog_import(args: argparse.Namespace) -> None:
+    migrate(engine)
+
+    def report(summary: CatalogImportSummary) -> None:
+        rate = summary.records_processed / summary.elapsed_seconds if summary.elapsed_seconds else 0
+        print(
+            f"{summary.records_processed} records, {summary.products_upserted} products, "
+            f"{summary.errors} errors ({rate:.0f} records/s)",
+            flush=True,
+        )
+
+    summary = CatalogService().import_dump(
+        SessionLocal,
+        args.path,
+        batch_size=args.batch_size,
+        restart=args.restart,
+        progress=report,
+    )
+    if summary.completed and summary.resumed_from == summary.records_processed:
+        print("Already imported; nothing to do. Use --restart to import again.")
+        return
+    if summary.resumed_from:
+        print(f"Resumed after record {summary.resumed_from}.")
+    print("Import complete." if summary.completed else "Import incomplete.")
+
+
+def scan_import(args: argparse.Namespace) -> None:
+    migrate(engine)
+    service = InventoryService()
+    scan = ScanLogImport(chunk_size=args.chunk_size, max_errors=args.max_errors)
+
+    def apply(chunk: dict[str, int]) -> None:
+        names = local_product_names(list(chunk))
+        with SessionLocal() as db:
+            scan.applied(*service.import_scans(db, chunk, names))
+        summary = scan.summary()
+        rate = summary.lines / summary.elapsed_seconds if summary.elapsed_seconds else 0
+        print(
+            f"{summary.lines} lines, {summary.scans} scans, {summary.created} created, "
+            f"{summary.merged} merged, {summary.errors} errors ({rate:.0f} lines/s)",
+            flush=True,
+        )
+
+    for line in read_lines(args.path):
+        chunk = scan.feed(line)
+        if chunk:
+            apply(chunk)
+    if scan.pending:
+        apply(scan.take())
+
+    summary = scan.summary()
+    for error in summary.error_lines:
+        print(f"  line {error.line}: {error.error} {error.value or ''}".rstrip())
+    if summary.errors > len(summary.error_lines):
+        print(f"  ... and {summary.errors - len(summary.error_lines)} more errors")
+    print(f"Import complete: {summary.scans} scans in {summary.chunks} chunks, {summary.errors} errors.")
+
+
+def export_data(args: argparse.Namespace) -> None:
+    chunks = BackupService().export(ReadSessionLocal, args.entity, args.format)
+    if args.output in (None, "-"):
+        for chunk in chunks:
+            sys.stdout.buffer.write(chunk)
+        sys.stdout.buffer.flush()
+        return
+    opener = gzip.open if args.output.endswith(".gz") else open
+    with opener(args.output, "wb") as handle:
+        for chunk in chunks:
+            handle.write(chunk)
+
+
+def restore_data(args: argparse.Namespace) -> None:
+    migrate(engine)
+    opener = gzip.open if args.path.endswith(".gz") else open
+    with opener(args.path, "rt", encoding="utf-8", errors="replace", newline="") as handle, SessionLocal() as db:
+        summary = BackupService().restore(db, args.entity, handle, replace=args.replace)
+    for error in summary.error_lines:
+        print(f"  line {error.line}: {error.error}")
+    if summary.errors > len(summary.error_lines):
+        print(f"  ... and {summary.errors - len(summary.error_lines)} more errors")
+    print(
+        f"Restored {summary.restored} of {summary.rows} rows"
+        + (f" after deleting {summary.deleted}" if summary.replaced else "")
+        + f", {summary.errors} errors ({summary.elapsed_seconds:.1f}s)."
+    )
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.cli")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    migrator = commands.add_parser("migrate", help="Apply pending schema migrations.")
+    migrator.add_argument("--target", type=int, default=None, help="Stop after this version.")
+    migrator.add_argument("--status", action="store_true", help="Show applied and pending migrations.")
+    migrator.set_defaults(handler=run_migrations)
+
+    importer = commands.add_parser("catalog-import", help="Import an OpenFoodFacts JSONL/CSV dump (optionally .gz).")
+    importer.add_argument("path")
+    importer.add_argument("--batch-size", type=int, default=500)
+    importer.add_argument("--restart", action="store_true", help="Ignore saved progress and start from the top.")
+    importer.set_defaults(handler=catalog_import)
+
+    scanner = commands.add_parser("scan-import", help="Add a barcode scanner log (text, CSV or NDJSON, optionally .gz) to the inventory.")
+    scanner.add_argument("path")
+    scanner.add_argument("--chunk-size", type=int, default=500, help="Distinct codes per transaction.")
+    scanner.add_argument("--max-errors", type=int, default=100, help="Line errors to list in the summary.")
+    scanner.set_defaults(handler=scan_import)
+
+    exporter = commands.add_parser("export", help="Stream inventory or shopping list rows as NDJSON or CSV.")
+    exporter.add_argument("entity", choices=["inventory", "shopping-list"])
+    exporter.add_argument("--format", choices=["ndjson", "csv"], default="ndjson")
+    exporter.add_argument("--output", "-o", default=None, help="File to write (.gz compresses); stdout by default.")
+    exporter.set_defaults(handler=export_data)
+
+    restorer = commands.add_parser("restore", help="Load an export back in, in one transaction.")
+    restorer.add_argument("entity", choices=["inventory", "shopping-list"])
+    restorer.add_argument("path")
+    restorer.add_argument("--replace", action="store_true", help="Delete the existing rows first.")
+    restorer.set_defaults(handler=restore_data)
+
+    args = parser.parse_args(argv)
+    args.handler(args)
+
+
+if __name__ == "__main__":
+    main()
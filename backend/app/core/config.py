@@ -7,8 +7,55 @@ from pydantic_settings import BaseSettings, SettingsConfigDict
 
 class Settings(BaseSettings):
     database_url: str = "sqlite:///./pantry.db"
+    sync_database_url: str | None = None
+    database_pool_size: int = 10
+    database_max_overflow: int = 20
+    sqlite_profile: str = "default"
+    sqlite_mmap_size: int = 256 * 1024 * 1024
+    sqlite_cache_size_kib: int = 64 * 1024
+    sqlite_busy_timeout_ms: int = 5000
+    sqlite_read_pool_size: int = 8
+    sqlite_write_queue: bool = False
+    sqlite_write_batch_size: int = 64
+    sqlite_write_batch_wait_ms: float = 2.0
     household_id: str = "00000000-0000-0000-0000-000000000001"
     cors_origins: list[str] = ["*"]
+    migrate_on_startup: bool = False
+    check_schema_on_startup: bool = True
+    openfoodfacts_base_url: str = "https://world.openfoodfacts.org"
+    openfoodfacts_timeout_seconds: float = 5.0
+    openfoodfacts_max_connections: int = 20
+    openfoodfacts_breaker_failure_threshold: int = 5
+    openfoodfacts_breaker_reset_seconds: float = 30.0
+    product_lookup_budget_seconds: float = 1.5
+    product_lookup_batch_max_size: int = 100
+    product_lookup_batch_concurrency: int = 8
+    product_lookup_batch_timeout_seconds: float = 8.0
+    catalog_enabled: bool = True
+    list_cache_size: int = 256
+    list_cache_shared: bool = False
+    change_log_retention_days: int = 30
+    change_stream_poll_seconds: float = 2.0
+    sync_max_operations: int = 500
+    sync_op_retention_days: int = 14
+    scan_import_chunk_size: int = 500
+    scan_import_max_errors: int = 100
+    backup_batch_size: int = 1000
+    search_product_refresh_seconds: float = 60.0
+    metrics_enabled: bool = True
+    metrics_slow_query_ms: float = 200.0
+    metrics_latency_buckets: list[float] = []
+    product_cache_size: int = 2048
+    product_cache_max_rows: int = 50000
+    product_cache_ttl_seconds: int = 60 * 60 * 24 * 30
+    product_cache_negative_ttl_seconds: int = 60 * 60 * 6
+    product_cache_stale_seconds: int = 60 * 60 * 24 * 7
+    product_image_cache_dir: str = "./product-images"
+    product_image_cache_max_bytes: int = 256 * 1024 * 1024
+    product_image_size: int = 256
+    product_image_max_source_bytes: int = 10 * 1024 * 1024
+    product_image_max_age_seconds: int = 60 * 60 * 24 * 7
+    product_image_hosts: list[str] = ["openfoodfacts.org", "openfoodfacts.net"]
 
     model_config = SettingsConfigDict(env_file=".env", extra="ignore")
 
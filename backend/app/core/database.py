@@ -1,11 +1,27 @@
+import asyncio
+import os
+from typing import Any, Callable, TypeVar
+
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session, sessionmaker
+from starlette.concurrency import run_in_threadpool
 
 from app.core.config import get_settings
+from app.core.sqlite import SQLiteWriteQueue, apply_sqlite_pragmas
 
 
 settings = get_settings()
 
+T = TypeVar("T")
+
+# Async driver -> the sync driver used for migrations, CLI tools and the threadpool-bound helpers.
+SYNC_DRIVERS = {
+    "sqlite+aiosqlite": "sqlite",
+    "postgresql+asyncpg": "postgresql+psycopg",
+    "postgresql+psycopg_async": "postgresql+psycopg",
+}
+
 
 def _sqlite_connect_args(database_url: str) -> dict:
     if database_url.startswith("sqlite"):
@@ -13,13 +29,97 @@ def _sqlite_connect_args(database_url: str) -> dict:
     return {}
 
 
+def _is_async_url(database_url: str) -> bool:
+    return make_url(database_url).drivername in SYNC_DRIVERS
+
+
+def _sync_url(database_url: str) -> str:
+    if settings.sync_database_url:
+        return settings.sync_database_url
+    url = make_url(database_url)
+    if url.drivername in SYNC_DRIVERS:
+        url = url.set(drivername=SYNC_DRIVERS[url.drivername])
+    return url.render_as_string(hide_password=False)
+
+
+def _pool_args(database_url: str) -> dict:
+    if database_url.startswith("sqlite"):
+        return {}
+    return {"pool_size": settings.database_pool_size, "max_overflow": settings.database_max_overflow}
+
+
+def _sqlite_file(database_url: str) -> str | None:
+    url = make_url(database_url)
+    if url.get_backend_name() != "sqlite" or url.database in (None, "", ":memory:"):
+        return None
+    if url.database.startswith("file:"):
+        return None
+    return os.path.abspath(url.database)
+
+
+def _read_only_url(database_url: str, path: str) -> str:
+    url = make_url(database_url).set(database=f"file:{path}", query={"mode": "ro", "uri": "true"})
+    return url.render_as_string(hide_password=False)
+
+
+sync_database_url = _sync_url(settings.database_url)
+
 engine = create_engine(
-    settings.database_url,
-    connect_args=_sqlite_connect_args(settings.database_url),
+    sync_database_url,
+    connect_args=_sqlite_connect_args(sync_database_url),
     pool_pre_ping=True,
+    **_pool_args(sync_database_url),
 )
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Rows are serialized after the commit; expiring them would cost a SELECT per row.
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
+
+# SQLITE_PROFILE=performance: WAL with synchronous=NORMAL, a large page cache and mmap on every
+# connection, plus a separate read-only pool so list reads never queue behind the write lock.
+# SQLITE_WRITE_QUEUE additionally funnels request writes through one thread that group-commits.
+read_engine = engine
+ReadSessionLocal = SessionLocal
+write_queue = None
+sqlite_path = _sqlite_file(sync_database_url)
+if settings.sqlite_profile == "performance" and sqlite_path is not None:
+    apply_sqlite_pragmas(
+        engine,
+        mmap_size=settings.sqlite_mmap_size,
+        cache_size_kib=settings.sqlite_cache_size_kib,
+        busy_timeout_ms=settings.sqlite_busy_timeout_ms,
+    )
+    read_engine = create_engine(
+        _read_only_url(sync_database_url, sqlite_path),
+        connect_args={"check_same_thread": False},
+        pool_size=settings.sqlite_read_pool_size,
+        max_overflow=0,
+    )
+    apply_sqlite_pragmas(
+        read_engine,
+        mmap_size=settings.sqlite_mmap_size,
+        cache_size_kib=settings.sqlite_cache_size_kib,
+        busy_timeout_ms=settings.sqlite_busy_timeout_ms,
+        writer=False,
+    )
+    ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=read_engine)
+    if settings.sqlite_write_queue:
+        write_queue = SQLiteWriteQueue(
+            engine,
+            max_batch=settings.sqlite_write_batch_size,
+            max_wait_ms=settings.sqlite_write_batch_wait_ms,
+        )
+
+async_engine = None
+AsyncSessionLocal = None
+if _is_async_url(settings.database_url):
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    async_engine = create_async_engine(
+        settings.database_url,
+        pool_pre_ping=True,
+        **_pool_args(settings.database_url),
+    )
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
 
 
 def get_db():
@@ -28,3 +128,53 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+# Request-scoped session for async routes. Services and repositories are written against a
+# sync Session: with an async driver they run through AsyncSession.run_sync on the event loop,
+# so an in-flight request holds a pooled connection but no thread; with a sync driver they
+# run on Starlette's threadpool as the old sync routes did. read() is for functions that never
+# write; it uses the read-only pool when the SQLite performance profile provides one.
+class DatabaseSession:
+    def __init__(self, session, read_session_factory=None, write_queue: SQLiteWriteQueue | None = None) -> None:
+        self.session = session
+        self.is_async = not isinstance(session, Session)
+        self.read_session_factory = read_session_factory
+        self.write_queue = write_queue
+        self._read_session: Session | None = None
+
+    async def run(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        if self.is_async:
+            return await self.session.run_sync(fn, *args, **kwargs)
+        if self.write_queue is not None:
+            return await asyncio.wrap_future(self.write_queue.submit(fn, *args, **kwargs))
+        return await run_in_threadpool(fn, self.session, *args, **kwargs)
+
+    async def read(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        if self.is_async:
+            return await self.session.run_sync(fn, *args, **kwargs)
+        if self.read_session_factory is None:
+            return await run_in_threadpool(fn, self.session, *args, **kwargs)
+        if self._read_session is None:
+            self._read_session = self.read_session_factory()
+        return await run_in_threadpool(fn, self._read_session, *args, **kwargs)
+
+    async def close(self) -> None:
+        if self.is_async:
+            await self.session.close()
+            return
+        await run_in_threadpool(self.session.close)
+        if self._read_session is not None:
+            await run_in_threadpool(self._read_session.close)
+
+
+async def get_session():
+    if AsyncSessionLocal is not None:
+        db = DatabaseSession(AsyncSessionLocal())
+    else:
+        read_factory = ReadSessionLocal if read_engine is not engine else None
+        db = DatabaseSession(SessionLocal(), read_session_factory=read_factory, write_queue=write_queue)
+    try:
+        yield db
+    finally:
+        await db.close()
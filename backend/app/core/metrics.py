@@ -0,0 +1,279 @@
+import bisect
+import logging
+import re
+import threading
+import time
+from contextvars import ContextVar
+from typing import Callable, Iterable
+
+from sqlalchemy import Engine, event
+
+from app.core.config import get_settings
+
+
+settings = get_settings()
+slow_query_logger = logging.getLogger("app.sql.slow")
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 4, 5, 6, 8, 10, 15, 20, 50, 100)
+
+
+def _format_labels(names: tuple[str, ...], values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels) -> float:
+        with self._lock:
+            return self._values.get(labels, 0)
+
+    def samples(self) -> list[str]:
+        with self._lock:
+            values = dict(self._values)
+        return [f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}" for labels, value in sorted(values.items())]
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (), buckets: Iterable[float] = DEFAULT_BUCKETS) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [count per bucket (last is +Inf), sum]
+        self._values: dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                state = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            state[0][index] += 1
+            state[1] += value
+
+    def count(self, *labels) -> int:
+        with self._lock:
+            state = self._values.get(labels)
+            return sum(state[0]) if state else 0
+
+    def samples(self) -> list[str]:
+        with self._lock:
+            values = {labels: (list(state[0]), state[1]) for labels, state in self._values.items()}
+        lines = []
+        for labels, (counts, total) in sorted(values.items()):
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {repr(float(total))}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+# Values read at scrape time from components that keep their own counters (caches, write queue).
+class CallbackMetric:
+    def __init__(self, name: str, documentation: str, kind: str, labelnames: Iterable[str], collect: Callable[[], dict[tuple, float]]) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.kind = kind
+        self.labelnames = tuple(labelnames)
+        self.collect = collect
+
+    def samples(self) -> list[str]:
+        try:
+            values = self.collect()
+        except Exception:
+            return []
+        return [f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}" for labels, value in sorted(values.items())]
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._metrics: dict[str, Counter | Histogram | CallbackMetric] = {}
+
+    def register(self, metric):
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            samples = metric.samples()
+            if not samples:
+                continue
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(samples)
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+latency_buckets = tuple(settings.metrics_latency_buckets) or DEFAULT_BUCKETS
+
+http_request_duration = registry.register(Histogram(
+    "pantry_http_request_duration_seconds",
+    "HTTP request latency by route template.",
+    ("method", "route", "status"),
+    latency_buckets,
+))
+http_request_queries = registry.register(Histogram(
+    "pantry_http_request_db_queries",
+    "SQL statements executed per HTTP request.",
+    ("method", "route"),
+    QUERY_COUNT_BUCKETS,
+))
+db_query_duration = registry.register(Histogram(
+    "pantry_db_query_duration_seconds",
+    "SQL statement latency by statement type.",
+    ("operation",),
+    latency_buckets,
+))
+db_slow_queries = registry.register(Counter(
+    "pantry_db_slow_queries_total",
+    "SQL statements slower than METRICS_SLOW_QUERY_MS.",
+    ("operation",),
+))
+openfoodfacts_requests = registry.register(Counter(
+    "pantry_openfoodfacts_requests_total",
+    "Upstream OpenFoodFacts requests by outcome (found, not_found, error).",
+    ("outcome",),
+))
+openfoodfacts_duration = registry.register(Histogram(
+    "pantry_openfoodfacts_request_duration_seconds",
+    "Upstream OpenFoodFacts request latency.",
+    (),
+    latency_buckets,
+))
+product_lookups = registry.register(Counter(
+    "pantry_product_lookups_total",
+    "Product lookups by where the answer came from (memory, local, stale, upstream, fallback).",
+    ("source",),
+))
+product_lookup_fallbacks = registry.register(Counter(
+    "pantry_product_lookup_fallbacks_total",
+    "Lookups answered with the placeholder product, by reason (not_found, error, timeout, budget, circuit_open).",
+    ("reason",),
+))
+
+
+def register_callback(name: str, documentation: str, kind: str, labelnames: Iterable[str], collect: Callable[[], dict[tuple, float]]) -> None:
+    registry.register(CallbackMetric(name, documentation, kind, labelnames, collect))
+
+
+# Per-request statement counter; a mutable holder so threadpool copies of the context share it.
+_request_queries: ContextVar[list[int] | None] = ContextVar("request_queries", default=None)
+
+_OPERATION_PATTERN = re.compile(r"\s*(\w+)")
+
+
+def _operation(statement: str) -> str:
+    match = _OPERATION_PATTERN.match(statement)
+    operation = match.group(1).upper() if match else "OTHER"
+    return operation if operation in {"SELECT", "INSERT", "UPDATE", "DELETE", "WITH"} else "OTHER"
+
+
+def instrument_engine(engine: Engine) -> None:
+    slow_seconds = settings.metrics_slow_query_ms / 1000
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany) -> None:
+        conn.info.setdefault("metrics_query_start", []).append(time.perf_counter())
+        queries = _request_queries.get()
+        if queries is not None:
+            queries[0] += 1
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany) -> None:
+        starts = conn.info.get("metrics_query_start")
+        if not starts:
+            return
+        elapsed = time.perf_counter() - starts.pop()
+        operation = _operation(statement)
+        db_query_duration.observe(elapsed, operation)
+        if slow_seconds > 0 and elapsed >= slow_seconds:
+            db_slow_queries.inc(operation)
+            # Values can be names, barcodes or other household data, so only their shape is logged.
+            slow_query_logger.warning(
+                "slow query %.1f ms: %s [%s]",
+                elapsed * 1000,
+                " ".join(statement.split()),
+                _redacted(parameters, executemany),
+            )
+
+    @event.listens_for(engine, "handle_error")
+    def _error(context) -> None:
+        connection = context.connection
+        if connection is not None:
+            starts = connection.info.get("metrics_query_start")
+            if starts:
+                starts.pop()
+
+
+def _redacted(parameters, executemany: bool) -> str:
+    if executemany:
+        return f"{len(parameters)} parameter sets redacted"
+    count = len(parameters) if parameters is not None else 0
+    return f"{count} parameters redacted"
+
+
+class MetricsMiddleware:
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_holder = [500]
+
+        async def send_wrapper(message) -> None:
+            if message["type"] == "http.response.start":
+                status_holder[0] = message["status"]
+            await send(message)
+
+        queries = [0]
+        token = _request_queries.set(queries)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            _request_queries.reset(token)
+            route = scope.get("route")
+            # Route templates keep label cardinality bounded; unmatched paths share one label.
+            path = getattr(route, "path", None) or "unmatched"
+            method = scope.get("method", "")
+            http_request_duration.observe(elapsed, method, path, status_holder[0])
+            http_request_queries.observe(queries[0], method, path)
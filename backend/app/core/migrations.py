@@ -0,0 +1,273 @@
+from datetime import datetime
+from typing import Callable, NamedTuple
+
+from sqlalchemy import (
+    Boolean,
+    Connection,
+    DateTime,
+    Engine,
+    Integer,
+    String,
+    bindparam,
+    column,
+    delete,
+    func,
+    inspect,
+    insert,
+    select,
+    table,
+    text,
+    update,
+)
+
+from app.models.catalog_product import CatalogImportState, CatalogProduct
+from app.models.change_log_entry import ChangeLogEntry
+from app.models.household_version import HouseholdVersion
+from app.models.inventory_item import InventoryItem
+from app.models.list_cache_entry import ListCacheEntry
+from app.models.product_cache_entry import ProductCacheEntry
+from app.models.schema_migration import SchemaMigration
+from app.models.shopping_list_item import ShoppingListItem
+from app.models.sync_operation_entry import SyncOperationEntry
+from app.names import name_key
+
+
+# Migrations are append-only and each step checks before it changes anything, so a fresh
+# database (whose tables step 1 already creates from the current models) and an old one
+# end up with the same schema. Later steps must not depend on the current models: data
+# changes name the columns they touch and index steps spell out the indexes they add, so a
+# column or index added to a model later can't leak into (or break) an older step.
+
+
+class Migration(NamedTuple):
+    version: int
+    name: str
+    upgrade: Callable[[Connection], None]
+
+
+def create_tables(connection: Connection, *models) -> None:
+    for model in models:
+        model.__table__.create(bind=connection, checkfirst=True)
+
+
+def add_column(connection: Connection, table: str, column: str, ddl: str) -> None:
+    inspector = inspect(connection)
+    if table not in inspector.get_table_names():
+        return
+    if column in {existing["name"] for existing in inspector.get_columns(table)}:
+        return
+    connection.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
+
+
+def create_index(
+    connection: Connection,
+    name: str,
+    table_name: str,
+    columns: list[str],
+    unique: bool = False,
+    where: dict[str, str] | None = None,
+) -> None:
+    # `where` maps a dialect name to its partial-index condition.
+    if table_name not in inspect(connection).get_table_names():
+        return
+    ddl = f"CREATE {'UNIQUE ' if unique else ''}INDEX IF NOT EXISTS {name} ON {table_name} ({', '.join(columns)})"
+    condition = (where or {}).get(connection.dialect.name)
+    if condition:
+        ddl += f" WHERE {condition}"
+    connection.execute(text(ddl))
+
+
+def _initial_tables(connection: Connection) -> None:
+    create_tables(
+        connection,
+        InventoryItem,
+        ShoppingListItem,
+        ProductCacheEntry,
+        CatalogProduct,
+        CatalogImportState,
+        HouseholdVersion,
+    )
+
+
+def _inventory_barcode(connection: Connection) -> None:
+    add_column(connection, "inventory_items", "barcode", "VARCHAR(64)")
+
+
+def _normalized_names(connection: Connection) -> None:
+    add_column(connection, "inventory_items", "normalized_name", "VARCHAR(200)")
+    add_column(connection, "shopping_list_items", "normalized_name", "VARCHAR(200)")
+    inventory = table(
+        "inventory_items",
+        column("id", String),
+        column("household_id", String),
+        column("name", String),
+        column("normalized_name", String),
+        column("barcode", String),
+        column("category", String),
+        column("quantity", Integer),
+        column("min_quantity", Integer),
+        column("created_at", DateTime),
+    )
+    shopping_list = table(
+        "shopping_list_items",
+        column("id", String),
+        column("household_id", String),
+        column("name", String),
+        column("normalized_name", String),
+        column("quantity", Integer),
+        column("completed", Boolean),
+        column("created_at", DateTime),
+    )
+    _backfill_normalized_names(connection, inventory, [])
+    _backfill_normalized_names(connection, shopping_list, [shopping_list.c.completed.is_(False)])
+
+
+def _backfill_normalized_names(connection: Connection, items, duplicate_filter: list) -> None:
+    pending = connection.execute(select(items.c.id, items.c.name).where(items.c.normalized_name.is_(None))).all()
+    if not pending:
+        return
+    connection.execute(
+        update(items).where(items.c.id == bindparam("item_id")).values(normalized_name=bindparam("key")),
+        [{"item_id": item_id, "key": name_key(name)} for item_id, name in pending],
+    )
+
+    # The unique index needs one row per key, so fold later duplicates into the oldest row.
+    is_inventory = items.name == "inventory_items"
+    duplicates = (
+        select(items.c.household_id, items.c.normalized_name)
+        .where(*duplicate_filter)
+        .group_by(items.c.household_id, items.c.normalized_name)
+        .having(func.count() > 1)
+    )
+    for household_id, normalized_name in connection.execute(duplicates).all():
+        rows = connection.execute(
+            select(items)
+            .where(items.c.household_id == household_id, items.c.normalized_name == normalized_name, *duplicate_filter)
+            .order_by(items.c.created_at.asc())
+        ).mappings().all()
+        keeper, *extras = rows
+        values = {"quantity": keeper["quantity"] + sum(extra["quantity"] for extra in extras)}
+        if is_inventory:
+            values["barcode"] = next((row["barcode"] for row in rows if row["barcode"]), None)
+            values["category"] = next((row["category"] for row in rows if row["category"]), None)
+            values["min_quantity"] = max(row["min_quantity"] for row in rows)
+        connection.execute(update(items).where(items.c.id == keeper["id"]).values(**values))
+        connection.execute(delete(items).where(items.c.id.in_([extra["id"] for extra in extras])))
+
+
+def _list_indexes(connection: Connection) -> None:
+    for name, table_name, columns in [
+        ("ix_inventory_items_household_id", "inventory_items", ["household_id"]),
+        ("ix_inventory_items_name", "inventory_items", ["name"]),
+        ("ix_inventory_items_barcode", "inventory_items", ["barcode"]),
+        ("ix_inventory_items_category", "inventory_items", ["category"]),
+        ("ix_inventory_items_household_created", "inventory_items", ["household_id", "created_at", "id"]),
+        ("ix_shopping_list_items_household_id", "shopping_list_items", ["household_id"]),
+        ("ix_shopping_list_items_name", "shopping_list_items", ["name"]),
+        ("ix_shopping_list_items_household_order", "shopping_list_items", ["household_id", "completed", "created_at", "id"]),
+    ]:
+        create_index(connection, name, table_name, columns)
+    create_index(
+        connection,
+        "uq_inventory_items_household_name",
+        "inventory_items",
+        ["household_id", "normalized_name"],
+        unique=True,
+    )
+    # Only one open entry per name; completed entries may repeat.
+    create_index(
+        connection,
+        "uq_shopping_list_items_household_open_name",
+        "shopping_list_items",
+        ["household_id", "normalized_name"],
+        unique=True,
+        where={"sqlite": "completed = 0", "postgresql": "completed = false"},
+    )
+
+
+def _list_cache(connection: Connection) -> None:
+    create_tables(connection, ListCacheEntry)
+
+
+def _change_log(connection: Connection) -> None:
+    create_tables(connection, ChangeLogEntry)
+
+
+def _low_stock_index(connection: Connection) -> None:
+    create_index(
+        connection,
+        "ix_inventory_items_household_low_stock",
+        "inventory_items",
+        ["household_id", "normalized_name"],
+        where={"sqlite": "quantity < min_quantity", "postgresql": "quantity < min_quantity"},
+    )
+
+
+def _sync_operations(connection: Connection) -> None:
+    create_tables(connection, SyncOperationEntry)
+
+
+def _catalog_import_offset(connection: Connection) -> None:
+    add_column(connection, "catalog_import_state", "byte_offset", "BIGINT NOT NULL DEFAULT 0")
+
+
+MIGRATIONS: list[Migration] = [
+    Migration(1, "initial tables", _initial_tables),
+    Migration(2, "inventory barcode column", _inventory_barcode),
+    Migration(3, "normalized name keys", _normalized_names),
+    Migration(4, "list and dedup indexes", _list_indexes),
+    Migration(5, "shared list response cache", _list_cache),
+    Migration(6, "change log", _change_log),
+    Migration(7, "low-stock index", _low_stock_index),
+    Migration(8, "sync operation dedup", _sync_operations),
+    Migration(9, "catalog import byte offset", _catalog_import_offset),
+]
+
+LATEST_VERSION = MIGRATIONS[-1].version
+
+
+def current_version(connection: Connection) -> int:
+    if not inspect(connection).has_table(SchemaMigration.__tablename__):
+        return 0
+    return connection.execute(select(func.max(SchemaMigration.version))).scalar() or 0
+
+
+def migrate(engine: Engine, target: int | None = None) -> list[Migration]:
+    target = LATEST_VERSION if target is None else target
+    with engine.begin() as connection:
+        create_tables(connection, SchemaMigration)
+
+    applied: list[Migration] = []
+    for migration in MIGRATIONS:
+        if migration.version > target:
+            break
+        with engine.begin() as connection:
+            if connection.dialect.name == "postgresql":
+                # Serializes concurrent runners; released at the end of the transaction.
+                connection.execute(text("SELECT pg_advisory_xact_lock(727274)"))
+            if current_version(connection) >= migration.version:
+                continue
+            migration.upgrade(connection)
+            connection.execute(
+                insert(SchemaMigration).values(
+                    version=migration.version,
+                    name=migration.name,
+                    applied_at=datetime.utcnow(),
+                )
+            )
+        applied.append(migration)
+    return applied
+
+
+def check_schema(engine: Engine) -> int:
+    with engine.connect() as connection:
+        try:
+            version = connection.execute(select(func.max(SchemaMigration.version))).scalar() or 0
+        except Exception:
+            version = 0
+    if version < LATEST_VERSION:
+        raise RuntimeError(
+            f"Database schema is at version {version}, the app needs {LATEST_VERSION}. "
+            "Run `python -m app.cli migrate` first (or set MIGRATE_ON_STARTUP=true)."
+        )
+    return version
@@ -0,0 +1,41 @@
+import base64
+import json
+from datetime import datetime
+from typing import Iterable
+
+from fastapi import HTTPException, status
+
+
+MAX_PAGE_SIZE = 500
+
+
+def encode_cursor(values: Iterable) -> str:
+    payload = [value.isoformat() if isinstance(value, datetime) else value for value in values]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> list:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != size:
+            raise ValueError(cursor)
+        # created_at always sits right before the id in the sort key.
+        values[-2] = datetime.fromisoformat(values[-2])
+        return values
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor.")
+
+
+def parse_fields(fields: str | None, allowed: Iterable[str]) -> list[str] | None:
+    if not fields:
+        return None
+    requested = list(dict.fromkeys(field.strip() for field in fields.split(",") if field.strip()))
+    unknown = [field for field in requested if field not in allowed]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(unknown)}.",
+        )
+    return requested or None
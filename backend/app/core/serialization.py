@@ -0,0 +1,13 @@
+from typing import Iterable, Sequence
+
+import orjson
+
+
+# Same bytes as FastAPI's JSONResponse over the Read schemas: compact separators, raw UTF-8,
+# and aware UTC datetimes written with "Z" the way pydantic does.
+JSON_OPTIONS = orjson.OPT_UTC_Z
+
+
+def dump_rows(fields: Sequence[str], rows: Iterable[Sequence]) -> bytes:
+    # Rows may carry extra trailing columns (cursor keys); zip stops at the last requested field.
+    return orjson.dumps([dict(zip(fields, row)) for row in rows], option=JSON_OPTIONS)
@@ -0,0 +1,138 @@
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable
+
+from sqlalchemy import Engine, event
+from sqlalchemy.orm import Session
+
+
+logger = logging.getLogger(__name__)
+
+
+def apply_sqlite_pragmas(
+    engine: Engine,
+    mmap_size: int,
+    cache_size_kib: int,
+    busy_timeout_ms: int,
+    writer: bool = True,
+) -> None:
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record) -> None:
+        # Let SQLAlchemy own BEGIN/SAVEPOINT instead of pysqlite's implicit transactions.
+        dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        if writer:
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA mmap_size={int(mmap_size)}")
+        cursor.execute(f"PRAGMA cache_size={-int(cache_size_kib)}")
+        cursor.execute(f"PRAGMA busy_timeout={int(busy_timeout_ms)}")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.close()
+
+    @event.listens_for(engine, "begin")
+    def _on_begin(connection) -> None:
+        # Writers take the write lock up front rather than failing to upgrade a read lock later.
+        connection.exec_driver_sql("BEGIN IMMEDIATE" if writer else "BEGIN")
+
+
+class _WriteJob:
+    def __init__(self, fn: Callable, args: tuple, kwargs: dict) -> None:
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.future: Future = Future()
+
+
+# Single writer thread that commits concurrent write jobs as one transaction. Each job gets its
+# own Session joined to the shared transaction through a SAVEPOINT, so a job's commit() only
+# releases its savepoint and a failing job rolls back alone. The outer transaction is committed
+# once per batch, and futures resolve only after that commit is durable. A job that needs to act
+# after the commit appends a callable to session.info["deferred_after_commit"].
+class SQLiteWriteQueue:
+    def __init__(self, engine: Engine, max_batch: int = 64, max_wait_ms: float = 2.0) -> None:
+        self.engine = engine
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max_wait_ms / 1000
+        self._jobs: queue.Queue[_WriteJob] = queue.Queue()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.jobs = 0
+
+    def submit(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Future:
+        self._ensure_started()
+        job = _WriteJob(fn, args, kwargs)
+        self._jobs.put(job)
+        return job.future
+
+    def stats(self) -> dict:
+        return {
+            "batches": self.batches,
+            "jobs": self.jobs,
+            "jobs_per_commit": round(self.jobs / self.batches, 2) if self.batches else 0.0,
+            "queued": self._jobs.qsize(),
+        }
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="sqlite-writer", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._jobs.get()]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(self._jobs.get(timeout=max(0.0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+            self._commit_batch(batch)
+
+    def _commit_batch(self, batch: list[_WriteJob]) -> None:
+        outcomes: list[tuple[_WriteJob, Any, BaseException | None]] = []
+        after_commit: list[Callable[[], None]] = []
+        try:
+            with self.engine.connect() as connection:
+                transaction = connection.begin()
+                for job in batch:
+                    session = Session(
+                        bind=connection,
+                        join_transaction_mode="create_savepoint",
+                        autoflush=False,
+                        expire_on_commit=False,
+                        info={"deferred_after_commit": after_commit},
+                    )
+                    try:
+                        outcomes.append((job, job.fn(session, *job.args, **job.kwargs), None))
+                    except BaseException as exc:
+                        outcomes.append((job, None, exc))
+                    finally:
+                        session.close()
+                transaction.commit()
+        except BaseException as exc:
+            logger.exception("SQLite group commit failed")
+            for job in batch:
+                if not job.future.done():
+                    job.future.set_exception(exc)
+            return
+
+        self.batches += 1
+        self.jobs += len(batch)
+        for callback in dict.fromkeys(after_commit):
+            try:
+                callback()
+            except Exception:
+                logger.exception("SQLite after-commit callback failed")
+        for job, result, error in outcomes:
+            if error is not None:
+                job.future.set_exception(error)
+            else:
+                job.future.set_result(result)
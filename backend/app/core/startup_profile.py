@@ -0,0 +1,87 @@
+import logging
+import os
+import time
+
+
+logger = logging.getLogger("app.startup")
+
+
+def _process_age_ms() -> float | None:
+    # How long the interpreter ran before the app started importing (Linux only).
+    try:
+        with open("/proc/self/stat", encoding="ascii") as handle:
+            fields = handle.read().rsplit(")", 1)[1].split()
+        started = int(fields[19]) / os.sysconf("SC_CLK_TCK")
+        return round((time.clock_gettime(time.CLOCK_BOOTTIME) - started) * 1000, 1)
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+# Milestones of this worker's cold start, in ms since app.main started importing: "imported"
+# once all routers are built, "startup" when the startup handlers are done and "first_request"
+# when the first response has been sent.
+class StartupProfile:
+    def __init__(self) -> None:
+        self.origin = time.perf_counter()
+        self.before_import_ms = _process_age_ms()
+        self.marks: dict[str, float] = {}
+        self.first_request: dict | None = None
+
+    def mark(self, name: str) -> None:
+        self.marks.setdefault(name, round((time.perf_counter() - self.origin) * 1000, 1))
+
+    def report(self) -> dict:
+        imported = self.marks.get("imported")
+        startup = self.marks.get("startup")
+        first = self.marks.get("first_request")
+        return {
+            "before_import_ms": self.before_import_ms,
+            "import_ms": imported,
+            "startup_ms": round(startup - imported, 1) if startup is not None and imported is not None else None,
+            "first_request": self.first_request,
+            "ready_ms": first,
+        }
+
+
+startup_profile = StartupProfile()
+
+
+# Times the first request this worker serves, then steps aside.
+class FirstRequestMiddleware:
+    def __init__(self, app, profile: StartupProfile = startup_profile) -> None:
+        self.app = app
+        self.profile = profile
+        self.pending = True
+
+    async def __call__(self, scope, receive, send):
+        if not self.pending or scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        self.pending = False
+        started = time.perf_counter()
+        status = 500
+        try:
+            async def send_wrapper(message):
+                nonlocal status
+                if message["type"] == "http.response.start":
+                    status = message["status"]
+                await send(message)
+
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            self.profile.first_request = {
+                "path": scope["path"],
+                "status": status,
+                "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+            }
+            self.profile.mark("first_request")
+            report = self.profile.report()
+            logger.info(
+                "cold start: %s ms before import, import %s ms, startup %s ms, first request %s %s ms, ready after %s ms",
+                report["before_import_ms"],
+                report["import_ms"],
+                report["startup_ms"],
+                scope["path"],
+                self.profile.first_request["duration_ms"],
+                report["ready_ms"],
+            )
@@ -0,0 +1,181 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Awaitable, Callable, NamedTuple
+
+from sqlalchemy import delete, select
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import get_settings
+from app.core.database import ReadSessionLocal, SessionLocal
+from app.models.list_cache_entry import ListCacheEntry
+
+
+settings = get_settings()
+
+
+class CachedList(NamedTuple):
+    version: int
+    body: bytes
+    next_cursor: str | None
+
+
+# Serialized list responses keyed by household, scope and query parameters. An entry is only
+# served for the household version it was rendered at, and every write bumps that version in
+# household_versions, so a write anywhere (any worker) makes older entries unreachable. With
+# shared=True the rendered bodies also go to the list_cache table, so other workers can serve
+# them without rendering the page themselves.
+class ListResponseCache:
+    def __init__(
+        self,
+        max_entries: int,
+        shared: bool = False,
+        session_factory=SessionLocal,
+        read_session_factory=ReadSessionLocal,
+    ) -> None:
+        self.max_entries = max_entries
+        self.shared = shared
+        self.session_factory = session_factory
+        # Shared reads use the read-only pool when there is one, so they never take the write lock.
+        self.read_session_factory = read_session_factory
+        self._entries: OrderedDict[str, tuple[tuple[str, str], CachedList]] = OrderedDict()
+        self._versions: dict[tuple[str, str], int] = {}
+        self._lock = threading.Lock()
+        self._counters = {"memory_hits": 0, "shared_hits": 0, "misses": 0, "stores": 0, "errors": 0}
+
+    def key(self, scope: str, household_id: str, *params) -> str:
+        raw = "|".join(str(part) for part in (scope, household_id, *params))
+        return hashlib.blake2s(raw.encode(), digest_size=16).hexdigest()
+
+    async def fetch(
+        self,
+        scope: str,
+        household_id: str,
+        version: int,
+        key: str,
+        render: Callable[[], Awaitable[tuple[bytes, str | None]]],
+    ) -> CachedList:
+        entry = self.get_memory(scope, household_id, version, key)
+        if entry is None and self.shared:
+            entry = await run_in_threadpool(self.get_shared, scope, household_id, version, key)
+        if entry is not None:
+            return entry
+
+        body, next_cursor = await render()
+        entry = CachedList(version, body, next_cursor)
+        self.set(scope, household_id, key, entry)
+        if self.shared:
+            await run_in_threadpool(self.set_shared, scope, household_id, key, entry)
+        return entry
+
+    def get_memory(self, scope: str, household_id: str, version: int, key: str) -> CachedList | None:
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None and cached[1].version == version:
+                self._entries.move_to_end(key)
+                self._counters["memory_hits"] += 1
+                return cached[1]
+            if not self.shared:
+                self._counters["misses"] += 1
+        return None
+
+    def get_shared(self, scope: str, household_id: str, version: int, key: str) -> CachedList | None:
+        try:
+            with self.read_session_factory() as db:
+                row = db.execute(
+                    select(ListCacheEntry.body, ListCacheEntry.next_cursor).where(
+                        ListCacheEntry.cache_key == key,
+                        ListCacheEntry.version == version,
+                    )
+                ).first()
+        except Exception:
+            self._count("errors")
+            row = None
+        if row is None:
+            self._count("misses")
+            return None
+
+        entry = CachedList(version, bytes(row.body), row.next_cursor)
+        self._remember(scope, household_id, key, entry)
+        self._count("shared_hits")
+        return entry
+
+    def set(self, scope: str, household_id: str, key: str, entry: CachedList) -> None:
+        self._remember(scope, household_id, key, entry)
+        self._count("stores")
+
+    def set_shared(self, scope: str, household_id: str, key: str, entry: CachedList) -> None:
+        try:
+            with self.session_factory() as db:
+                # Older versions can never be served again, so each store also clears them out.
+                db.execute(
+                    delete(ListCacheEntry).where(
+                        ListCacheEntry.household_id == household_id,
+                        ListCacheEntry.scope == scope,
+                        (ListCacheEntry.version < entry.version) | (ListCacheEntry.cache_key == key),
+                    )
+                )
+                db.add(
+                    ListCacheEntry(
+                        cache_key=key,
+                        household_id=household_id,
+                        scope=scope,
+                        version=entry.version,
+                        body=entry.body,
+                        next_cursor=entry.next_cursor,
+                        updated_at=datetime.utcnow(),
+                    )
+                )
+                db.commit()
+        except Exception:
+            # Another worker stored the same page first, or the table is busy; both are fine.
+            self._count("errors")
+
+    def clear_memory(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._versions.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            counters = dict(self._counters)
+            size = len(self._entries)
+        lookups = counters["memory_hits"] + counters["shared_hits"] + counters["misses"]
+        hits = counters["memory_hits"] + counters["shared_hits"]
+        return {
+            **counters,
+            "memory_size": size,
+            "memory_max_entries": self.max_entries,
+            "shared": self.shared,
+            "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+        }
+
+    def _remember(self, scope: str, household_id: str, key: str, entry: CachedList) -> None:
+        if self.max_entries <= 0:
+            return
+        owner = (scope, household_id)
+        with self._lock:
+            seen = self._versions.get(owner, -1)
+            if entry.version < seen:
+                return
+            if entry.version > seen:
+                # First page rendered after a write: drop this household's stale pages now.
+                self._versions[owner] = entry.version
+                stale = [k for k, (o, cached) in self._entries.items() if o == owner and cached.version < entry.version]
+                for stale_key in stale:
+                    self._entries.pop(stale_key, None)
+            self._entries[key] = (owner, entry)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._counters[name] += 1
+
+
+list_cache = ListResponseCache(
+    max_entries=settings.list_cache_size,
+    shared=settings.list_cache_shared,
+)
@@ -1,15 +1,22 @@
+# Imported first, so the startup profile clock starts before the framework imports.
+from app.core.startup_profile import FirstRequestMiddleware, startup_profile
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy import inspect, text
 
 from app.core.config import get_settings
-from app.core.database import engine
-from app.models.inventory_item import Base
-import app.models.shopping_list_item  # noqa: F401
+from app.core.database import async_engine, engine, read_engine
+from app.core.metrics import MetricsMiddleware, instrument_engine
+from app.core.migrations import check_schema, migrate
+from app.product_lookup import openfoodfacts
+from app.routers.backup import router as backup_router
+from app.routers.changes import router as changes_router
 from app.routers.health import router as health_router
 from app.routers.inventory import router as inventory_router
+from app.routers.metrics import router as metrics_router
 from app.routers.products import router as products_router
 from app.routers.shopping_list import router as shopping_list_router
+from app.routers.sync import router as sync_router
 
 
 settings = get_settings()
@@ -23,28 +30,43 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"] ,
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Next-Cursor"],
 )
 
+if settings.metrics_enabled:
+    app.add_middleware(MetricsMiddleware)
+    for instrumented in {engine, read_engine}:
+        instrument_engine(instrumented)
+    if async_engine is not None:
+        instrument_engine(async_engine.sync_engine)
+    app.include_router(metrics_router)
+
+# Outermost, so the first request is timed through every other middleware.
+app.add_middleware(FirstRequestMiddleware)
+
 app.include_router(health_router)
+app.include_router(changes_router)
+app.include_router(backup_router)
 app.include_router(inventory_router)
 app.include_router(products_router, prefix="/products", tags=["products"])
 app.include_router(shopping_list_router)
+app.include_router(sync_router)
+
+startup_profile.mark("imported")
 
 
 @app.on_event("startup")
 def on_startup() -> None:
-    Base.metadata.create_all(bind=engine)
-    ensure_inventory_barcode_column()
-
-
-def ensure_inventory_barcode_column() -> None:
-    inspector = inspect(engine)
-    if "inventory_items" not in inspector.get_table_names():
-        return
+    # Migrations run from `python -m app.cli migrate` as a release step; workers only verify the version.
+    if settings.migrate_on_startup:
+        migrate(engine)
+    # Serverless deploys that migrate in a release step can skip this round trip; the engine then
+    # connects on the first request that needs the database.
+    if settings.check_schema_on_startup:
+        check_schema(engine)
+    startup_profile.mark("startup")
 
-    column_names = {column["name"] for column in inspector.get_columns("inventory_items")}
-    if "barcode" in column_names:
-        return
 
-    with engine.begin() as connection:
-        connection.execute(text("ALTER TABLE inventory_items ADD COLUMN barcode VARCHAR(64)"))
+@app.on_event("shutdown")
+async def on_shutdown() -> None:
+    await openfoodfacts.aclose()
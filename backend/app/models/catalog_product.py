@@ -0,0 +1,34 @@
+from datetime import datetime
+
+from sqlalchemy import BigInteger, Boolean, Column, DateTime, Integer, String
+
+from app.models.inventory_item import Base
+
+
+class CatalogProduct(Base):
+    __tablename__ = "catalog_products"
+
+    barcode = Column(String(64), primary_key=True)
+    product_name_de = Column(String(300), nullable=True)
+    product_name_en = Column(String(300), nullable=True)
+    product_name = Column(String(300), nullable=True)
+    generic_name = Column(String(300), nullable=True)
+    brands = Column(String(300), nullable=True)
+    image_front_url = Column(String(1000), nullable=True)
+    image_url = Column(String(1000), nullable=True)
+    last_modified_t = Column(BigInteger, nullable=True)
+    imported_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+
+class CatalogImportState(Base):
+    __tablename__ = "catalog_import_state"
+
+    source = Column(String(1000), primary_key=True)
+    signature = Column(String(200), nullable=False)
+    records_processed = Column(BigInteger, nullable=False, default=0)
+    # Where the next record starts in the decompressed stream; resuming seeks straight to it.
+    byte_offset = Column(BigInteger, nullable=False, default=0)
+    products_upserted = Column(BigInteger, nullable=False, default=0)
+    errors = Column(Integer, nullable=False, default=0)
+    completed = Column(Boolean, nullable=False, default=False)
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow)
@@ -0,0 +1,20 @@
+from datetime import datetime
+
+from sqlalchemy import JSON, BigInteger, Column, DateTime, Index, Integer, String
+
+from app.models.inventory_item import Base
+
+
+class ChangeLogEntry(Base):
+    __tablename__ = "change_log"
+    __table_args__ = (
+        Index("ix_change_log_household_seq", "household_id", "seq"),
+    )
+
+    seq = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+    household_id = Column(String(36), nullable=False)
+    entity = Column(String(40), nullable=False)
+    entity_id = Column(String(36), nullable=False)
+    op = Column(String(10), nullable=False)
+    data = Column(JSON, nullable=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow, index=True)
@@ -0,0 +1,11 @@
+from sqlalchemy import BigInteger, Column, String
+
+from app.models.inventory_item import Base
+
+
+class HouseholdVersion(Base):
+    __tablename__ = "household_versions"
+
+    household_id = Column(String(36), primary_key=True)
+    scope = Column(String(40), primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
@@ -1,8 +1,10 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import Column, DateTime, Integer, String
-from sqlalchemy.orm import declarative_base
+from sqlalchemy import Column, DateTime, Index, Integer, String, text
+from sqlalchemy.orm import declarative_base, validates
+
+from app.names import name_key
 
 
 Base = declarative_base()
@@ -10,12 +12,30 @@ Base = declarative_base()
 
 class InventoryItem(Base):
     __tablename__ = "inventory_items"
+    __table_args__ = (
+        Index("ix_inventory_items_household_created", "household_id", "created_at", "id"),
+        Index("uq_inventory_items_household_name", "household_id", "normalized_name", unique=True),
+        # Only rows below their minimum are indexed, so the low-stock report stays cheap.
+        Index(
+            "ix_inventory_items_household_low_stock",
+            "household_id",
+            "normalized_name",
+            sqlite_where=text("quantity < min_quantity"),
+            postgresql_where=text("quantity < min_quantity"),
+        ),
+    )
 
     id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     household_id = Column(String(36), index=True, nullable=False)
     name = Column(String(200), nullable=False, index=True)
+    normalized_name = Column(String(200), nullable=True)
     barcode = Column(String(64), nullable=True, index=True)
     quantity = Column(Integer, nullable=False, default=0)
     min_quantity = Column(Integer, nullable=False, default=0)
     category = Column(String(120), nullable=True, index=True)
     created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    @validates("name")
+    def _set_normalized_name(self, key, value):
+        self.normalized_name = name_key(value)
+        return value
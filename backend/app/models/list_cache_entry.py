@@ -0,0 +1,20 @@
+from datetime import datetime
+
+from sqlalchemy import BigInteger, Column, DateTime, Index, LargeBinary, String
+
+from app.models.inventory_item import Base
+
+
+class ListCacheEntry(Base):
+    __tablename__ = "list_cache"
+    __table_args__ = (
+        Index("ix_list_cache_household_scope", "household_id", "scope"),
+    )
+
+    cache_key = Column(String(64), primary_key=True)
+    household_id = Column(String(36), nullable=False)
+    scope = Column(String(40), nullable=False)
+    version = Column(BigInteger, nullable=False)
+    body = Column(LargeBinary, nullable=False)
+    next_cursor = Column(String(200), nullable=True)
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow)
@@ -0,0 +1,17 @@
+from datetime import datetime
+
+from sqlalchemy import Boolean, Column, DateTime, String
+
+from app.models.inventory_item import Base
+
+
+class ProductCacheEntry(Base):
+    __tablename__ = "product_cache"
+
+    barcode = Column(String(64), primary_key=True)
+    name = Column(String(300), nullable=False)
+    image = Column(String(1000), nullable=True)
+    brand = Column(String(300), nullable=True)
+    found = Column(Boolean, nullable=False, default=False)
+    fetched_at = Column(DateTime, nullable=False, default=datetime.utcnow, index=True)
+    expires_at = Column(DateTime, nullable=False, index=True)
@@ -1,17 +1,37 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import Boolean, Column, DateTime, Integer, String
+from sqlalchemy import Boolean, Column, DateTime, Index, Integer, String, text
+from sqlalchemy.orm import validates
 
 from app.models.inventory_item import Base
+from app.names import name_key
 
 
 class ShoppingListItem(Base):
     __tablename__ = "shopping_list_items"
+    __table_args__ = (
+        Index("ix_shopping_list_items_household_order", "household_id", "completed", "created_at", "id"),
+        # Only one open entry per name; completed entries may repeat.
+        Index(
+            "uq_shopping_list_items_household_open_name",
+            "household_id",
+            "normalized_name",
+            unique=True,
+            sqlite_where=text("completed = 0"),
+            postgresql_where=text("completed = false"),
+        ),
+    )
 
     id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     household_id = Column(String(36), index=True, nullable=False)
     name = Column(String(200), nullable=False, index=True)
+    normalized_name = Column(String(200), nullable=True)
     quantity = Column(Integer, nullable=False, default=1)
     completed = Column(Boolean, nullable=False, default=False)
     created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    @validates("name")
+    def _set_normalized_name(self, key, value):
+        self.normalized_name = name_key(value)
+        return value
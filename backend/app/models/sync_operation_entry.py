@@ -0,0 +1,19 @@
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, String
+
+from app.models.inventory_item import Base
+
+
+# One row per client op id that POST /sync has seen, so a replayed batch skips what already
+# landed. Rows older than SYNC_OP_RETENTION_DAYS are pruned.
+class SyncOperationEntry(Base):
+    __tablename__ = "sync_operations"
+
+    household_id = Column(String(36), primary_key=True)
+    op_id = Column(String(64), primary_key=True)
+    entity = Column(String(40), nullable=False)
+    entity_id = Column(String(36), nullable=True)
+    status = Column(String(10), nullable=False)
+    error = Column(String(200), nullable=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow, index=True)
@@ -0,0 +1,7 @@
+def normalize_name(name: str | None) -> str:
+    return " ".join((name or "").split()).strip()
+
+
+def name_key(name: str | None) -> str:
+    # Dedup key: whitespace collapsed like normalize_name, then casefolded ("Straße" == "STRASSE").
+    return normalize_name(name).casefold()
@@ -0,0 +1,71 @@
+import asyncio
+import json
+import os
+
+from fastapi import FastAPI
+
+
+# Stand-in for world.openfoodfacts.org, for tests and benchmarks that must run offline:
+#   uvicorn app.openfoodfacts_stub:app --port 9000
+#   OPENFOODFACTS_BASE_URL=http://127.0.0.1:9000 uvicorn main:app
+# or in-process via httpx.ASGITransport(app=app).
+#
+# OFF_STUB_FIXTURES  path to a JSON object mapping barcode -> product dict
+# OFF_STUB_LATENCY_MS  artificial delay per request
+# OFF_STUB_SYNTHETIC  "1" to answer every unknown barcode with a generated product
+
+DEFAULT_PRODUCTS = {
+    "5449000000996": {
+        "product_name": "Coca-Cola",
+        "product_name_de": "Coca-Cola Original Taste",
+        "brands": "Coca-Cola",
+        "image_front_url": "https://images.openfoodfacts.org/images/products/544/900/000/0996/front_en.jpg",
+    },
+    "4008400401621": {
+        "product_name": "Nutella",
+        "product_name_de": "Nutella",
+        "brands": "Ferrero",
+        "image_front_url": "https://images.openfoodfacts.org/images/products/400/840/040/1621/front_de.jpg",
+    },
+    "4000417025005": {
+        "product_name_de": "Ritter Sport Alpenmilch",
+        "brands": "Ritter Sport",
+    },
+    "3017620422003": {
+        "product_name_en": "Nutella hazelnut spread",
+        "brands": "Ferrero",
+        "image_url": "https://images.openfoodfacts.org/images/products/301/762/042/2003/front_en.jpg",
+    },
+}
+
+
+def _load_fixtures() -> dict[str, dict]:
+    products = dict(DEFAULT_PRODUCTS)
+    path = os.getenv("OFF_STUB_FIXTURES")
+    if path:
+        with open(path, encoding="utf-8") as handle:
+            products.update(json.load(handle))
+    return products
+
+
+products = _load_fixtures()
+latency_seconds = float(os.getenv("OFF_STUB_LATENCY_MS", "0")) / 1000
+synthetic = os.getenv("OFF_STUB_SYNTHETIC") == "1"
+request_count = 0
+
+app = FastAPI(title="OpenFoodFacts stub")
+
+
+@app.get("/api/v0/product/{barcode}.json")
+async def product(barcode: str):
+    global request_count
+    request_count += 1
+    if latency_seconds:
+        await asyncio.sleep(latency_seconds)
+
+    data = products.get(barcode)
+    if data is None and synthetic:
+        data = {"product_name": f"Stub product {barcode}", "brands": "Stub"}
+    if data is None:
+        return {"code": barcode, "status": 0, "status_verbose": "product not found"}
+    return {"code": barcode, "status": 1, "status_verbose": "product found", "product": data}
@@ -0,0 +1,249 @@
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, func, select
+
+from app.core.config import get_settings
+from app.core.database import ReadSessionLocal, SessionLocal
+from app.models.product_cache_entry import ProductCacheEntry
+
+
+# Prune the persistent table every N writes instead of on every store.
+_PRUNE_INTERVAL = 256
+
+
+class ProductCache:
+    def __init__(
+        self,
+        max_entries: int,
+        max_rows: int,
+        ttl_seconds: int,
+        negative_ttl_seconds: int,
+        stale_seconds: int = 0,
+        session_factory=SessionLocal,
+        read_session_factory=ReadSessionLocal,
+    ) -> None:
+        self.max_entries = max_entries
+        self.max_rows = max_rows
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        # Expired entries are kept this much longer so they can be served while being revalidated.
+        self.stale_seconds = max(0, stale_seconds)
+        self.session_factory = session_factory
+        # Lookups use the read-only pool when there is one, so they never take the SQLite write lock.
+        self.read_session_factory = read_session_factory
+        self._entries: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._writes_since_prune = 0
+        self._counters = {
+            "memory_hits": 0,
+            "persistent_hits": 0,
+            "stale_hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "evictions": 0,
+            "errors": 0,
+        }
+
+    def get(self, barcode: str) -> dict | None:
+        result = self.get_memory(barcode)
+        if result is not None:
+            return result
+        return self.get_persistent(barcode)
+
+    def get_memory(self, barcode: str, allow_stale: bool = False) -> dict | None:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(barcode)
+            if entry is not None:
+                expires_at, result = entry
+                if expires_at > now:
+                    self._entries.move_to_end(barcode)
+                    self._counters["memory_hits"] += 1
+                    return dict(result)
+                if expires_at + self.stale_seconds <= now:
+                    del self._entries[barcode]
+                elif allow_stale:
+                    self._entries.move_to_end(barcode)
+                    self._counters["stale_hits"] += 1
+                    return dict(result)
+        return None
+
+    def get_persistent(self, barcode: str) -> dict | None:
+        try:
+            with self.read_session_factory() as db:
+                row = db.get(ProductCacheEntry, barcode)
+                if row is None or row.expires_at <= datetime.utcnow():
+                    self._count("misses")
+                    return None
+                result = _row_to_result(row)
+                expires_at = time.time() + (row.expires_at - datetime.utcnow()).total_seconds()
+        except Exception:
+            self._count("errors")
+            self._count("misses")
+            return None
+
+        self._remember(barcode, result, expires_at)
+        self._count("persistent_hits")
+        return dict(result)
+
+    def get_many_persistent(self, barcodes: list[str]) -> dict[str, dict]:
+        if not barcodes:
+            return {}
+        now = datetime.utcnow()
+        try:
+            with self.read_session_factory() as db:
+                stmt = select(ProductCacheEntry).where(
+                    ProductCacheEntry.barcode.in_(barcodes),
+                    ProductCacheEntry.expires_at > now,
+                )
+                rows = db.execute(stmt).scalars().all()
+        except Exception:
+            self._count("errors")
+            rows = []
+
+        results: dict[str, dict] = {}
+        for row in rows:
+            result = _row_to_result(row)
+            self._remember(row.barcode, result, time.time() + (row.expires_at - now).total_seconds())
+            results[row.barcode] = result
+        with self._lock:
+            self._counters["persistent_hits"] += len(results)
+            self._counters["misses"] += len(barcodes) - len(results)
+        return results
+
+    def get_many_stale(self, barcodes: list[str]) -> dict[str, dict]:
+        # Expired rows still inside the stale window; callers revalidate whatever comes back.
+        if not barcodes or self.stale_seconds <= 0:
+            return {}
+        now = datetime.utcnow()
+        try:
+            with self.read_session_factory() as db:
+                stmt = select(ProductCacheEntry).where(
+                    ProductCacheEntry.barcode.in_(barcodes),
+                    ProductCacheEntry.expires_at <= now,
+                    ProductCacheEntry.expires_at > now - timedelta(seconds=self.stale_seconds),
+                )
+                rows = db.execute(stmt).scalars().all()
+        except Exception:
+            self._count("errors")
+            rows = []
+
+        results: dict[str, dict] = {}
+        for row in rows:
+            result = _row_to_result(row)
+            self._remember(row.barcode, result, time.time() + (row.expires_at - now).total_seconds())
+            results[row.barcode] = result
+        with self._lock:
+            self._counters["stale_hits"] += len(results)
+        return results
+
+    def set(self, barcode: str, result: dict) -> None:
+        ttl = self.ttl_seconds if result.get("found") else self.negative_ttl_seconds
+        if ttl <= 0:
+            return
+        self._remember(barcode, result, time.time() + ttl)
+        self._count("stores")
+
+        now = datetime.utcnow()
+        try:
+            with self.session_factory() as db:
+                row = db.get(ProductCacheEntry, barcode) or ProductCacheEntry(barcode=barcode)
+                row.name = result["name"]
+                row.image = result.get("image")
+                row.brand = result.get("brand")
+                row.found = bool(result.get("found"))
+                row.fetched_at = now
+                row.expires_at = now + timedelta(seconds=ttl)
+                db.add(row)
+                if self._should_prune():
+                    self._prune(db, now)
+                db.commit()
+        except Exception:
+            self._count("errors")
+
+    def remember(self, barcode: str, result: dict) -> None:
+        self._remember(barcode, result, time.time() + self.ttl_seconds)
+
+    def invalidate(self, barcode: str) -> None:
+        with self._lock:
+            self._entries.pop(barcode, None)
+        try:
+            with self.session_factory() as db:
+                db.execute(delete(ProductCacheEntry).where(ProductCacheEntry.barcode == barcode))
+                db.commit()
+        except Exception:
+            self._count("errors")
+
+    def clear_memory(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            counters = dict(self._counters)
+            size = len(self._entries)
+        lookups = counters["memory_hits"] + counters["persistent_hits"] + counters["misses"]
+        hits = counters["memory_hits"] + counters["persistent_hits"]
+        return {
+            **counters,
+            "memory_size": size,
+            "memory_max_entries": self.max_entries,
+            "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+        }
+
+    def _remember(self, barcode: str, result: dict, expires_at: float) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[barcode] = (expires_at, dict(result))
+            self._entries.move_to_end(barcode)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._counters["evictions"] += 1
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._counters[name] += 1
+
+    def _should_prune(self) -> bool:
+        with self._lock:
+            self._writes_since_prune += 1
+            if self._writes_since_prune < _PRUNE_INTERVAL:
+                return False
+            self._writes_since_prune = 0
+            return True
+
+    def _prune(self, db, now: datetime) -> None:
+        stale_until = now - timedelta(seconds=self.stale_seconds)
+        db.execute(delete(ProductCacheEntry).where(ProductCacheEntry.expires_at <= stale_until))
+        row_count = db.execute(select(func.count()).select_from(ProductCacheEntry)).scalar_one()
+        overflow = row_count - self.max_rows
+        if overflow <= 0:
+            return
+        oldest = select(ProductCacheEntry.barcode).order_by(ProductCacheEntry.fetched_at.asc()).limit(overflow)
+        db.execute(delete(ProductCacheEntry).where(ProductCacheEntry.barcode.in_(oldest)))
+        with self._lock:
+            self._counters["evictions"] += overflow
+
+
+def _row_to_result(row: ProductCacheEntry) -> dict:
+    return {
+        "name": row.name,
+        "image": row.image,
+        "brand": row.brand,
+        "found": bool(row.found),
+    }
+
+
+settings = get_settings()
+
+product_cache = ProductCache(
+    max_entries=settings.product_cache_size,
+    max_rows=settings.product_cache_max_rows,
+    ttl_seconds=settings.product_cache_ttl_seconds,
+    negative_ttl_seconds=settings.product_cache_negative_ttl_seconds,
+    stale_seconds=settings.product_cache_stale_seconds,
+)
@@ -0,0 +1,234 @@
+import asyncio
+import hashlib
+import io
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import NamedTuple
+from urllib.parse import urlsplit
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import get_settings
+from app.product_lookup import lookup_product, openfoodfacts
+
+
+settings = get_settings()
+
+MEDIA_TYPE = "image/jpeg"
+MTIME_RESOLUTION_SECONDS = 60
+
+
+class ImageUnavailable(Exception):
+    pass
+
+
+class CachedImage(NamedTuple):
+    path: str
+    etag: str
+    size: int
+
+
+def make_thumbnail(data: bytes, max_side: int) -> bytes:
+    # Pillow is only needed on a thumbnail cache miss; keep it out of startup.
+    from PIL import Image, UnidentifiedImageError
+
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            image.draft("RGB", (max_side, max_side))
+            image.thumbnail((max_side, max_side))
+            if image.mode != "RGB":
+                # Flatten transparency onto white; JPEG has no alpha channel.
+                background = Image.new("RGB", image.size, (255, 255, 255))
+                rgba = image.convert("RGBA")
+                background.paste(rgba, mask=rgba.getchannel("A"))
+                image = background
+            out = io.BytesIO()
+            image.save(out, "JPEG", quality=80, optimize=True, progressive=True)
+    except (UnidentifiedImageError, OSError, ValueError, Image.DecompressionBombError) as exc:
+        raise ImageUnavailable(str(exc)) from exc
+    return out.getvalue()
+
+
+# Product thumbnails on disk, one file per barcode named after its content hash, so the hash
+# doubles as a strong ETag. Files are evicted least recently served first once the directory
+# holds more than `max_bytes`. The index is rebuilt from the directory on first use (oldest
+# modification time first) and hits bump the file's mtime (at most once a minute), so LRU order
+# survives restarts and is roughly shared between workers using the same directory.
+class ProductImageCache:
+    def __init__(self, directory: str, max_bytes: int) -> None:
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, CachedImage] = OrderedDict()
+        self._total = 0
+        self._loaded = False
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0, "errors": 0}
+
+    def peek(self, barcode: str) -> CachedImage | None:
+        # Index only, no disk access: enough to answer a revalidation with 304.
+        with self._lock:
+            return self._entries.get(barcode) if self._loaded else None
+
+    def get(self, barcode: str) -> tuple[CachedImage, os.stat_result] | None:
+        with self._lock:
+            self._load()
+            entry = self._entries.get(barcode)
+        stat_result = None
+        if entry is not None:
+            try:
+                # Another worker may have evicted it.
+                stat_result = os.stat(entry.path)
+                if time.time() - stat_result.st_mtime > MTIME_RESOLUTION_SECONDS:
+                    os.utime(entry.path)
+            except OSError:
+                stat_result = None
+        with self._lock:
+            if stat_result is None:
+                if entry is not None and self._entries.get(barcode) == entry:
+                    self._drop(barcode)
+                self._counters["misses"] += 1
+                return None
+            if barcode in self._entries:
+                self._entries.move_to_end(barcode)
+            self._counters["hits"] += 1
+            return entry, stat_result
+
+    def store(self, barcode: str, data: bytes) -> CachedImage:
+        etag = hashlib.sha256(data).hexdigest()[:32]
+        path = os.path.join(self.directory, f"{barcode}.{etag}.jpg")
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with self._lock:
+            self._load()
+            try:
+                with open(temp_path, "wb") as handle:
+                    handle.write(data)
+                os.replace(temp_path, path)
+            except OSError:
+                self._counters["errors"] += 1
+                raise
+            previous = self._entries.get(barcode)
+            if previous is not None and previous.path != path:
+                self._remove_file(previous.path)
+            self._drop(barcode)
+            entry = CachedImage(path, etag, len(data))
+            self._entries[barcode] = entry
+            self._total += entry.size
+            self._counters["stores"] += 1
+            while self._total > self.max_bytes and len(self._entries) > 1:
+                oldest, _ = next(iter(self._entries.items()))
+                self._remove_file(self._entries[oldest].path)
+                self._drop(oldest)
+                self._counters["evictions"] += 1
+            return entry
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                **self._counters,
+                "entries": len(self._entries),
+                "bytes": self._total,
+                "max_bytes": self.max_bytes,
+            }
+
+    def _load(self) -> None:
+        if self._loaded:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        found = []
+        with os.scandir(self.directory) as entries:
+            for item in entries:
+                parts = item.name.split(".")
+                if len(parts) != 3 or parts[2] != "jpg" or not item.is_file():
+                    continue
+                stat = item.stat()
+                found.append((stat.st_mtime, parts[0], CachedImage(item.path, parts[1], stat.st_size)))
+        for _, barcode, entry in sorted(found):
+            stale = self._entries.get(barcode)
+            if stale is not None:
+                # Older copy left behind by a crashed replace; the newest file wins.
+                self._remove_file(stale.path)
+                self._drop(barcode)
+            self._entries[barcode] = entry
+            self._total += entry.size
+        self._loaded = True
+
+    def _drop(self, barcode: str) -> None:
+        entry = self._entries.pop(barcode, None)
+        if entry is not None:
+            self._total -= entry.size
+
+    def _remove_file(self, path: str) -> None:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        except OSError:
+            self._counters["errors"] += 1
+
+
+image_cache = ProductImageCache(
+    directory=settings.product_image_cache_dir,
+    max_bytes=settings.product_image_cache_max_bytes,
+)
+
+# One download per barcode at a time; concurrent requests for the same image share it.
+_inflight: dict[str, asyncio.Task] = {}
+
+
+async def product_image(barcode: str) -> tuple[CachedImage, os.stat_result]:
+    cached = await run_in_threadpool(image_cache.get, barcode)
+    if cached is not None:
+        return cached
+    task = _inflight.get(barcode)
+    if task is None:
+        task = asyncio.ensure_future(_fetch_thumbnail(barcode))
+        _inflight[barcode] = task
+        task.add_done_callback(lambda _: _inflight.pop(barcode, None))
+    entry = await asyncio.shield(task)
+    try:
+        return entry, await run_in_threadpool(os.stat, entry.path)
+    except FileNotFoundError:
+        # Evicted by another worker right after it was stored.
+        raise ImageUnavailable(barcode)
+
+
+async def _fetch_thumbnail(barcode: str) -> CachedImage:
+    # No latency budget here: a placeholder answer has no image to fetch.
+    product = await lookup_product(barcode, budget=0)
+    url = product.get("image")
+    if not url or not _allowed_source(url):
+        raise ImageUnavailable(barcode)
+    data = await _download(url)
+    thumbnail = await run_in_threadpool(make_thumbnail, data, settings.product_image_size)
+    return await run_in_threadpool(image_cache.store, barcode, thumbnail)
+
+
+async def _download(url: str) -> bytes:
+    import httpx
+
+    limit = settings.product_image_max_source_bytes
+    chunks: list[bytes] = []
+    received = 0
+    try:
+        async with openfoodfacts.client.stream("GET", url) as response:
+            if response.status_code != 200:
+                raise ImageUnavailable(f"{url}: HTTP {response.status_code}")
+            async for chunk in response.aiter_bytes():
+                received += len(chunk)
+                if received > limit:
+                    raise ImageUnavailable(f"{url}: larger than {limit} bytes")
+                chunks.append(chunk)
+    except httpx.HTTPError as exc:
+        raise ImageUnavailable(str(exc)) from exc
+    return b"".join(chunks)
+
+
+def _allowed_source(url: str) -> bool:
+    # Image URLs come from upstream data, so only fetch from the configured image hosts.
+    parts = urlsplit(url)
+    host = (parts.hostname or "").lower()
+    if parts.scheme not in {"http", "https"} or not host:
+        return False
+    return any(host == allowed or host.endswith("." + allowed) for allowed in settings.product_image_hosts)
@@ -1,40 +1,297 @@
-import requests
+import asyncio
+import time
+from typing import TYPE_CHECKING
 
-def lookup_product(barcode: str):
-    try:
-        url = f"https://world.openfoodfacts.org/api/v0/product/{barcode}.json"
-        res = requests.get(url, timeout=5)
+from starlette.concurrency import run_in_threadpool
+
+from app.circuit_breaker import OPEN, CircuitBreaker
+from app.core.config import get_settings
+from app.core.database import ReadSessionLocal
+from app.core.metrics import (
+    openfoodfacts_duration,
+    openfoodfacts_requests,
+    product_lookup_fallbacks,
+    product_lookups,
+)
+from app.product_cache import product_cache
+from app.services.catalog_service import CatalogService, product_result
+
+if TYPE_CHECKING:
+    import httpx
+
+
+settings = get_settings()
+
+
+class ProductNotFound(Exception):
+    pass
+
+
+class OpenFoodFactsClient:
+    def __init__(
+        self,
+        base_url: str,
+        timeout: float,
+        max_connections: int,
+        transport: "httpx.AsyncBaseTransport | None" = None,
+    ) -> None:
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.transport = transport
+        self._client: "httpx.AsyncClient | None" = None
+
+    @property
+    def client(self) -> "httpx.AsyncClient":
+        if self._client is None or self._client.is_closed:
+            # Imported on first use: httpx and its TLS setup are a noticeable part of cold start.
+            import httpx
+
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=self.timeout,
+                transport=self.transport,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+                headers={"User-Agent": "PantryApp/0.1"},
+            )
+        return self._client
+
+    async def get_product_json(self, barcode: str) -> "httpx.Response":
+        return await self.client.get(f"/api/v0/product/{barcode}.json")
+
+    async def fetch_product(self, barcode: str) -> dict:
+        res = await self.get_product_json(barcode)
 
+        if res.status_code == 404:
+            raise ProductNotFound(barcode)
         if res.status_code != 200:
             raise Exception("OpenFoodFacts error")
 
         data = res.json()
-        product = data.get("product", {})
+        result = product_result(data.get("product") or {})
+        if result is None:
+            raise ProductNotFound(barcode)
+        return result
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+catalog = CatalogService()
+
+openfoodfacts = OpenFoodFactsClient(
+    base_url=settings.openfoodfacts_base_url,
+    timeout=settings.openfoodfacts_timeout_seconds,
+    max_connections=settings.openfoodfacts_max_connections,
+)
+
+openfoodfacts_breaker = CircuitBreaker(
+    failure_threshold=settings.openfoodfacts_breaker_failure_threshold,
+    reset_seconds=settings.openfoodfacts_breaker_reset_seconds,
+)
+
+# One lookup per barcode at a time; concurrent callers await the same task. Upstream requests
+# are tracked separately so background revalidations share them too.
+_inflight: dict[str, asyncio.Task] = {}
+_upstream: dict[str, asyncio.Task] = {}
+
+
+async def lookup_product(barcode: str, budget: float | None = None) -> dict:
+    barcode = barcode.strip()
+    cached = product_cache.get_memory(barcode)
+    if cached is not None:
+        product_lookups.inc("memory")
+        return cached
+    stale = product_cache.get_memory(barcode, allow_stale=True)
+    if stale is not None:
+        product_lookups.inc("stale")
+        _revalidate(barcode)
+        return stale
+
+    task = _start_lookup(barcode, check_persistent=True)
+    if budget is None:
+        budget = settings.product_lookup_budget_seconds
+    if budget <= 0:
+        return dict(await asyncio.shield(task))
+    try:
+        return dict(await asyncio.wait_for(asyncio.shield(task), budget))
+    except asyncio.TimeoutError:
+        # The shielded lookup keeps going and caches its answer for the next scan.
+        product_lookups.inc("fallback")
+        product_lookup_fallbacks.inc("budget")
+        return _fallback(barcode)
+
+
+async def _lookup_coalesced(barcode: str, check_persistent: bool) -> dict:
+    return dict(await asyncio.shield(_start_lookup(barcode, check_persistent)))
 
-        name = (
-            product.get("product_name_de")
-            or product.get("product_name_en")
-            or product.get("product_name")
-            or product.get("generic_name")
-        )
 
-        image = product.get("image_front_url") or product.get("image_url")
-        brand = product.get("brands")
+def _start_lookup(barcode: str, check_persistent: bool) -> asyncio.Task:
+    task = _inflight.get(barcode)
+    if task is None:
+        task = asyncio.ensure_future(_resolve_product(barcode, check_persistent))
+        _inflight[barcode] = task
+        task.add_done_callback(lambda _: _inflight.pop(barcode, None))
+    return task
 
-        if not name:
-            raise Exception("No name")
 
-        return {
-            "name": name,
-            "image": image,
-            "brand": brand,
-            "found": True
-        }
+def _start_upstream(barcode: str) -> asyncio.Task:
+    task = _upstream.get(barcode)
+    if task is None:
+        task = asyncio.ensure_future(_fetch_upstream(barcode))
+        _upstream[barcode] = task
+        task.add_done_callback(lambda _: _upstream.pop(barcode, None))
+    return task
 
+
+def _revalidate(barcode: str) -> None:
+    # Refresh a stale entry in the background; while the circuit is open it is served as is.
+    if barcode not in _upstream and openfoodfacts_breaker.state != OPEN:
+        _start_upstream(barcode)
+
+
+async def _resolve_product(barcode: str, check_persistent: bool) -> dict:
+    if check_persistent:
+        local = await run_in_threadpool(lookup_local, [barcode])
+        if barcode in local:
+            product_lookups.inc("local")
+            return local[barcode]
+        stale = await run_in_threadpool(product_cache.get_many_stale, [barcode])
+        if barcode in stale:
+            product_lookups.inc("stale")
+            _revalidate(barcode)
+            return stale[barcode]
+    return await asyncio.shield(_start_upstream(barcode))
+
+
+async def _fetch_upstream(barcode: str) -> dict:
+    if not openfoodfacts_breaker.allow():
+        product_lookups.inc("fallback")
+        product_lookup_fallbacks.inc("circuit_open")
+        return _fallback(barcode)
+
+    started = time.perf_counter()
+    try:
+        result = await openfoodfacts.fetch_product(barcode)
+    except ProductNotFound:
+        openfoodfacts_breaker.record_success()
+        openfoodfacts_requests.inc("not_found")
+        product_lookups.inc("fallback")
+        product_lookup_fallbacks.inc("not_found")
+        result = _fallback(barcode)
+    except asyncio.CancelledError:
+        openfoodfacts_breaker.release()
+        raise
     except Exception:
-        return {
-            "name": f"Produkt {barcode}",
-            "image": None,
-            "brand": None,
-            "found": False
-        }
+        openfoodfacts_breaker.record_failure()
+        openfoodfacts_requests.inc("error")
+        product_lookups.inc("fallback")
+        product_lookup_fallbacks.inc("error")
+        # Upstream trouble is not a verdict on the barcode, so don't cache it.
+        return _fallback(barcode)
+    else:
+        openfoodfacts_breaker.record_success()
+        openfoodfacts_requests.inc("found")
+        product_lookups.inc("upstream")
+    finally:
+        openfoodfacts_duration.observe(time.perf_counter() - started)
+
+    await run_in_threadpool(product_cache.set, barcode, result)
+    return result
+
+
+async def lookup_products(barcodes: list[str], concurrency: int, timeout: float) -> dict[str, dict]:
+    results: dict[str, dict] = {}
+    pending: list[str] = []
+    for barcode in barcodes:
+        cached = product_cache.get_memory(barcode)
+        if cached is not None:
+            product_lookups.inc("memory")
+            results[barcode] = cached
+            continue
+        stale = product_cache.get_memory(barcode, allow_stale=True)
+        if stale is not None:
+            product_lookups.inc("stale")
+            _revalidate(barcode)
+            results[barcode] = stale
+        elif barcode not in _inflight:
+            pending.append(barcode)
+
+    if pending:
+        local = await run_in_threadpool(lookup_local, pending)
+        product_lookups.inc("local", amount=len(local))
+        results.update(local)
+        stale = await run_in_threadpool(product_cache.get_many_stale, [barcode for barcode in pending if barcode not in local])
+        product_lookups.inc("stale", amount=len(stale))
+        for barcode in stale:
+            _revalidate(barcode)
+        results.update(stale)
+    checked = set(pending)
+
+    missing = [barcode for barcode in barcodes if barcode not in results]
+    if not missing:
+        return results
+
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def fetch(barcode: str) -> None:
+        async with semaphore:
+            results[barcode] = await _lookup_coalesced(barcode, check_persistent=barcode not in checked)
+
+    tasks = [asyncio.ensure_future(fetch(barcode)) for barcode in missing]
+    _, unfinished = await asyncio.wait(tasks, timeout=timeout)
+    # Lookups already sent upstream are shielded, so they still finish and land in the cache.
+    for task in unfinished:
+        task.cancel()
+    for barcode in missing:
+        if barcode not in results:
+            product_lookups.inc("fallback")
+            product_lookup_fallbacks.inc("timeout")
+            results[barcode] = _fallback(barcode)
+    return results
+
+
+def upstream_status() -> dict:
+    return {
+        "circuit": openfoodfacts_breaker.snapshot(),
+        "latency_budget_seconds": settings.product_lookup_budget_seconds,
+        "stale_window_seconds": product_cache.stale_seconds,
+        "lookups_in_flight": len(_inflight),
+        "upstream_requests_in_flight": len(_upstream),
+    }
+
+
+def lookup_local(barcodes: list[str]) -> dict[str, dict]:
+    results: dict[str, dict] = {}
+    if settings.catalog_enabled:
+        try:
+            with ReadSessionLocal() as db:
+                results = catalog.lookup_many(db, barcodes)
+        except Exception:
+            results = {}
+        for barcode, result in results.items():
+            product_cache.remember(barcode, result)
+
+    remaining = [barcode for barcode in barcodes if barcode not in results]
+    if remaining:
+        results.update(product_cache.get_many_persistent(remaining))
+    return results
+
+
+def local_product_names(barcodes: list[str]) -> dict[str, str]:
+    # Names already known offline (catalog or earlier lookups); never calls OpenFoodFacts.
+    return {barcode: result["name"][:200] for barcode, result in lookup_local(barcodes).items() if result.get("found")}
+
+
+def _fallback(barcode: str) -> dict:
+    return {
+        "name": f"Produkt {barcode}",
+        "image": None,
+        "brand": None,
+        "found": False
+    }
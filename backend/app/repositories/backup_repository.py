@@ -0,0 +1,59 @@
+from typing import Iterator
+
+from sqlalchemy import delete, false, select
+from sqlalchemy.orm import Session
+
+
+class BackupRepository:
+    def stream_rows(self, db: Session, model, household_id: str, columns: list[str], batch_size: int) -> Iterator[list]:
+        # yield_per turns on stream_results: a server-side cursor on Postgres, lazy fetches on SQLite.
+        stmt = (
+            select(*(getattr(model, column) for column in columns))
+            .where(model.household_id == household_id)
+            .order_by(model.created_at.asc(), model.id.asc())
+            .execution_options(yield_per=batch_size)
+        )
+        yield from db.execute(stmt).partitions()
+
+    def stream_ids(self, db: Session, model, household_id: str, batch_size: int) -> Iterator[list[str]]:
+        stmt = select(model.id).where(model.household_id == household_id).execution_options(yield_per=batch_size)
+        for partition in db.execute(stmt).partitions():
+            yield [row[0] for row in partition]
+
+    def delete_household(self, db: Session, model, household_id: str) -> int:
+        return db.execute(delete(model).where(model.household_id == household_id)).rowcount
+
+    def name_owners(self, db: Session, model, household_id: str, keys: set[str], open_only: bool) -> dict[str, str]:
+        if not keys:
+            return {}
+        stmt = select(model.normalized_name, model.id).where(
+            model.household_id == household_id,
+            model.normalized_name.in_(keys),
+        )
+        if open_only:
+            stmt = stmt.where(model.completed == false())
+        return dict(db.execute(stmt).all())
+
+    def upsert_rows(self, db: Session, model, rows: list[dict]) -> None:
+        if not rows:
+            return
+        dialect = db.get_bind().dialect.name
+        if dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert
+        elif dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            for row in rows:
+                db.merge(model(**row))
+            db.flush()
+            return
+
+        table = model.__table__
+        stmt = insert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.id],
+            set_={column: stmt.excluded[column] for column in rows[0] if column != "id"},
+            # An id owned by another household is left alone.
+            where=table.c.household_id == stmt.excluded.household_id,
+        )
+        db.connection().execute(stmt, rows)
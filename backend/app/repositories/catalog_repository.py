@@ -0,0 +1,69 @@
+from typing import Iterable, Optional
+
+from sqlalchemy import or_, select
+from sqlalchemy.orm import Session
+
+from app.models.catalog_product import CatalogImportState, CatalogProduct
+
+
+UPSERT_COLUMNS = (
+    "product_name_de",
+    "product_name_en",
+    "product_name",
+    "generic_name",
+    "brands",
+    "image_front_url",
+    "image_url",
+    "last_modified_t",
+    "imported_at",
+)
+
+
+class CatalogRepository:
+    def get_products(self, db: Session, barcodes: Iterable[str]) -> list[CatalogProduct]:
+        stmt = select(CatalogProduct).where(CatalogProduct.barcode.in_(list(barcodes)))
+        return db.execute(stmt).scalars().all()
+
+    def upsert_products(self, db: Session, rows: list[dict]) -> None:
+        if not rows:
+            return
+        dialect = db.get_bind().dialect.name
+        if dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert
+        elif dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            self._merge_products(db, rows)
+            return
+
+        stmt = insert(CatalogProduct.__table__)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[CatalogProduct.barcode],
+            set_={column: stmt.excluded[column] for column in UPSERT_COLUMNS},
+            # Re-imports only overwrite rows with a newer (or unknown) modification time.
+            where=or_(
+                CatalogProduct.last_modified_t.is_(None),
+                stmt.excluded.last_modified_t.is_(None),
+                stmt.excluded.last_modified_t >= CatalogProduct.last_modified_t,
+            ),
+        )
+        # executemany keeps the compiled statement cached instead of rendering one huge VALUES list.
+        db.connection().execute(stmt, rows)
+
+    def _merge_products(self, db: Session, rows: list[dict]) -> None:
+        existing = {product.barcode: product for product in self.get_products(db, [row["barcode"] for row in rows])}
+        for row in rows:
+            product = existing.get(row["barcode"])
+            if product is None:
+                db.add(CatalogProduct(**row))
+                continue
+            if product.last_modified_t and row["last_modified_t"] and row["last_modified_t"] < product.last_modified_t:
+                continue
+            for column in UPSERT_COLUMNS:
+                setattr(product, column, row[column])
+
+    def get_import_state(self, db: Session, source: str) -> Optional[CatalogImportState]:
+        return db.get(CatalogImportState, source)
+
+    def save_import_state(self, db: Session, state: CatalogImportState) -> None:
+        db.add(state)
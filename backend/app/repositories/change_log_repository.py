@@ -0,0 +1,69 @@
+from datetime import datetime
+
+from sqlalchemy import and_, delete, func, insert, select, text
+from sqlalchemy.orm import Session, aliased
+
+from app.models.change_log_entry import ChangeLogEntry
+from app.repositories.household_version_repository import HouseholdVersionRepository
+
+
+# household_versions scope holding the newest seq pruned from each household's change log.
+PRUNED_SCOPE = "change_log_pruned"
+
+
+class ChangeLogRepository:
+    def __init__(self, versions: HouseholdVersionRepository | None = None) -> None:
+        self.versions = versions or HouseholdVersionRepository()
+
+    def record(self, db: Session, household_id: str, entity: str, upserts: list[tuple[str, dict]], deletes: list[str]) -> None:
+        # Runs inside the caller's transaction; the caller commits.
+        rows = [
+            {"household_id": household_id, "entity": entity, "entity_id": entity_id, "op": "upsert", "data": data}
+            for entity_id, data in upserts
+        ]
+        rows += [
+            {"household_id": household_id, "entity": entity, "entity_id": entity_id, "op": "delete", "data": None}
+            for entity_id in deletes
+        ]
+        if not rows:
+            return
+        if db.get_bind().dialect.name == "postgresql":
+            # Sequence values are handed out before commit; serializing a household's writers
+            # makes seq order match commit order, so `since` never skips a late committer.
+            db.execute(text("SELECT pg_advisory_xact_lock(hashtext(:household_id))"), {"household_id": household_id})
+        now = datetime.utcnow()
+        for row in rows:
+            row["created_at"] = now
+        db.execute(insert(ChangeLogEntry), rows)
+
+    def list_since(self, db: Session, household_id: str, since: int, limit: int) -> list[ChangeLogEntry]:
+        stmt = (
+            select(ChangeLogEntry)
+            .where(ChangeLogEntry.household_id == household_id, ChangeLogEntry.seq > since)
+            .order_by(ChangeLogEntry.seq.asc())
+            .limit(limit)
+        )
+        return db.execute(stmt).scalars().all()
+
+    def pruned_through(self, db: Session, household_id: str) -> int:
+        # A cursor below this seq may have missed entries that no longer exist.
+        return self.versions.get_version(db, household_id, PRUNED_SCOPE)
+
+    def prune(self, db: Session, before: datetime) -> int:
+        # Each household keeps its newest entry, so latest_seq still gives a valid checkpoint
+        # for a household that has been quiet longer than the retention period.
+        newer = aliased(ChangeLogEntry)
+        household_newest = (
+            select(func.max(newer.seq)).where(newer.household_id == ChangeLogEntry.household_id).scalar_subquery()
+        )
+        expired = and_(ChangeLogEntry.created_at < before, ChangeLogEntry.seq < household_newest)
+        watermarks = db.execute(
+            select(ChangeLogEntry.household_id, func.max(ChangeLogEntry.seq)).where(expired).group_by(ChangeLogEntry.household_id)
+        ).all()
+        for household_id, seq in watermarks:
+            self.versions.raise_to(db, household_id, PRUNED_SCOPE, seq)
+        return db.execute(delete(ChangeLogEntry).where(expired)).rowcount
+
+    def latest_seq(self, db: Session, household_id: str) -> int:
+        stmt = select(func.max(ChangeLogEntry.seq)).where(ChangeLogEntry.household_id == household_id)
+        return db.execute(stmt).scalar() or 0
@@ -0,0 +1,51 @@
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models.household_version import HouseholdVersion
+
+
+class HouseholdVersionRepository:
+    def get_version(self, db: Session, household_id: str, scope: str) -> int:
+        stmt = select(HouseholdVersion.version).where(
+            HouseholdVersion.household_id == household_id,
+            HouseholdVersion.scope == scope,
+        )
+        return db.execute(stmt).scalar() or 0
+
+    def bump(self, db: Session, household_id: str, scope: str) -> None:
+        # Runs inside the caller's transaction; the caller commits.
+        stmt = (
+            update(HouseholdVersion)
+            .where(HouseholdVersion.household_id == household_id, HouseholdVersion.scope == scope)
+            .values(version=HouseholdVersion.version + 1)
+            .execution_options(synchronize_session=False)
+        )
+        if db.execute(stmt).rowcount:
+            return
+        try:
+            with db.begin_nested():
+                db.add(HouseholdVersion(household_id=household_id, scope=scope, version=1))
+        except IntegrityError:
+            db.execute(stmt)
+
+    def raise_to(self, db: Session, household_id: str, scope: str, version: int) -> None:
+        # Runs inside the caller's transaction; the caller commits. Never lowers the value.
+        stmt = (
+            update(HouseholdVersion)
+            .where(
+                HouseholdVersion.household_id == household_id,
+                HouseholdVersion.scope == scope,
+                HouseholdVersion.version < version,
+            )
+            .values(version=version)
+            .execution_options(synchronize_session=False)
+        )
+        if db.execute(stmt).rowcount:
+            return
+        try:
+            with db.begin_nested():
+                db.add(HouseholdVersion(household_id=household_id, scope=scope, version=version))
+        except IntegrityError:
+            # The row exists already, at or above the value, or a concurrent prune just added it.
+            db.execute(stmt)
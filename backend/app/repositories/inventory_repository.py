@@ -1,14 +1,51 @@
 from typing import Iterable, Optional
 
-from sqlalchemy import func, select
+from sqlalchemy import and_, delete, func, or_, select, update
 from sqlalchemy.orm import Session
 
 from app.models.inventory_item import InventoryItem
+from app.names import name_key
+from app.repositories.returning import update_returning
 
 
 class InventoryRepository:
     def list_items(self, db: Session, household_id: str) -> Iterable[InventoryItem]:
-        stmt = select(InventoryItem).where(InventoryItem.household_id == household_id).order_by(InventoryItem.created_at.desc())
+        stmt = (
+            select(InventoryItem)
+            .where(InventoryItem.household_id == household_id)
+            .order_by(InventoryItem.created_at.desc(), InventoryItem.id.desc())
+        )
+        return db.execute(stmt).scalars().all()
+
+    def list_page(
+        self,
+        db: Session,
+        household_id: str,
+        columns: list[str],
+        limit: int | None = None,
+        after: tuple | None = None,
+    ) -> list:
+        stmt = select(*(getattr(InventoryItem, column) for column in columns))
+        stmt = stmt.where(InventoryItem.household_id == household_id)
+        if after is not None:
+            created_at, item_id = after
+            stmt = stmt.where(
+                or_(
+                    InventoryItem.created_at < created_at,
+                    and_(InventoryItem.created_at == created_at, InventoryItem.id < item_id),
+                )
+            )
+        stmt = stmt.order_by(InventoryItem.created_at.desc(), InventoryItem.id.desc())
+        if limit is not None:
+            stmt = stmt.limit(limit)
+        return db.execute(stmt).all()
+
+    def list_low_stock(self, db: Session, household_id: str) -> list[InventoryItem]:
+        stmt = (
+            select(InventoryItem)
+            .where(InventoryItem.household_id == household_id, InventoryItem.quantity < InventoryItem.min_quantity)
+            .order_by(InventoryItem.normalized_name.asc())
+        )
         return db.execute(stmt).scalars().all()
 
     def get_item(self, db: Session, item_id: str, household_id: str) -> Optional[InventoryItem]:
@@ -27,23 +64,107 @@ class InventoryRepository:
 
     def get_item_by_name(self, db: Session, name: str, household_id: str) -> Optional[InventoryItem]:
         stmt = select(InventoryItem).where(
-            func.lower(InventoryItem.name) == name.lower(),
+            InventoryItem.normalized_name == name_key(name),
             InventoryItem.household_id == household_id,
         )
         return db.execute(stmt).scalars().first()
 
-    def create_item(self, db: Session, item: InventoryItem) -> InventoryItem:
-        db.add(item)
-        db.commit()
-        db.refresh(item)
-        return item
-
-    def update_item(self, db: Session, item: InventoryItem) -> InventoryItem:
-        db.add(item)
-        db.commit()
-        db.refresh(item)
-        return item
-
-    def delete_item(self, db: Session, item: InventoryItem) -> None:
-        db.delete(item)
-        db.commit()
+    def find_by_barcodes_or_names(
+        self,
+        db: Session,
+        household_id: str,
+        barcodes: Iterable[str],
+        names: Iterable[str],
+    ) -> list[InventoryItem]:
+        barcodes = list(barcodes)
+        names = list(names)
+        conditions = []
+        if barcodes:
+            conditions.append(InventoryItem.barcode.in_(barcodes))
+        if names:
+            conditions.append(InventoryItem.normalized_name.in_([name_key(name) for name in names]))
+        if not conditions:
+            return []
+        stmt = (
+            select(InventoryItem)
+            .where(InventoryItem.household_id == household_id, or_(*conditions))
+            .order_by(InventoryItem.created_at.asc())
+            # Fresh values even for rows already in the session (e.g. after a rolled-back savepoint).
+            .execution_options(populate_existing=True)
+        )
+        return db.execute(stmt).scalars().all()
+
+    # The statements below run in the caller's transaction and leave the commit to it.
+
+    def add_items(self, db: Session, items: Iterable[InventoryItem]) -> None:
+        db.add_all(items)
+        db.flush()
+
+    def update_fields(self, db: Session, item_id: str, household_id: str, values: dict) -> Optional[InventoryItem]:
+        if "name" in values:
+            values = {**values, "normalized_name": name_key(values["name"])}
+        stmt = update(InventoryItem).where(InventoryItem.id == item_id, InventoryItem.household_id == household_id).values(**values)
+        return update_returning(db, stmt, InventoryItem, lambda: self.get_item(db, item_id, household_id))
+
+    def adjust_quantity(self, db: Session, item_id: str, household_id: str, delta: int) -> Optional[InventoryItem]:
+        stmt = (
+            update(InventoryItem)
+            .where(
+                InventoryItem.id == item_id,
+                InventoryItem.household_id == household_id,
+                InventoryItem.quantity + delta >= 0,
+            )
+            .values(quantity=InventoryItem.quantity + delta)
+        )
+        return update_returning(db, stmt, InventoryItem, lambda: self.get_item(db, item_id, household_id))
+
+    def increment_quantity(
+        self,
+        db: Session,
+        item_id: str,
+        household_id: str,
+        delta: int,
+        fill_barcode: str | None = None,
+    ) -> Optional[InventoryItem]:
+        values = {"quantity": InventoryItem.quantity + delta}
+        if fill_barcode:
+            values["barcode"] = func.coalesce(InventoryItem.barcode, fill_barcode)
+        stmt = update(InventoryItem).where(InventoryItem.id == item_id, InventoryItem.household_id == household_id).values(**values)
+        return update_returning(db, stmt, InventoryItem, lambda: db.get(InventoryItem, item_id, populate_existing=True))
+
+    def merge_quantity(
+        self,
+        db: Session,
+        household_id: str,
+        delta: int,
+        barcode: str | None = None,
+        name: str | None = None,
+        fill_barcode: str | None = None,
+    ) -> Optional[InventoryItem]:
+        # Matches by barcode if given, else by name; only the oldest matching row is touched.
+        if barcode:
+            match = InventoryItem.barcode == barcode
+        else:
+            match = InventoryItem.normalized_name == name_key(name)
+        target = (
+            select(InventoryItem.id)
+            .where(match, InventoryItem.household_id == household_id)
+            .order_by(InventoryItem.created_at.asc())
+            .limit(1)
+            .scalar_subquery()
+        )
+        values = {"quantity": InventoryItem.quantity + delta}
+        if fill_barcode:
+            values["barcode"] = func.coalesce(InventoryItem.barcode, fill_barcode)
+        stmt = update(InventoryItem).where(InventoryItem.id == target).values(**values)
+
+        def reload() -> Optional[InventoryItem]:
+            if barcode:
+                return self.get_item_by_barcode(db, barcode, household_id)
+            return self.get_item_by_name(db, name, household_id)
+
+        return update_returning(db, stmt, InventoryItem, reload)
+
+    def delete_by_id(self, db: Session, item_id: str, household_id: str) -> bool:
+        stmt = delete(InventoryItem).where(InventoryItem.id == item_id, InventoryItem.household_id == household_id)
+        return bool(db.execute(stmt.execution_options(synchronize_session=False)).rowcount)
@@ -0,0 +1,19 @@
+from typing import Callable, Optional, TypeVar
+
+from sqlalchemy import Update
+from sqlalchemy.orm import Session
+
+
+Model = TypeVar("Model")
+
+
+def update_returning(db: Session, stmt: Update, model: type[Model], reload: Callable[[], Optional[Model]]) -> Optional[Model]:
+    stmt = stmt.execution_options(synchronize_session=False)
+    if db.get_bind().dialect.update_returning:
+        returning = stmt.returning(model).execution_options(populate_existing=True)
+        return db.execute(returning).scalars().first()
+
+    # No RETURNING (e.g. SQLite < 3.35): the UPDATE is still atomic, reading the row back is the extra trip.
+    if not db.execute(stmt).rowcount:
+        return None
+    return reload()
@@ -0,0 +1,21 @@
+from sqlalchemy import select, true
+from sqlalchemy.orm import Session
+
+from app.models.inventory_item import InventoryItem
+from app.models.product_cache_entry import ProductCacheEntry
+
+
+class SearchRepository:
+    def load_items(self, db: Session, household_id: str) -> list:
+        stmt = select(
+            InventoryItem.id,
+            InventoryItem.name,
+            InventoryItem.category,
+            InventoryItem.barcode,
+            InventoryItem.quantity,
+        ).where(InventoryItem.household_id == household_id)
+        return db.execute(stmt).all()
+
+    def load_products(self, db: Session) -> list:
+        stmt = select(ProductCacheEntry.barcode, ProductCacheEntry.name).where(ProductCacheEntry.found == true())
+        return db.execute(stmt).all()
@@ -1,9 +1,13 @@
+from datetime import datetime
 from typing import Iterable, Optional
 
-from sqlalchemy import func, select
+from sqlalchemy import and_, case, delete, false, insert, literal, literal_column, or_, select, update
 from sqlalchemy.orm import Session
 
+from app.models.inventory_item import InventoryItem
 from app.models.shopping_list_item import ShoppingListItem
+from app.names import name_key
+from app.repositories.returning import update_returning
 
 
 class ShoppingListRepository:
@@ -11,10 +15,36 @@ class ShoppingListRepository:
         stmt = (
             select(ShoppingListItem)
             .where(ShoppingListItem.household_id == household_id)
-            .order_by(ShoppingListItem.completed.asc(), ShoppingListItem.created_at.desc())
+            .order_by(ShoppingListItem.completed.asc(), ShoppingListItem.created_at.desc(), ShoppingListItem.id.desc())
         )
         return db.execute(stmt).scalars().all()
 
+    def list_page(
+        self,
+        db: Session,
+        household_id: str,
+        columns: list[str],
+        limit: int | None = None,
+        after: tuple | None = None,
+    ) -> list:
+        stmt = select(*(getattr(ShoppingListItem, column) for column in columns))
+        stmt = stmt.where(ShoppingListItem.household_id == household_id)
+        if after is not None:
+            completed, created_at, item_id = after
+            same_group = and_(
+                ShoppingListItem.completed.is_(completed),
+                or_(
+                    ShoppingListItem.created_at < created_at,
+                    and_(ShoppingListItem.created_at == created_at, ShoppingListItem.id < item_id),
+                ),
+            )
+            # Open items sort first, so after an open item every completed item still follows.
+            stmt = stmt.where(same_group if completed else or_(ShoppingListItem.completed.is_(True), same_group))
+        stmt = stmt.order_by(ShoppingListItem.completed.asc(), ShoppingListItem.created_at.desc(), ShoppingListItem.id.desc())
+        if limit is not None:
+            stmt = stmt.limit(limit)
+        return db.execute(stmt).all()
+
     def get_item(self, db: Session, item_id: str, household_id: str) -> Optional[ShoppingListItem]:
         stmt = select(ShoppingListItem).where(
             ShoppingListItem.id == item_id,
@@ -24,24 +54,193 @@ class ShoppingListRepository:
 
     def get_item_by_name(self, db: Session, name: str, household_id: str) -> Optional[ShoppingListItem]:
         stmt = select(ShoppingListItem).where(
-            func.lower(ShoppingListItem.name) == name.lower(),
+            ShoppingListItem.normalized_name == name_key(name),
             ShoppingListItem.household_id == household_id,
             ShoppingListItem.completed.is_(False),
         )
         return db.execute(stmt).scalars().first()
 
-    def create_item(self, db: Session, item: ShoppingListItem) -> ShoppingListItem:
-        db.add(item)
-        db.commit()
-        db.refresh(item)
-        return item
-
-    def update_item(self, db: Session, item: ShoppingListItem) -> ShoppingListItem:
-        db.add(item)
-        db.commit()
-        db.refresh(item)
-        return item
-
-    def delete_item(self, db: Session, item: ShoppingListItem) -> None:
-        db.delete(item)
-        db.commit()
+    # The statements below run in the caller's transaction and leave the commit to it.
+
+    def add_items(self, db: Session, items: Iterable[ShoppingListItem]) -> None:
+        db.add_all(items)
+        db.flush()
+
+    def find_open_by_names(self, db: Session, household_id: str, names: Iterable[str]) -> list[ShoppingListItem]:
+        stmt = (
+            select(ShoppingListItem)
+            .where(
+                ShoppingListItem.normalized_name.in_([name_key(name) for name in names]),
+                ShoppingListItem.household_id == household_id,
+                ShoppingListItem.completed.is_(False),
+            )
+            .order_by(ShoppingListItem.created_at.asc())
+        )
+        return db.execute(stmt).scalars().all()
+
+    def increment_quantities(self, db: Session, household_id: str, deltas: dict[str, int]) -> list[ShoppingListItem]:
+        # One UPDATE for all rows; the new quantities come back from the database, not from Python.
+        # Rows completed or deleted in the meantime aren't returned.
+        if not deltas:
+            return []
+        stmt = (
+            update(ShoppingListItem)
+            .where(
+                ShoppingListItem.id.in_(deltas),
+                ShoppingListItem.household_id == household_id,
+                ShoppingListItem.completed.is_(False),
+            )
+            .values(quantity=ShoppingListItem.quantity + case(deltas, value=ShoppingListItem.id, else_=0))
+            .execution_options(synchronize_session=False)
+        )
+        if db.get_bind().dialect.update_returning:
+            returning = stmt.returning(ShoppingListItem).execution_options(populate_existing=True)
+            return db.execute(returning).scalars().all()
+
+        db.execute(stmt)
+        reload = (
+            select(ShoppingListItem)
+            .where(ShoppingListItem.id.in_(deltas), ShoppingListItem.completed.is_(False))
+            .execution_options(populate_existing=True)
+        )
+        return db.execute(reload).scalars().all()
+
+    def update_fields(self, db: Session, item_id: str, household_id: str, values: dict) -> Optional[ShoppingListItem]:
+        if "name" in values:
+            values = {**values, "normalized_name": name_key(values["name"])}
+        stmt = (
+            update(ShoppingListItem)
+            .where(ShoppingListItem.id == item_id, ShoppingListItem.household_id == household_id)
+            .values(**values)
+        )
+        return update_returning(db, stmt, ShoppingListItem, lambda: self.get_item(db, item_id, household_id))
+
+    def adjust_quantity(self, db: Session, item_id: str, household_id: str, delta: int) -> Optional[ShoppingListItem]:
+        stmt = (
+            update(ShoppingListItem)
+            .where(
+                ShoppingListItem.id == item_id,
+                ShoppingListItem.household_id == household_id,
+                ShoppingListItem.quantity + delta >= 1,
+            )
+            .values(quantity=ShoppingListItem.quantity + delta)
+        )
+        return update_returning(db, stmt, ShoppingListItem, lambda: self.get_item(db, item_id, household_id))
+
+    def merge_quantity(self, db: Session, name: str, household_id: str, delta: int) -> Optional[ShoppingListItem]:
+        # Only the oldest open row with that name is touched.
+        target = (
+            select(ShoppingListItem.id)
+            .where(
+                ShoppingListItem.normalized_name == name_key(name),
+                ShoppingListItem.household_id == household_id,
+                ShoppingListItem.completed.is_(False),
+            )
+            .order_by(ShoppingListItem.created_at.asc())
+            .limit(1)
+            .scalar_subquery()
+        )
+        stmt = (
+            update(ShoppingListItem)
+            .where(ShoppingListItem.id == target)
+            .values(quantity=ShoppingListItem.quantity + delta)
+        )
+        return update_returning(db, stmt, ShoppingListItem, lambda: self.get_item_by_name(db, name, household_id))
+
+    def restock_from_inventory(self, db: Session, household_id: str, now: datetime) -> tuple[set[str], set[str]]:
+        # Two statements instead of a loop over items: open entries are raised to the shortage,
+        # then entries are inserted for every low item without one. Returns the ids each one
+        # touched, so callers only report rows that actually changed.
+        low_stock = and_(
+            InventoryItem.household_id == household_id,
+            InventoryItem.quantity < InventoryItem.min_quantity,
+        )
+        shortage = InventoryItem.min_quantity - InventoryItem.quantity
+        open_entry = and_(
+            ShoppingListItem.household_id == household_id,
+            ShoppingListItem.completed.is_(False),
+        )
+        dialect = db.get_bind().dialect
+
+        matching_shortage = (
+            select(shortage)
+            .where(low_stock, InventoryItem.normalized_name == ShoppingListItem.normalized_name)
+            .limit(1)
+            .scalar_subquery()
+        )
+        too_low = and_(open_entry, ShoppingListItem.quantity < matching_shortage)
+        raise_open = (
+            update(ShoppingListItem)
+            .values(quantity=matching_shortage)
+            .execution_options(synchronize_session=False)
+        )
+        if dialect.update_returning:
+            updated = set(db.execute(raise_open.where(too_low).returning(ShoppingListItem.id)).scalars())
+        else:
+            # No RETURNING: pick the rows first; the UPDATE still re-checks them.
+            updated = set(db.execute(select(ShoppingListItem.id).where(too_low)).scalars())
+            if updated:
+                db.execute(raise_open.where(too_low, ShoppingListItem.id.in_(updated)))
+
+        has_open_entry = (
+            select(ShoppingListItem.id)
+            .where(open_entry, ShoppingListItem.normalized_name == InventoryItem.normalized_name)
+            .exists()
+        )
+        missing = select(
+            _new_id(dialect.name),
+            literal(household_id),
+            InventoryItem.name,
+            InventoryItem.normalized_name,
+            shortage,
+            false(),
+            literal(now),
+        ).where(low_stock, ~has_open_entry)
+        add_missing = insert(ShoppingListItem).from_select(
+            ["id", "household_id", "name", "normalized_name", "quantity", "completed", "created_at"],
+            missing,
+        )
+        if dialect.insert_returning:
+            created = set(db.execute(add_missing.returning(ShoppingListItem.id)).scalars())
+        else:
+            # The names had no open entry before the INSERT, so every open entry with them is new.
+            names = list(db.execute(select(InventoryItem.normalized_name).where(low_stock, ~has_open_entry)).scalars())
+            db.execute(add_missing)
+            new_entries = select(ShoppingListItem.id).where(open_entry, ShoppingListItem.normalized_name.in_(names))
+            created = set(db.execute(new_entries).scalars()) if names else set()
+        return updated, created
+
+    def list_open_for_low_stock(self, db: Session, household_id: str) -> list[ShoppingListItem]:
+        stmt = (
+            select(ShoppingListItem)
+            .join(
+                InventoryItem,
+                and_(
+                    InventoryItem.household_id == ShoppingListItem.household_id,
+                    InventoryItem.normalized_name == ShoppingListItem.normalized_name,
+                ),
+            )
+            .where(
+                ShoppingListItem.household_id == household_id,
+                ShoppingListItem.completed.is_(False),
+                InventoryItem.quantity < InventoryItem.min_quantity,
+            )
+            .order_by(ShoppingListItem.created_at.desc(), ShoppingListItem.id.desc())
+            .execution_options(populate_existing=True)
+        )
+        return db.execute(stmt).scalars().all()
+
+    def delete_by_id(self, db: Session, item_id: str, household_id: str) -> bool:
+        stmt = delete(ShoppingListItem).where(ShoppingListItem.id == item_id, ShoppingListItem.household_id == household_id)
+        return bool(db.execute(stmt.execution_options(synchronize_session=False)).rowcount)
+
+
+def _new_id(dialect_name: str):
+    # Row ids for INSERT ... SELECT have to come from the database: a random (v4-shaped) UUID.
+    if dialect_name == "postgresql":
+        return literal_column("gen_random_uuid()::text")
+    return literal_column(
+        "lower(hex(randomblob(4)) || '-' || hex(randomblob(2)) || '-4' || substr(hex(randomblob(2)), 2)"
+        " || '-' || substr('89ab', 1 + (abs(random()) % 4), 1) || substr(hex(randomblob(2)), 2)"
+        " || '-' || hex(randomblob(6)))"
+    )
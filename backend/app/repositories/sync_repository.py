@@ -0,0 +1,39 @@
+from datetime import datetime
+from typing import Iterable
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import Session
+
+from app.models.sync_operation_entry import SyncOperationEntry
+
+
+class SyncRepository:
+    def find_seen(self, db: Session, household_id: str, op_ids: Iterable[str]) -> dict[str, SyncOperationEntry]:
+        op_ids = list(op_ids)
+        if not op_ids:
+            return {}
+        stmt = select(SyncOperationEntry).where(
+            SyncOperationEntry.household_id == household_id,
+            SyncOperationEntry.op_id.in_(op_ids),
+        )
+        return {entry.op_id: entry for entry in db.execute(stmt).scalars().all()}
+
+    def record(self, db: Session, rows: list[dict]) -> None:
+        # Runs inside the caller's transaction; the caller commits.
+        if rows:
+            db.execute(insert(SyncOperationEntry), rows)
+
+    def get_rows(self, db: Session, model, household_id: str, ids: Iterable[str]) -> list:
+        ids = list(ids)
+        if not ids:
+            return []
+        stmt = (
+            select(model)
+            .where(model.household_id == household_id, model.id.in_(ids))
+            .execution_options(populate_existing=True)
+        )
+        return db.execute(stmt).scalars().all()
+
+    def prune(self, db: Session, before: datetime) -> int:
+        stmt = delete(SyncOperationEntry).where(SyncOperationEntry.created_at < before)
+        return db.execute(stmt).rowcount
@@ -0,0 +1,47 @@
+import io
+import tempfile
+from typing import Literal
+
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import StreamingResponse
+
+from app.core.database import DatabaseSession, ReadSessionLocal, get_session
+from app.schemas.backup import RestoreSummary
+from app.services.backup_service import MEDIA_TYPES, BackupService
+
+
+router = APIRouter(tags=["backup"])
+service = BackupService()
+
+Entity = Literal["inventory", "shopping-list"]
+
+# Uploads larger than this spill to a temporary file while they arrive.
+SPOOL_MEMORY_BYTES = 1024 * 1024
+
+
+@router.get("/export/{entity}")
+def export(entity: Entity, fmt: Literal["ndjson", "csv"] = Query("ndjson", alias="format")):
+    return StreamingResponse(
+        service.export(ReadSessionLocal, entity, fmt),
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{entity}.{fmt}"'},
+    )
+
+
+@router.post("/restore/{entity}", response_model=RestoreSummary)
+async def restore(
+    entity: Entity,
+    request: Request,
+    replace: bool = False,
+    db: DatabaseSession = Depends(get_session),
+):
+    # The body is spooled first so the restore can run as a single transaction.
+    with tempfile.SpooledTemporaryFile(max_size=SPOOL_MEMORY_BYTES) as spool:
+        async for chunk in request.stream():
+            spool.write(chunk)
+        spool.seek(0)
+        lines = io.TextIOWrapper(spool, encoding="utf-8", errors="replace", newline="")
+        try:
+            return await db.run(service.restore, entity, lines, replace)
+        finally:
+            lines.detach()
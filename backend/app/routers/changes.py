@@ -0,0 +1,76 @@
+import json
+import time
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, Query, Request
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+
+from app.change_feed import change_feed
+from app.core.config import get_settings
+from app.core.database import DatabaseSession, ReadSessionLocal, get_session
+from app.core.pagination import MAX_PAGE_SIZE
+from app.schemas.change import ChangeFeedResult
+from app.services.change_service import ChangeService
+
+
+router = APIRouter(prefix="/changes", tags=["changes"])
+service = ChangeService()
+settings = get_settings()
+
+# Comment line sent on idle streams so proxies and clients notice dead connections.
+HEARTBEAT_SECONDS = 15.0
+
+
+@router.get("", response_model=ChangeFeedResult)
+async def list_changes(
+    since: Optional[int] = Query(None, ge=0),
+    limit: int = Query(MAX_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: DatabaseSession = Depends(get_session),
+):
+    return await db.read(service.list_changes, since, limit)
+
+
+@router.get("/stream")
+async def stream_changes(
+    request: Request,
+    since: Optional[int] = Query(None, ge=0),
+    last_event_id: Optional[str] = Header(None),
+):
+    if last_event_id and last_event_id.isdigit():
+        since = int(last_event_id)
+
+    def poll(cursor: int | None) -> ChangeFeedResult:
+        with ReadSessionLocal() as db:
+            return service.list_changes(db, cursor, MAX_PAGE_SIZE)
+
+    async def events():
+        cursor = since
+        last_sent = time.monotonic()
+        with change_feed.subscribe() as subscription:
+            while not await request.is_disconnected():
+                result = await run_in_threadpool(poll, cursor)
+                if result.reset or cursor is None:
+                    yield _event("reset" if result.reset else "ready", {"next": result.next}, result.next)
+                    last_sent = time.monotonic()
+                for change in result.changes:
+                    yield _event("change", change.model_dump(mode="json"), change.seq)
+                    last_sent = time.monotonic()
+                cursor = result.next
+                if result.has_more:
+                    continue
+
+                await subscription.wait(settings.change_stream_poll_seconds)
+                if time.monotonic() - last_sent >= HEARTBEAT_SECONDS:
+                    yield ": ping\n\n"
+                    last_sent = time.monotonic()
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _event(name: str, data: dict, seq: int) -> str:
+    return f"id: {seq}\nevent: {name}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
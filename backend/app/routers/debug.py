@@ -0,0 +1,19 @@
+from fastapi import APIRouter
+
+from app.product_lookup import openfoodfacts
+
+# Development-only routes, mounted by the top-level main.py but not by app.main.
+router = APIRouter(prefix="/debug", tags=["debug"])
+
+
+@router.get("/off")
+async def debug_openfoodfacts():
+    try:
+        r = await openfoodfacts.get_product_json("5449000000996")
+        return {
+            "status_code": r.status_code,
+            "ok": r.is_success,
+            "json": r.json().get("product", {}).get("product_name")
+        }
+    except Exception as e:
+        return {"error": str(e)}
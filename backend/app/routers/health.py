@@ -1,8 +1,15 @@
 from fastapi import APIRouter
 
+from app.core.startup_profile import startup_profile
+
 router = APIRouter(tags=["health"])
 
 
 @router.get("/health")
 def health_check():
     return {"status": "ok"}
+
+
+@router.get("/health/startup")
+def startup_report():
+    return startup_profile.report()
@@ -1,41 +1,143 @@
-from fastapi import APIRouter, Depends, status
-from sqlalchemy.orm import Session
+from typing import Optional
 
-from app.core.database import get_db
-from app.schemas.inventory_item import InventoryItemCreate, InventoryItemRead, InventoryItemUpdate
-from app.services.inventory_service import InventoryService
+from fastapi import APIRouter, Depends, Query, Request, Response, status
+from starlette.concurrency import run_in_threadpool
+
+from app.core.database import DatabaseSession, get_session
+from app.core.http_cache import etag_matches, make_etag
+from app.core.pagination import MAX_PAGE_SIZE, parse_fields
+from app.core.serialization import dump_rows
+from app.list_cache import list_cache
+from app.product_lookup import local_product_names
+from app.scan_log import ScanLogImport, iter_lines
+from app.schemas.inventory_item import (
+    InventoryBulkRequest,
+    InventoryBulkResult,
+    InventoryItemCreate,
+    InventoryItemRead,
+    InventoryItemUpdate,
+)
+from app.schemas.scan_import import ScanImportSummary
+from app.schemas.search import SearchHit, SearchSuggestion
+from app.services.inventory_service import VERSION_SCOPE, InventoryService
+from app.services.search_service import SearchService
 
 
 router = APIRouter(prefix="/items", tags=["inventory"])
 service = InventoryService()
+search_service = SearchService()
+
+LIST_FIELDS = list(InventoryItemRead.model_fields)
 
 
 @router.get("", response_model=list[InventoryItemRead])
-def list_items(db: Session = Depends(get_db)):
-    return service.list_items(db)
+async def list_items(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    db: DatabaseSession = Depends(get_session),
+):
+    selected = parse_fields(fields, InventoryItemRead.model_fields)
+    version = await db.read(service.get_version)
+    etag = make_etag("inventory", version, limit, cursor, selected)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    columns = selected or LIST_FIELDS
+
+    async def render() -> tuple[bytes, str | None]:
+        # Column tuples straight to orjson: no ORM identity map and no per-row pydantic model.
+        rows, next_cursor = await db.read(service.list_page, columns, limit=limit, cursor=cursor)
+        return dump_rows(columns, rows), next_cursor
+
+    household_id = service.settings.household_id
+    key = list_cache.key(VERSION_SCOPE, household_id, limit, cursor, selected)
+    cached = await list_cache.fetch(VERSION_SCOPE, household_id, version, key, render)
+    if cached.next_cursor:
+        headers["X-Next-Cursor"] = cached.next_cursor
+    return Response(cached.body, media_type="application/json", headers=headers)
+
+
+@router.get("/low-stock", response_model=list[InventoryItemRead])
+async def list_low_stock(db: DatabaseSession = Depends(get_session)):
+    return await db.read(service.list_low_stock)
+
+
+@router.get("/search", response_model=list[SearchHit])
+async def search_items(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    db: DatabaseSession = Depends(get_session),
+):
+    return await db.read(search_service.search, q, limit)
+
+
+@router.get("/suggest", response_model=list[SearchSuggestion])
+async def suggest_items(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(8, ge=1, le=20),
+    db: DatabaseSession = Depends(get_session),
+):
+    return await db.read(search_service.suggest, q, limit)
 
 
 @router.post("", response_model=InventoryItemRead, status_code=status.HTTP_201_CREATED)
-def create_item(payload: InventoryItemCreate, db: Session = Depends(get_db)):
-    return service.create_item(db, payload)
+async def create_item(payload: InventoryItemCreate, db: DatabaseSession = Depends(get_session)):
+    return await db.run(service.create_item, payload)
+
+
+@router.post(":bulk", response_model=InventoryBulkResult)
+async def bulk_create_items(payload: InventoryBulkRequest, db: DatabaseSession = Depends(get_session)):
+    return await db.run(service.bulk_create, payload.items)
+
+
+@router.post(":import", response_model=ScanImportSummary)
+async def import_scan_log(
+    request: Request,
+    chunk_size: Optional[int] = Query(None, ge=1, le=5000),
+    db: DatabaseSession = Depends(get_session),
+):
+    # The body (plain text, CSV or NDJSON) is parsed as it arrives; each chunk of distinct codes
+    # is committed on its own, so an interrupted upload keeps the chunks already applied.
+    scan = ScanLogImport(
+        chunk_size=chunk_size or service.settings.scan_import_chunk_size,
+        max_errors=service.settings.scan_import_max_errors,
+    )
+
+    async def apply(chunk: dict[str, int]) -> None:
+        names = await run_in_threadpool(local_product_names, list(chunk))
+        scan.applied(*await db.run(service.import_scans, chunk, names))
+
+    async for line in iter_lines(request.stream()):
+        chunk = scan.feed(line)
+        if chunk:
+            await apply(chunk)
+    if scan.pending:
+        await apply(scan.take())
+    return scan.summary()
 
 
 @router.put("/{item_id}", response_model=InventoryItemRead)
-def update_item(item_id: str, payload: InventoryItemUpdate, db: Session = Depends(get_db)):
-    return service.update_item(db, item_id, payload)
+async def update_item(item_id: str, payload: InventoryItemUpdate, db: DatabaseSession = Depends(get_session)):
+    if not payload.model_dump(exclude_unset=True):
+        # Nothing to change: answer from a read session rather than taking the write lock.
+        return await db.read(service.get_item, item_id)
+    return await db.run(service.update_item, item_id, payload)
 
 
 @router.delete("/{item_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_item(item_id: str, db: Session = Depends(get_db)):
-    service.delete_item(db, item_id)
+async def delete_item(item_id: str, db: DatabaseSession = Depends(get_session)):
+    await db.run(service.delete_item, item_id)
     return None
 
 
 @router.post("/{item_id}/increment", response_model=InventoryItemRead)
-def increment_item(item_id: str, db: Session = Depends(get_db)):
-    return service.adjust_quantity(db, item_id, 1)
+async def increment_item(item_id: str, db: DatabaseSession = Depends(get_session)):
+    return await db.run(service.adjust_quantity, item_id, 1)
 
 
 @router.post("/{item_id}/decrement", response_model=InventoryItemRead)
-def decrement_item(item_id: str, db: Session = Depends(get_db)):
-    return service.adjust_quantity(db, item_id, -1)
+async def decrement_item(item_id: str, db: DatabaseSession = Depends(get_session)):
+    return await db.run(service.adjust_quantity, item_id, -1)
@@ -0,0 +1,82 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.change_feed import change_feed
+from app.circuit_breaker import CLOSED, HALF_OPEN, OPEN
+from app.core.database import write_queue
+from app.core.metrics import register_callback, registry
+from app.list_cache import list_cache
+from app.product_cache import product_cache
+from app.product_lookup import openfoodfacts_breaker
+
+router = APIRouter(tags=["metrics"])
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _cache_events() -> dict[tuple, float]:
+    values = {}
+    for name, cache in (("product", product_cache), ("list", list_cache)):
+        for event, value in cache.stats().items():
+            if event in {"memory_hits", "persistent_hits", "stale_hits", "shared_hits", "misses", "stores", "evictions", "errors"}:
+                values[(name, event)] = value
+    return values
+
+
+def _cache_entries() -> dict[tuple, float]:
+    return {
+        ("product",): product_cache.stats()["memory_size"],
+        ("list",): list_cache.stats()["memory_size"],
+    }
+
+
+register_callback("pantry_cache_events_total", "In-process cache hits, misses and evictions.", "counter", ("cache", "event"), _cache_events)
+register_callback("pantry_cache_entries", "Entries held in the in-process caches.", "gauge", ("cache",), _cache_entries)
+register_callback(
+    "pantry_change_stream_subscribers",
+    "Open /changes/stream connections in this worker.",
+    "gauge",
+    (),
+    lambda: {(): change_feed.subscriber_count()},
+)
+register_callback(
+    "pantry_openfoodfacts_circuit_state",
+    "OpenFoodFacts circuit breaker state; 1 for the current state.",
+    "gauge",
+    ("state",),
+    lambda: {(state,): int(openfoodfacts_breaker.state == state) for state in (CLOSED, HALF_OPEN, OPEN)},
+)
+register_callback(
+    "pantry_openfoodfacts_circuit_opened_total",
+    "Times the OpenFoodFacts circuit breaker opened.",
+    "counter",
+    (),
+    lambda: {(): openfoodfacts_breaker.snapshot()["opened"]},
+)
+register_callback(
+    "pantry_openfoodfacts_circuit_rejected_total",
+    "Upstream requests skipped because the circuit was open.",
+    "counter",
+    (),
+    lambda: {(): openfoodfacts_breaker.snapshot()["rejected"]},
+)
+if write_queue is not None:
+    register_callback(
+        "pantry_sqlite_write_queue_jobs_total",
+        "Write jobs committed through the SQLite write queue.",
+        "counter",
+        (),
+        lambda: {(): write_queue.jobs},
+    )
+    register_callback(
+        "pantry_sqlite_write_queue_commits_total",
+        "Group commits made by the SQLite write queue.",
+        "counter",
+        (),
+        lambda: {(): write_queue.batches},
+    )
+
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def metrics():
+    return PlainTextResponse(registry.render(), media_type=CONTENT_TYPE)
@@ -1,10 +1,94 @@
-from fastapi import APIRouter
-from app.product_lookup import lookup_product
+from fastapi import APIRouter, HTTPException, Request, Response, status
+from fastapi.responses import FileResponse
+from app.barcodes import normalize_barcode
+from app.core.config import get_settings
+from app.core.http_cache import etag_matches
+from app.product_cache import product_cache
+from app.product_images import MEDIA_TYPE, CachedImage, ImageUnavailable, image_cache, product_image
+from app.product_lookup import lookup_product, lookup_products, upstream_status
+from app.schemas.product import ProductLookupBatchRequest, ProductLookupBatchResult
 
 
 router = APIRouter()
+settings = get_settings()
 
 
 @router.get("/lookup/{barcode}")
-def lookup(barcode: str):
-    return lookup_product(barcode)
+async def lookup(barcode: str):
+    # Same cache key as the batch and image routes, so EAN/UPC variants share one entry.
+    key = normalize_barcode(barcode)
+    if key is None:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Invalid barcode.")
+    return await lookup_product(key)
+
+
+@router.post("/lookup:batch", response_model=ProductLookupBatchResult)
+async def lookup_batch(payload: ProductLookupBatchRequest):
+    if len(payload.barcodes) > settings.product_lookup_batch_max_size:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"At most {settings.product_lookup_batch_max_size} barcodes per batch.",
+        )
+
+    normalized: dict[str, str] = {}
+    invalid: list[str] = []
+    for barcode in payload.barcodes:
+        key = normalize_barcode(barcode)
+        if key:
+            normalized[barcode] = key
+        else:
+            invalid.append(barcode)
+
+    resolved = await lookup_products(
+        list(dict.fromkeys(normalized.values())),
+        concurrency=settings.product_lookup_batch_concurrency,
+        timeout=settings.product_lookup_batch_timeout_seconds,
+    )
+    return ProductLookupBatchResult(
+        results={barcode: resolved[key] for barcode, key in normalized.items()},
+        invalid=invalid,
+    )
+
+
+@router.get("/cache/stats")
+def cache_stats():
+    return product_cache.stats()
+
+
+@router.get("/upstream/status")
+def upstream():
+    return upstream_status()
+
+
+@router.get("/images/stats")
+def image_stats():
+    return image_cache.stats()
+
+
+def _image_headers(cached: CachedImage) -> dict[str, str]:
+    return {
+        "ETag": f'"{cached.etag}"',
+        "Cache-Control": f"public, max-age={settings.product_image_max_age_seconds}",
+    }
+
+
+@router.get("/{barcode}/image", response_class=FileResponse)
+async def image(barcode: str, request: Request):
+    key = normalize_barcode(barcode)
+    if key is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Image not found")
+    # Revalidations are answered from the index without touching the disk.
+    known = image_cache.peek(key)
+    if known is not None and etag_matches(request, f'"{known.etag}"'):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=_image_headers(known))
+    try:
+        # A file evicted by another worker fails the stat, reads as a miss and is fetched again.
+        cached, stat_result = await product_image(key)
+    except ImageUnavailable:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Image not found")
+
+    headers = _image_headers(cached)
+    if etag_matches(request, headers["ETag"]):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    # FileResponse streams straight from the file (sendfile where the server supports it).
+    return FileResponse(cached.path, media_type=MEDIA_TYPE, headers=headers, stat_result=stat_result)
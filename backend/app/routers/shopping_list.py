@@ -1,36 +1,83 @@
-from fastapi import APIRouter, Depends, status
-from sqlalchemy.orm import Session
+from typing import Optional
 
-from app.core.database import get_db
-from app.schemas.shopping_list_item import AlexaImportRequest, AlexaImportResult, ShoppingListItemCreate, ShoppingListItemRead, ShoppingListItemUpdate
-from app.services.shopping_list_service import ShoppingListService
+from fastapi import APIRouter, Depends, Query, Request, Response, status
+
+from app.core.database import DatabaseSession, get_session
+from app.core.http_cache import etag_matches, make_etag
+from app.core.pagination import MAX_PAGE_SIZE, parse_fields
+from app.core.serialization import dump_rows
+from app.list_cache import list_cache
+from app.schemas.shopping_list_item import (
+    AlexaImportRequest,
+    AlexaImportResult,
+    RestockResult,
+    ShoppingListItemCreate,
+    ShoppingListItemRead,
+    ShoppingListItemUpdate,
+)
+from app.services.shopping_list_service import VERSION_SCOPE, ShoppingListService
 
 
 router = APIRouter(prefix="/shopping-list", tags=["shopping-list"])
 service = ShoppingListService()
 
+LIST_FIELDS = list(ShoppingListItemRead.model_fields)
+
 
 @router.get("", response_model=list[ShoppingListItemRead])
-def list_items(db: Session = Depends(get_db)):
-    return service.list_items(db)
+async def list_items(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    db: DatabaseSession = Depends(get_session),
+):
+    selected = parse_fields(fields, ShoppingListItemRead.model_fields)
+    version = await db.read(service.get_version)
+    etag = make_etag("shopping_list", version, limit, cursor, selected)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    columns = selected or LIST_FIELDS
+
+    async def render() -> tuple[bytes, str | None]:
+        # Column tuples straight to orjson: no ORM identity map and no per-row pydantic model.
+        rows, next_cursor = await db.read(service.list_page, columns, limit=limit, cursor=cursor)
+        return dump_rows(columns, rows), next_cursor
+
+    household_id = service.settings.household_id
+    key = list_cache.key(VERSION_SCOPE, household_id, limit, cursor, selected)
+    cached = await list_cache.fetch(VERSION_SCOPE, household_id, version, key, render)
+    if cached.next_cursor:
+        headers["X-Next-Cursor"] = cached.next_cursor
+    return Response(cached.body, media_type="application/json", headers=headers)
 
 
 @router.post("", response_model=ShoppingListItemRead, status_code=status.HTTP_201_CREATED)
-def create_item(payload: ShoppingListItemCreate, db: Session = Depends(get_db)):
-    return service.create_item(db, payload)
+async def create_item(payload: ShoppingListItemCreate, db: DatabaseSession = Depends(get_session)):
+    return await db.run(service.create_item, payload)
+
+
+@router.post("/restock", response_model=RestockResult)
+async def restock(db: DatabaseSession = Depends(get_session)):
+    return await db.run(service.restock)
 
 
 @router.put("/{item_id}", response_model=ShoppingListItemRead)
-def update_item(item_id: str, payload: ShoppingListItemUpdate, db: Session = Depends(get_db)):
-    return service.update_item(db, item_id, payload)
+async def update_item(item_id: str, payload: ShoppingListItemUpdate, db: DatabaseSession = Depends(get_session)):
+    if not payload.model_dump(exclude_unset=True):
+        # Nothing to change: answer from a read session rather than taking the write lock.
+        return await db.read(service.get_item, item_id)
+    return await db.run(service.update_item, item_id, payload)
 
 
 @router.delete("/{item_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_item(item_id: str, db: Session = Depends(get_db)):
-    service.delete_item(db, item_id)
+async def delete_item(item_id: str, db: DatabaseSession = Depends(get_session)):
+    await db.run(service.delete_item, item_id)
     return None
 
 
 @router.post("/alexa-import", response_model=AlexaImportResult)
-def alexa_import(payload: AlexaImportRequest, db: Session = Depends(get_db)):
-    return service.import_from_alexa(db, payload.utterance)
+async def alexa_import(payload: AlexaImportRequest, db: DatabaseSession = Depends(get_session)):
+    return await db.run(service.import_from_alexa, payload.utterance)
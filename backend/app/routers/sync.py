@@ -0,0 +1,21 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+
+from app.core.config import get_settings
+from app.core.database import DatabaseSession, get_session
+from app.schemas.sync import SyncRequest, SyncResult
+from app.services.sync_service import SyncService
+
+
+router = APIRouter(tags=["sync"])
+service = SyncService()
+settings = get_settings()
+
+
+@router.post("/sync", response_model=SyncResult)
+async def sync(payload: SyncRequest, db: DatabaseSession = Depends(get_session)):
+    if len(payload.operations) > settings.sync_max_operations:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"At most {settings.sync_max_operations} operations per sync.",
+        )
+    return await db.run(service.apply, payload.operations)
@@ -0,0 +1,181 @@
+import codecs
+import csv
+import gzip
+import json
+import time
+from typing import AsyncIterable, AsyncIterator, Iterator
+
+from app.barcodes import is_valid_gtin, normalize_barcode
+from app.schemas.scan_import import ScanImportError, ScanImportSummary
+
+
+CODE_COLUMNS = ("barcode", "code", "gtin", "ean", "data")
+QUANTITY_COLUMNS = ("quantity", "qty", "count")
+MAX_LINE_LENGTH = 4096
+MAX_QUANTITY = 10000
+
+
+# Incremental parser for handheld scanner logs: one code per line as plain text, CSV (with or
+# without a header naming the code column) or NDJSON objects. Valid scans are summed per
+# normalized GTIN; feed() hands back a chunk once it holds chunk_size distinct codes, so memory
+# stays bounded by the chunk size rather than the file size.
+class ScanLogImport:
+    def __init__(self, chunk_size: int = 500, max_errors: int = 100) -> None:
+        self.chunk_size = max(1, chunk_size)
+        self.max_errors = max_errors
+        self.pending: dict[str, int] = {}
+        self.lines = 0
+        self.scans = 0
+        self.created = 0
+        self.merged = 0
+        self.chunks = 0
+        self.errors = 0
+        self.error_lines: list[ScanImportError] = []
+        self.started = time.monotonic()
+        self._format: str | None = None
+        self._delimiter = ","
+        self._code_index = 0
+        self._quantity_index: int | None = None
+
+    def feed(self, line: str) -> dict[str, int] | None:
+        self.lines += 1
+        text = line.strip().lstrip("\ufeff")
+        if not text:
+            return None
+        if len(text) > MAX_LINE_LENGTH:
+            self._error(None, "Line too long.")
+            return None
+        try:
+            parsed = self._parse(text)
+        except ValueError as exc:
+            self._error(text, str(exc))
+            return None
+        if parsed is None:
+            return None
+
+        raw, quantity = parsed
+        barcode = normalize_barcode(raw)
+        if not barcode:
+            self._error(raw, "No barcode digits.")
+            return None
+        if not is_valid_gtin(barcode):
+            self._error(raw, "Not a valid GTIN (length or check digit).")
+            return None
+
+        self.scans += 1
+        self.pending[barcode] = self.pending.get(barcode, 0) + quantity
+        if len(self.pending) >= self.chunk_size:
+            return self.take()
+        return None
+
+    def take(self) -> dict[str, int]:
+        chunk, self.pending = self.pending, {}
+        return chunk
+
+    def applied(self, created: int, merged: int) -> None:
+        self.chunks += 1
+        self.created += created
+        self.merged += merged
+
+    def summary(self) -> ScanImportSummary:
+        return ScanImportSummary(
+            lines=self.lines,
+            scans=self.scans,
+            created=self.created,
+            merged=self.merged,
+            chunks=self.chunks,
+            errors=self.errors,
+            error_lines=self.error_lines,
+            elapsed_seconds=round(time.monotonic() - self.started, 3),
+        )
+
+    def _parse(self, text: str) -> tuple[str, int] | None:
+        if self._format is None:
+            self._format = "ndjson" if text.startswith("{") else "csv"
+            if self._format == "csv" and self._read_header(text):
+                return None
+        if self._format == "ndjson":
+            return self._parse_json(text)
+        return self._parse_csv(text)
+
+    def _read_header(self, text: str) -> bool:
+        self._delimiter = next((delimiter for delimiter in ("\t", ";", ",") if delimiter in text), ",")
+        columns = [column.strip().lower() for column in next(csv.reader([text], delimiter=self._delimiter))]
+        code_index = next((columns.index(name) for name in CODE_COLUMNS if name in columns), None)
+        if code_index is None:
+            # No header: the code is the first column and every line counts once.
+            return False
+        self._code_index = code_index
+        self._quantity_index = next((columns.index(name) for name in QUANTITY_COLUMNS if name in columns), None)
+        return True
+
+    def _parse_csv(self, text: str) -> tuple[str, int]:
+        values = next(csv.reader([text], delimiter=self._delimiter), [])
+        if len(values) <= self._code_index or not values[self._code_index].strip():
+            raise ValueError("Missing barcode.")
+        quantity = values[self._quantity_index] if self._quantity_index is not None and len(values) > self._quantity_index else None
+        return values[self._code_index].strip(), self._quantity(quantity)
+
+    def _parse_json(self, text: str) -> tuple[str, int]:
+        try:
+            record = json.loads(text)
+        except ValueError:
+            raise ValueError("Invalid JSON.")
+        if not isinstance(record, dict):
+            raise ValueError("Expected a JSON object.")
+        code = next((record[name] for name in CODE_COLUMNS if record.get(name) not in (None, "")), None)
+        if code is None:
+            raise ValueError("Missing barcode.")
+        quantity = next((record[name] for name in QUANTITY_COLUMNS if record.get(name) is not None), None)
+        return str(code).strip(), self._quantity(quantity)
+
+    def _quantity(self, value) -> int:
+        if value is None or (isinstance(value, str) and not value.strip()):
+            return 1
+        try:
+            quantity = int(value.strip() if isinstance(value, str) else value)
+        except (TypeError, ValueError):
+            raise ValueError("Invalid quantity.")
+        if isinstance(value, bool) or not 1 <= quantity <= MAX_QUANTITY:
+            raise ValueError(f"Quantity must be between 1 and {MAX_QUANTITY}.")
+        return quantity
+
+    def _error(self, value: str | None, message: str) -> None:
+        self.errors += 1
+        if len(self.error_lines) < self.max_errors:
+            self.error_lines.append(ScanImportError(line=self.lines, value=value[:200] if value else None, error=message))
+
+
+def read_lines(path: str) -> Iterator[str]:
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8", errors="replace", newline="") as handle:
+        # readline(limit) keeps an endless line from being read whole; only its start is reported.
+        overlong = False
+        while line := handle.readline(MAX_LINE_LENGTH + 1):
+            if not overlong:
+                yield line
+            overlong = not line.endswith("\n") and len(line) > MAX_LINE_LENGTH
+
+
+async def iter_lines(chunks: AsyncIterable[bytes]) -> AsyncIterator[str]:
+    # Splits a byte stream into lines without buffering more than one line. An overlong line is
+    # passed on once, cut short, so the parser reports it; the rest of it is dropped.
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    buffer = ""
+    overlong = False
+    async for chunk in chunks:
+        buffer += decoder.decode(chunk)
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            if overlong:
+                overlong = False
+                continue
+            yield line
+        if len(buffer) > MAX_LINE_LENGTH:
+            if not overlong:
+                yield buffer
+            overlong = True
+            buffer = ""
+    buffer += decoder.decode(b"", final=True)
+    if buffer and not overlong:
+        yield buffer
@@ -0,0 +1,17 @@
+from pydantic import BaseModel
+
+
+class RestoreError(BaseModel):
+    line: int
+    error: str
+
+
+class RestoreSummary(BaseModel):
+    entity: str
+    replaced: bool
+    rows: int
+    restored: int
+    deleted: int
+    errors: int
+    error_lines: list[RestoreError]
+    elapsed_seconds: float
@@ -0,0 +1,11 @@
+from pydantic import BaseModel
+
+
+class CatalogImportSummary(BaseModel):
+    source: str
+    records_processed: int
+    products_upserted: int
+    errors: int
+    resumed_from: int
+    completed: bool
+    elapsed_seconds: float
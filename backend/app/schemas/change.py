@@ -0,0 +1,20 @@
+from datetime import datetime
+from typing import Any, Literal, Optional
+
+from pydantic import BaseModel
+
+
+class ChangeRead(BaseModel):
+    seq: int
+    entity: Literal["inventory", "shopping_list"]
+    id: str
+    op: Literal["upsert", "delete"]
+    data: Optional[dict[str, Any]] = None
+    changed_at: datetime
+
+
+class ChangeFeedResult(BaseModel):
+    changes: list[ChangeRead]
+    next: int
+    has_more: bool
+    reset: bool
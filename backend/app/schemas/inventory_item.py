@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Optional
+from typing import Literal, Optional
 
 from pydantic import BaseModel, Field
 
@@ -32,3 +32,19 @@ class InventoryItemRead(InventoryItemBase):
     model_config = {
         "from_attributes": True
     }
+
+
+class InventoryBulkRequest(BaseModel):
+    items: list[InventoryItemCreate] = Field(..., min_length=1, max_length=1000)
+
+
+class InventoryBulkEntry(BaseModel):
+    index: int
+    status: Literal["created", "merged"]
+    item: InventoryItemRead
+
+
+class InventoryBulkResult(BaseModel):
+    entries: list[InventoryBulkEntry]
+    created: int
+    merged: int
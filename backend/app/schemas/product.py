@@ -0,0 +1,19 @@
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+
+class ProductLookupResult(BaseModel):
+    name: str
+    image: Optional[str] = None
+    brand: Optional[str] = None
+    found: bool
+
+
+class ProductLookupBatchRequest(BaseModel):
+    barcodes: list[str] = Field(..., min_length=1)
+
+
+class ProductLookupBatchResult(BaseModel):
+    results: dict[str, ProductLookupResult]
+    invalid: list[str]
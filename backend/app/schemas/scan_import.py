@@ -0,0 +1,18 @@
+from pydantic import BaseModel
+
+
+class ScanImportError(BaseModel):
+    line: int
+    value: str | None
+    error: str
+
+
+class ScanImportSummary(BaseModel):
+    lines: int
+    scans: int
+    created: int
+    merged: int
+    chunks: int
+    errors: int
+    error_lines: list[ScanImportError]
+    elapsed_seconds: float
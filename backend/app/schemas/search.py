@@ -0,0 +1,18 @@
+from typing import Literal, Optional
+
+from pydantic import BaseModel
+
+
+class SearchHit(BaseModel):
+    kind: Literal["item", "product"]
+    id: str
+    name: str
+    category: Optional[str] = None
+    barcode: Optional[str] = None
+    quantity: Optional[int] = None
+    score: float
+
+
+class SearchSuggestion(BaseModel):
+    text: str
+    kind: Literal["item", "product"]
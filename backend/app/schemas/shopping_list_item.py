@@ -37,3 +37,9 @@ class AlexaImportRequest(BaseModel):
 class AlexaImportResult(BaseModel):
     created_items: list[ShoppingListItemRead]
     parsed_names: list[str]
+
+
+class RestockResult(BaseModel):
+    items: list[ShoppingListItemRead]
+    created: int
+    updated: int
@@ -0,0 +1,35 @@
+from typing import Literal, Optional
+
+from pydantic import BaseModel, Field
+
+from app.schemas.inventory_item import InventoryItemRead
+from app.schemas.shopping_list_item import ShoppingListItemRead
+
+
+class SyncOperation(BaseModel):
+    op_id: str = Field(..., min_length=1, max_length=64)
+    entity: Literal["inventory", "shopping_list"]
+    action: Literal["create", "update", "delta", "delete"]
+    # Row id; optional for create, where it becomes the new row's id unless the create merges.
+    id: Optional[str] = Field(None, min_length=1, max_length=36)
+    data: Optional[dict] = None
+    delta: Optional[int] = None
+
+
+class SyncRequest(BaseModel):
+    operations: list[SyncOperation] = Field(..., min_length=1)
+
+
+class SyncOperationResult(BaseModel):
+    op_id: str
+    status: Literal["applied", "duplicate", "rejected"]
+    id: Optional[str] = None
+    error: Optional[str] = None
+
+
+class SyncResult(BaseModel):
+    results: list[SyncOperationResult]
+    inventory: list[InventoryItemRead]
+    shopping_list: list[ShoppingListItemRead]
+    deleted_inventory: list[str]
+    deleted_shopping_list: list[str]
@@ -0,0 +1,258 @@
+import bisect
+import heapq
+import re
+import threading
+import unicodedata
+from typing import NamedTuple
+
+from app.names import name_key
+
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+# Relative weight of a match in each field; items outrank product names with the same text.
+NAME_WEIGHT = 1.0
+CATEGORY_WEIGHT = 0.5
+PRODUCT_WEIGHT = 0.9
+
+# Upper bounds that keep one-letter prefixes and very common words cheap to rank.
+MAX_PREFIX_TOKENS = 200
+MAX_CANDIDATE_DOCS = 2000
+
+
+class SearchDoc(NamedTuple):
+    kind: str
+    id: str
+    name: str
+    category: str | None
+    barcode: str | None
+    quantity: int | None
+
+
+class SearchMatch(NamedTuple):
+    doc: SearchDoc
+    score: float
+
+
+def fold(text: str | None) -> str:
+    # Case- and accent-insensitive form: "Crème Brûlée" -> "creme brulee".
+    decomposed = unicodedata.normalize("NFKD", name_key(text))
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def tokenize(text: str | None) -> list[str]:
+    return TOKEN_PATTERN.findall(fold(text))
+
+
+def _bigrams(token: str) -> set[str]:
+    padded = f"^{token}$"
+    return {padded[index:index + 2] for index in range(len(padded) - 1)}
+
+
+def _max_typos(token: str) -> int:
+    if len(token) < 4:
+        return 0
+    return 1 if len(token) < 8 else 2
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    # Optimal string alignment distance (adjacent swaps count once), giving up past `limit`.
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous2: list[int] = []
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, start=1):
+        current = [i] + [0] * len(b)
+        for j, cb in enumerate(b, start=1):
+            cost = 0 if ca == cb else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and ca == b[j - 2] and a[i - 2] == cb:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+# In-process token index over inventory items and known product names. Query words match index
+# words exactly, as a prefix, or within one or two typos (found through shared bigrams, then
+# checked with edit_distance). Every query word has to match; a document's score is the mean of
+# its best per-word match, weighted by the field it was found in.
+class SearchIndex:
+    def __init__(self) -> None:
+        self._lock = threading.RLock()
+        self._reset()
+
+    def _reset(self) -> None:
+        self._docs: dict[tuple[str, str], SearchDoc] = {}
+        self._doc_tokens: dict[tuple[str, str], dict[str, float]] = {}
+        self._folded_names: dict[tuple[str, str], str] = {}
+        self._postings: dict[str, dict[tuple[str, str], float]] = {}
+        self._sorted_tokens: list[str] = []
+        self._bigram_tokens: dict[str, set[str]] = {}
+        self._item_barcodes: dict[str, int] = {}
+        self.seq: int | None = None
+        self.products_refreshed = 0.0
+
+    @property
+    def ready(self) -> bool:
+        return self.seq is not None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._reset()
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def docs(self, kind: str) -> dict[str, SearchDoc]:
+        with self._lock:
+            return {doc_id: doc for (doc_kind, doc_id), doc in self._docs.items() if doc_kind == kind}
+
+    def put(self, doc: SearchDoc) -> None:
+        key = (doc.kind, doc.id)
+        tokens: dict[str, float] = {}
+        if doc.kind == "item":
+            for token in tokenize(doc.category):
+                tokens[token] = CATEGORY_WEIGHT
+            for token in tokenize(doc.name):
+                tokens[token] = NAME_WEIGHT
+        else:
+            for token in tokenize(doc.name):
+                tokens[token] = PRODUCT_WEIGHT
+        with self._lock:
+            self.remove(*key)
+            self._docs[key] = doc
+            self._doc_tokens[key] = tokens
+            self._folded_names[key] = " ".join(tokenize(doc.name))
+            for token, weight in tokens.items():
+                postings = self._postings.get(token)
+                if postings is None:
+                    postings = self._postings[token] = {}
+                    self._add_token(token)
+                postings[key] = weight
+            if doc.kind == "item" and doc.barcode:
+                self._item_barcodes[doc.barcode] = self._item_barcodes.get(doc.barcode, 0) + 1
+
+    def remove(self, kind: str, doc_id: str) -> None:
+        key = (kind, doc_id)
+        with self._lock:
+            doc = self._docs.pop(key, None)
+            if doc is None:
+                return
+            self._folded_names.pop(key, None)
+            for token in self._doc_tokens.pop(key, {}):
+                postings = self._postings[token]
+                postings.pop(key, None)
+                if not postings:
+                    del self._postings[token]
+                    self._remove_token(token)
+            if doc.kind == "item" and doc.barcode:
+                remaining = self._item_barcodes.get(doc.barcode, 1) - 1
+                if remaining:
+                    self._item_barcodes[doc.barcode] = remaining
+                else:
+                    self._item_barcodes.pop(doc.barcode, None)
+
+    def search(self, query: str, limit: int) -> list[SearchMatch]:
+        words = list(dict.fromkeys(tokenize(query)))
+        if not words:
+            return []
+        folded_query = " ".join(tokenize(query))
+        with self._lock:
+            # The rarest word picks the candidates; the other words are checked against each
+            # candidate's own tokens, so a common word never walks its whole posting list.
+            word_tokens = [self._match_tokens(word) for word in words]
+            if not all(word_tokens):
+                return []
+            word_tokens.sort(key=lambda tokens: sum(len(self._postings[token]) for token in tokens))
+            # A lone common word can stop early; with more words the rest still has to be found.
+            scores = self._candidates(word_tokens[0], MAX_CANDIDATE_DOCS if len(words) == 1 else MAX_CANDIDATE_DOCS * 10)
+            for tokens in word_tokens[1:]:
+                narrowed = {}
+                for key, score in scores.items():
+                    best = max((tokens.get(token, 0.0) * weight for token, weight in self._doc_tokens[key].items()), default=0.0)
+                    if best:
+                        narrowed[key] = score + best
+                scores = narrowed
+                if not scores:
+                    return []
+
+            ranked = []
+            for key, score in scores.items():
+                doc = self._docs[key]
+                if doc.kind == "product" and doc.barcode in self._item_barcodes:
+                    # The inventory item for this barcode already answers the query.
+                    continue
+                score /= len(words)
+                folded_name = self._folded_names[key]
+                if folded_name == folded_query or folded_name.startswith(folded_query + " "):
+                    score += 0.1
+                elif folded_name.startswith(folded_query):
+                    score += 0.05
+                ranked.append((-score, doc.kind != "item", len(doc.name), doc.name, key))
+        return [
+            SearchMatch(self._docs[key], round(-negative_score, 4))
+            for negative_score, _, _, _, key in heapq.nsmallest(limit, ranked)
+        ]
+
+    def _match_tokens(self, word: str) -> dict[str, float]:
+        # Index tokens that answer one query word, with how well they match it.
+        token_scores: dict[str, float] = {}
+        if word in self._postings:
+            token_scores[word] = 1.0
+
+        start = bisect.bisect_left(self._sorted_tokens, word)
+        for token in self._sorted_tokens[start:start + MAX_PREFIX_TOKENS]:
+            if not token.startswith(word):
+                break
+            if token != word:
+                token_scores[token] = 0.8 + 0.15 * len(word) / len(token)
+
+        typos = _max_typos(word)
+        if typos:
+            grams = _bigrams(word)
+            shared: dict[str, int] = {}
+            for gram in grams:
+                for token in self._bigram_tokens.get(gram, ()):
+                    shared[token] = shared.get(token, 0) + 1
+            # An edit changes at most three bigrams, so closer tokens share at least this many.
+            needed = max(1, len(grams) - 3 * typos)
+            for token, count in shared.items():
+                if count < needed or token in token_scores:
+                    continue
+                distance = edit_distance(word, token, typos)
+                if distance <= typos:
+                    token_scores[token] = 0.75 if distance == 1 else 0.55
+        return token_scores
+
+    def _candidates(self, token_scores: dict[str, float], cap: int) -> dict[tuple[str, str], float]:
+        # Best score per document, strongest token matches first, stopping once enough are found.
+        matches: dict[tuple[str, str], float] = {}
+        for token, token_score in sorted(token_scores.items(), key=lambda item: -item[1]):
+            for key, weight in self._postings[token].items():
+                score = token_score * weight
+                if score > matches.get(key, 0.0):
+                    matches[key] = score
+                if len(matches) >= cap:
+                    return matches
+        return matches
+
+    def _add_token(self, token: str) -> None:
+        bisect.insort(self._sorted_tokens, token)
+        for gram in _bigrams(token):
+            self._bigram_tokens.setdefault(gram, set()).add(token)
+
+    def _remove_token(self, token: str) -> None:
+        index = bisect.bisect_left(self._sorted_tokens, token)
+        if index < len(self._sorted_tokens) and self._sorted_tokens[index] == token:
+            del self._sorted_tokens[index]
+        for gram in _bigrams(token):
+            tokens = self._bigram_tokens.get(gram)
+            if tokens is not None:
+                tokens.discard(token)
+                if not tokens:
+                    del self._bigram_tokens[gram]
+
+
+search_index = SearchIndex()
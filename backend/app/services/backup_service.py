@@ -0,0 +1,198 @@
+import csv
+import io
+import itertools
+import json
+import time
+from datetime import datetime, timezone
+from typing import Callable, Iterable, Iterator, NamedTuple
+
+import orjson
+from pydantic import BaseModel, ValidationError
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.core.serialization import JSON_OPTIONS
+from app.models.inventory_item import InventoryItem
+from app.models.shopping_list_item import ShoppingListItem
+from app.names import name_key
+from app.repositories.backup_repository import BackupRepository
+from app.repositories.household_version_repository import HouseholdVersionRepository
+from app.schemas.backup import RestoreError, RestoreSummary
+from app.schemas.inventory_item import InventoryItemRead
+from app.schemas.shopping_list_item import ShoppingListItemRead
+from app.services.change_service import ChangeService
+from app.services.inventory_service import VERSION_SCOPE as INVENTORY_SCOPE
+from app.services.shopping_list_service import VERSION_SCOPE as SHOPPING_LIST_SCOPE
+
+
+class BackupEntity(NamedTuple):
+    model: type
+    schema: type[BaseModel]
+    scope: str
+    # Shopping list names only need to be unique among open entries.
+    open_names_only: bool
+
+
+ENTITIES = {
+    "inventory": BackupEntity(InventoryItem, InventoryItemRead, INVENTORY_SCOPE, False),
+    "shopping-list": BackupEntity(ShoppingListItem, ShoppingListItemRead, SHOPPING_LIST_SCOPE, True),
+}
+MEDIA_TYPES = {"csv": "text/csv; charset=utf-8", "ndjson": "application/x-ndjson"}
+MAX_REPORTED_ERRORS = 100
+
+
+class BackupService:
+    def __init__(
+        self,
+        repository: BackupRepository | None = None,
+        versions: HouseholdVersionRepository | None = None,
+        changes: ChangeService | None = None,
+    ) -> None:
+        self.repository = repository or BackupRepository()
+        self.versions = versions or HouseholdVersionRepository()
+        self.changes = changes or ChangeService()
+        self.settings = get_settings()
+
+    def export(self, session_factory: Callable[[], Session], entity: str, fmt: str) -> Iterator[bytes]:
+        # One encoded chunk per fetched batch, so memory is bounded by the batch size.
+        spec = ENTITIES[entity]
+        fields = list(spec.schema.model_fields)
+        with session_factory() as db:
+            if fmt == "csv":
+                yield self._encode_csv([fields])
+            batches = self.repository.stream_rows(
+                db,
+                spec.model,
+                self.settings.household_id,
+                fields,
+                self.settings.backup_batch_size,
+            )
+            for rows in batches:
+                if fmt == "csv":
+                    yield self._encode_csv([[_csv_value(value) for value in row] for row in rows])
+                else:
+                    yield b"".join(orjson.dumps(dict(zip(fields, row)), option=JSON_OPTIONS) + b"\n" for row in rows)
+
+    def restore(self, db: Session, entity: str, lines: Iterable[str], replace: bool = False) -> RestoreSummary:
+        # The whole restore is one transaction: it either lands completely or not at all.
+        spec = ENTITIES[entity]
+        household_id = self.settings.household_id
+        batch_size = self.settings.backup_batch_size
+        started = time.monotonic()
+        state = {"rows": 0, "restored": 0, "deleted": 0, "errors": 0}
+        error_lines: list[RestoreError] = []
+
+        def error(line: int, message: str) -> None:
+            state["errors"] += 1
+            if len(error_lines) < MAX_REPORTED_ERRORS:
+                error_lines.append(RestoreError(line=line, error=message))
+
+        if replace:
+            for ids in self.repository.stream_ids(db, spec.model, household_id, batch_size):
+                self.changes.record(db, spec.scope, [], ids)
+            state["deleted"] = self.repository.delete_household(db, spec.model, household_id)
+
+        batch: list[tuple[int, BaseModel]] = []
+        for line, record in self._records(lines):
+            if isinstance(record, str):
+                error(line, record)
+                continue
+            state["rows"] += 1
+            try:
+                item = spec.schema.model_validate({**record, "household_id": household_id})
+            except ValidationError as exc:
+                first = exc.errors()[0]
+                error(line, f"{'.'.join(str(part) for part in first['loc'])}: {first['msg']}")
+                continue
+            batch.append((line, item))
+            if len(batch) >= batch_size:
+                state["restored"] += self._restore_batch(db, spec, batch, error)
+                batch = []
+        if batch:
+            state["restored"] += self._restore_batch(db, spec, batch, error)
+
+        self.versions.bump(db, household_id, spec.scope)
+        db.commit()
+        return RestoreSummary(
+            entity=entity,
+            replaced=replace,
+            **state,
+            error_lines=sorted(error_lines, key=lambda item: item.line),
+            elapsed_seconds=round(time.monotonic() - started, 3),
+        )
+
+    def _restore_batch(self, db: Session, spec: BackupEntity, batch: list, error: Callable[[int, str], None]) -> int:
+        def claims_name(item) -> bool:
+            return not spec.open_names_only or not item.completed
+
+        keys = {name_key(item.name) for _, item in batch if claims_name(item)}
+        owners = self.repository.name_owners(db, spec.model, self.settings.household_id, keys, spec.open_names_only)
+        accepted = []
+        for line, item in batch:
+            if claims_name(item):
+                key = name_key(item.name)
+                owner = owners.setdefault(key, item.id)
+                if owner != item.id:
+                    error(line, "Name already used by another item.")
+                    continue
+            accepted.append(item)
+
+        rows = []
+        for item in accepted:
+            row = item.model_dump()
+            if row["created_at"].tzinfo is not None:
+                row["created_at"] = row["created_at"].astimezone(timezone.utc).replace(tzinfo=None)
+            row["normalized_name"] = name_key(row["name"])
+            rows.append(row)
+        self.repository.upsert_rows(db, spec.model, rows)
+        self.changes.record(db, spec.scope, [(item.id, item.model_dump(mode="json")) for item in accepted], [])
+        return len(accepted)
+
+    def _records(self, lines: Iterable[str]) -> Iterator[tuple[int, dict | str]]:
+        # Yields (line number, record) or (line number, error message); NDJSON or CSV with a header.
+        lines = iter(lines)
+        skipped = 0
+        for first in lines:
+            if first.strip():
+                break
+            skipped += 1
+        else:
+            return
+        first = first.lstrip("\ufeff")
+        if first.lstrip().startswith("{"):
+            for number, line in enumerate(itertools.chain([first], lines), start=skipped + 1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    yield number, "Invalid JSON."
+                    continue
+                yield number, record if isinstance(record, dict) else "Expected a JSON object."
+            return
+
+        reader = csv.reader(itertools.chain([first], lines))
+        header = [column.strip() for column in next(reader)]
+        for values in reader:
+            if not any(value.strip() for value in values):
+                continue
+            number = reader.line_num + skipped
+            if len(values) != len(header):
+                yield number, f"Expected {len(header)} columns, got {len(values)}."
+                continue
+            yield number, {column: value if value != "" else None for column, value in zip(header, values)}
+
+    def _encode_csv(self, rows: list[list]) -> bytes:
+        buffer = io.StringIO()
+        csv.writer(buffer, lineterminator="\n").writerows(rows)
+        return buffer.getvalue().encode()
+
+
+def _csv_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
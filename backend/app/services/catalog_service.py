@@ -0,0 +1,217 @@
+import csv
+import gzip
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from typing import Callable, Iterator, Mapping
+
+from sqlalchemy.orm import Session
+
+from app.models.catalog_product import CatalogImportState
+from app.repositories.catalog_repository import CatalogRepository
+from app.schemas.catalog import CatalogImportSummary
+
+
+CATALOG_FIELDS = {
+    "product_name_de": 300,
+    "product_name_en": 300,
+    "product_name": 300,
+    "generic_name": 300,
+    "brands": 300,
+    "image_front_url": 1000,
+    "image_url": 1000,
+}
+
+
+def product_result(fields: Mapping) -> dict | None:
+    name = (
+        fields.get("product_name_de")
+        or fields.get("product_name_en")
+        or fields.get("product_name")
+        or fields.get("generic_name")
+    )
+    if not name:
+        return None
+    return {
+        "name": name,
+        "image": fields.get("image_front_url") or fields.get("image_url"),
+        "brand": fields.get("brands"),
+        "found": True,
+    }
+
+
+class CatalogService:
+    def __init__(self, repository: CatalogRepository | None = None) -> None:
+        self.repository = repository or CatalogRepository()
+
+    def lookup_many(self, db: Session, barcodes: list[str]) -> dict[str, dict]:
+        keys = {barcode: self._catalog_keys(barcode) for barcode in barcodes}
+        products = self.repository.get_products(db, {key for candidates in keys.values() for key in candidates})
+        by_barcode = {product.barcode: product for product in products}
+
+        results: dict[str, dict] = {}
+        for barcode, candidates in keys.items():
+            for key in candidates:
+                product = by_barcode.get(key)
+                result = product_result({field: getattr(product, field) for field in CATALOG_FIELDS}) if product is not None else None
+                if result:
+                    results[barcode] = result
+                    break
+        return results
+
+    def import_dump(
+        self,
+        session_factory: Callable[[], Session],
+        path: str,
+        batch_size: int = 500,
+        restart: bool = False,
+        progress: Callable[[CatalogImportSummary], None] | None = None,
+    ) -> CatalogImportSummary:
+        source = os.path.abspath(path)
+        stat = os.stat(source)
+        signature = f"{stat.st_size}:{int(stat.st_mtime)}"
+        started = time.monotonic()
+
+        with session_factory() as db:
+            state = self.repository.get_import_state(db, source)
+            if state is None or state.signature != signature or restart:
+                state = state or CatalogImportState(source=source)
+                state.signature = signature
+                state.records_processed = 0
+                state.byte_offset = 0
+                state.products_upserted = 0
+                state.errors = 0
+                state.completed = False
+            elif state.completed:
+                return self._summary(state, resumed_from=state.records_processed, started=started)
+
+            resumed_from = state.records_processed
+            offset = state.byte_offset or 0
+            # Checkpoints written before byte offsets were recorded can only resume by count.
+            skip = resumed_from if resumed_from and not offset else 0
+            batch: dict[str, dict] = {}
+            position = resumed_from
+            for offset, record in self._iter_records(source, offset, skip):
+                position += 1
+                if record is None:
+                    state.errors += 1
+                    continue
+                row = self._catalog_row(record)
+                if row is not None:
+                    batch[row["barcode"]] = row
+                if len(batch) >= batch_size:
+                    self._flush(db, state, batch, position, offset)
+                    if progress:
+                        progress(self._summary(state, resumed_from, started))
+
+            self._flush(db, state, batch, position, offset, completed=True)
+            summary = self._summary(state, resumed_from, started)
+        if progress:
+            progress(summary)
+        return summary
+
+    def _flush(
+        self,
+        db: Session,
+        state: CatalogImportState,
+        batch: dict[str, dict],
+        position: int,
+        offset: int,
+        completed: bool = False,
+    ) -> None:
+        self.repository.upsert_products(db, list(batch.values()))
+        state.products_upserted += len(batch)
+        state.records_processed = position
+        state.byte_offset = offset
+        state.completed = completed
+        state.updated_at = datetime.utcnow()
+        self.repository.save_import_state(db, state)
+        # Progress is committed with the rows, so a restart resumes exactly after the last batch.
+        db.commit()
+        batch.clear()
+
+    def _iter_records(self, path: str, offset: int = 0, skip: int = 0) -> Iterator[tuple[int, Mapping | None]]:
+        # Yields each record with the offset just past it in the decompressed stream. The file is
+        # read as bytes so offsets are exact; a gzip seek still inflates up to the offset but skips
+        # decoding and parsing everything before it. `skip` passes over that many records first.
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, "rb") as handle:
+            name = path[:-3] if path.endswith(".gz") else path
+            if name.endswith((".jsonl", ".ndjson", ".json")):
+                handle.seek(offset)
+                for line in handle:
+                    offset += len(line)
+                    if not line.strip():
+                        continue
+                    if skip:
+                        skip -= 1
+                        continue
+                    try:
+                        yield offset, json.loads(line.decode("utf-8", "replace"))
+                    except ValueError:
+                        yield offset, None
+                return
+
+            header = handle.readline()
+            offset = max(offset, len(header))
+            handle.seek(offset)
+            text_header = header.decode("utf-8", "replace")
+            delimiter = "\t" if "\t" in text_header else ","
+            columns = next(csv.reader([text_header], delimiter=delimiter))
+            csv.field_size_limit(sys.maxsize)
+            quoting = csv.QUOTE_NONE if delimiter == "\t" else csv.QUOTE_MINIMAL
+
+            def lines() -> Iterator[str]:
+                # The reader pulls lines only until a row is complete, so `offset` ends each row.
+                nonlocal offset
+                for line in handle:
+                    offset += len(line)
+                    yield line.decode("utf-8", "replace")
+
+            for values in csv.reader(lines(), delimiter=delimiter, quoting=quoting):
+                if skip:
+                    skip -= 1
+                    continue
+                yield offset, dict(zip(columns, values))
+
+    def _catalog_row(self, record: Mapping) -> dict | None:
+        barcode = str(record.get("code") or "").strip()
+        if not barcode or len(barcode) > 64:
+            return None
+
+        row = {"barcode": barcode}
+        for field, max_length in CATALOG_FIELDS.items():
+            value = record.get(field)
+            if isinstance(value, str):
+                value = value.replace("\x00", "").strip()[:max_length] or None
+            else:
+                value = None
+            row[field] = value
+        if not product_result(row):
+            return None
+
+        try:
+            row["last_modified_t"] = int(record.get("last_modified_t") or 0) or None
+        except (TypeError, ValueError):
+            row["last_modified_t"] = None
+        row["imported_at"] = datetime.utcnow()
+        return row
+
+    def _catalog_keys(self, barcode: str) -> list[str]:
+        # OpenFoodFacts keys UPC-A codes as zero-padded EAN-13.
+        if len(barcode) == 12 and barcode.isdigit():
+            return [barcode, barcode.zfill(13)]
+        return [barcode]
+
+    def _summary(self, state: CatalogImportState, resumed_from: int, started: float) -> CatalogImportSummary:
+        return CatalogImportSummary(
+            source=state.source,
+            records_processed=state.records_processed,
+            products_upserted=state.products_upserted,
+            errors=state.errors,
+            resumed_from=resumed_from,
+            completed=state.completed,
+            elapsed_seconds=round(time.monotonic() - started, 3),
+        )
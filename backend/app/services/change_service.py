@@ -0,0 +1,66 @@
+import threading
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.change_feed import change_feed
+from app.core.config import get_settings
+from app.repositories.change_log_repository import ChangeLogRepository
+from app.schemas.change import ChangeFeedResult, ChangeRead
+
+
+# Prune expired change-log rows every N recorded writes instead of on every write.
+_PRUNE_INTERVAL = 256
+
+
+class ChangeService:
+    def __init__(self, repository: ChangeLogRepository | None = None) -> None:
+        self.repository = repository or ChangeLogRepository()
+        self.settings = get_settings()
+        self._writes_since_prune = 0
+        self._lock = threading.Lock()
+
+    def record(self, db: Session, entity: str, upserts: list[tuple[str, dict]], deletes: list[str]) -> None:
+        self.repository.record(db, self.settings.household_id, entity, upserts, deletes)
+        if self._should_prune():
+            self.repository.prune(db, datetime.utcnow() - timedelta(days=self.settings.change_log_retention_days))
+        deferred = db.info.get("deferred_after_commit")
+        if deferred is not None:
+            # Group commit: this session only releases a savepoint, the writer commits later.
+            deferred.append(change_feed.notify)
+        elif not db.info.get("notify_change_feed"):
+            db.info["notify_change_feed"] = True
+            event.listen(db, "after_commit", _notify_change_feed)
+
+    def list_changes(self, db: Session, since: int | None, limit: int) -> ChangeFeedResult:
+        household_id = self.settings.household_id
+        if since is None:
+            # Checkpoint for a client about to load the full lists.
+            latest = self.repository.latest_seq(db, household_id)
+            return ChangeFeedResult(changes=[], next=latest, has_more=False, reset=False)
+
+        if since < self.repository.pruned_through(db, household_id):
+            latest = self.repository.latest_seq(db, household_id)
+            return ChangeFeedResult(changes=[], next=latest, has_more=False, reset=True)
+
+        rows = self.repository.list_since(db, household_id, since, limit + 1)
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        changes = [
+            ChangeRead(seq=row.seq, entity=row.entity, id=row.entity_id, op=row.op, data=row.data, changed_at=row.created_at)
+            for row in rows
+        ]
+        return ChangeFeedResult(changes=changes, next=rows[-1].seq if rows else since, has_more=has_more, reset=False)
+
+    def _should_prune(self) -> bool:
+        with self._lock:
+            self._writes_since_prune += 1
+            if self._writes_since_prune < _PRUNE_INTERVAL:
+                return False
+            self._writes_since_prune = 0
+            return True
+
+
+def _notify_change_feed(session: Session) -> None:
+    change_feed.notify()
@@ -1,72 +1,306 @@
 from typing import Iterable
 
 from fastapi import HTTPException, status
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
+from app.barcodes import extract_gtin_from_gs1, normalize_barcode
 from app.core.config import get_settings
+from app.core.pagination import decode_cursor, encode_cursor
 from app.models.inventory_item import InventoryItem
+from app.names import name_key
+from app.repositories.household_version_repository import HouseholdVersionRepository
 from app.repositories.inventory_repository import InventoryRepository
-from app.schemas.inventory_item import InventoryItemCreate, InventoryItemUpdate
+from app.schemas.inventory_item import (
+    InventoryBulkEntry,
+    InventoryBulkResult,
+    InventoryItemCreate,
+    InventoryItemRead,
+    InventoryItemUpdate,
+)
+from app.services.change_service import ChangeService
+
+
+VERSION_SCOPE = "inventory"
 
 
 class InventoryService:
-    def __init__(self, repository: InventoryRepository | None = None) -> None:
+    def __init__(
+        self,
+        repository: InventoryRepository | None = None,
+        versions: HouseholdVersionRepository | None = None,
+        changes: ChangeService | None = None,
+    ) -> None:
         self.repository = repository or InventoryRepository()
+        self.versions = versions or HouseholdVersionRepository()
+        self.changes = changes or ChangeService()
         self.settings = get_settings()
 
     def list_items(self, db: Session) -> Iterable[InventoryItem]:
         return self.repository.list_items(db, self.settings.household_id)
 
+    def list_page(
+        self,
+        db: Session,
+        fields: list[str],
+        limit: int | None = None,
+        cursor: str | None = None,
+    ) -> tuple[list, str | None]:
+        after = tuple(decode_cursor(cursor, 2)) if cursor else None
+        # Plain column rows, requested fields first; the cursor keys trail when not requested.
+        columns = list(dict.fromkeys([*fields, "created_at", "id"]))
+        rows = self.repository.list_page(
+            db,
+            self.settings.household_id,
+            columns,
+            limit=limit + 1 if limit else None,
+            after=after,
+        )
+
+        next_cursor = None
+        if limit and len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            next_cursor = encode_cursor([last.created_at, last.id])
+        return rows, next_cursor
+
+    def list_low_stock(self, db: Session) -> list[InventoryItem]:
+        return self.repository.list_low_stock(db, self.settings.household_id)
+
+    def get_item(self, db: Session, item_id: str) -> InventoryItem:
+        return self._get_or_404(db, item_id)
+
+    def get_version(self, db: Session) -> int:
+        return self.versions.get_version(db, self.settings.household_id, VERSION_SCOPE)
+
     def create_item(self, db: Session, payload: InventoryItemCreate) -> InventoryItem:
+        item = self.apply_create(db, payload)
+        self._touch(db, changed=[item])
+        db.commit()
+        return item
+
+    # The apply_* methods run in the caller's transaction; the caller records the change and commits.
+
+    def apply_create(self, db: Session, payload: InventoryItemCreate, item_id: str | None = None) -> InventoryItem:
         normalized_barcode = self._normalize_barcode(payload.barcode)
+        normalized_name = self._normalize_name(payload.name)
+        household_id = self.settings.household_id
+
+        item = None
         if normalized_barcode:
-            existing = self.repository.get_item_by_barcode(db, normalized_barcode, self.settings.household_id)
-            if existing:
-                if not existing.barcode:
-                    existing.barcode = normalized_barcode
-                existing.quantity += payload.quantity
-                return self.repository.update_item(db, existing)
+            item = self.repository.merge_quantity(db, household_id, payload.quantity, barcode=normalized_barcode)
+        if item is None and normalized_name:
+            item = self.repository.merge_quantity(
+                db,
+                household_id,
+                payload.quantity,
+                name=normalized_name,
+                fill_barcode=normalized_barcode,
+            )
+        if item is None:
+            item = InventoryItem(
+                household_id=household_id,
+                name=payload.name,
+                barcode=normalized_barcode,
+                quantity=payload.quantity,
+                min_quantity=payload.min_quantity,
+                category=payload.category,
+            )
+            if item_id:
+                # Client-generated id (offline sync), so later operations can refer to the row.
+                item.id = item_id
+            try:
+                with db.begin_nested():
+                    self.repository.add_items(db, [item])
+            except IntegrityError:
+                # Another request created the same name first; merge into its row instead.
+                item = self.repository.merge_quantity(
+                    db,
+                    household_id,
+                    payload.quantity,
+                    name=normalized_name,
+                    fill_barcode=normalized_barcode,
+                )
+                if item is None:
+                    raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="An item with this id already exists.")
+        return item
 
-        normalized_name = self._normalize_name(payload.name)
-        if normalized_name:
-            existing_by_name = self.repository.get_item_by_name(db, normalized_name, self.settings.household_id)
-            if existing_by_name:
-                if normalized_barcode and not existing_by_name.barcode:
-                    existing_by_name.barcode = normalized_barcode
-                existing_by_name.quantity += payload.quantity
-                return self.repository.update_item(db, existing_by_name)
-
-        item = InventoryItem(
-            household_id=self.settings.household_id,
-            name=payload.name,
-            barcode=normalized_barcode,
-            quantity=payload.quantity,
-            min_quantity=payload.min_quantity,
-            category=payload.category,
+    def bulk_create(self, db: Session, payloads: list[InventoryItemCreate]) -> InventoryBulkResult:
+        try:
+            with db.begin_nested():
+                outcomes = self._merge_payloads(db, payloads)
+        except IntegrityError:
+            # A concurrent write created one of the names first; the retry merges into it.
+            with db.begin_nested():
+                outcomes = self._merge_payloads(db, payloads)
+        self._touch(db, changed=[item for _, item in outcomes])
+        # Serialize before the commit expires the instances, which would cost a SELECT per row.
+        result = InventoryBulkResult(
+            entries=[
+                InventoryBulkEntry(index=index, status=outcome, item=InventoryItemRead.model_validate(item))
+                for index, (outcome, item) in enumerate(outcomes)
+            ],
+            created=sum(1 for outcome, _ in outcomes if outcome == "created"),
+            merged=sum(1 for outcome, _ in outcomes if outcome == "merged"),
         )
-        return self.repository.create_item(db, item)
+        db.commit()
+        return result
+
+    def import_scans(self, db: Session, quantities: dict[str, int], names: dict[str, str]) -> tuple[int, int]:
+        # One chunk of a scanner log: normalized GTIN -> summed quantity, committed together.
+        payloads = [
+            InventoryItemCreate(name=names.get(barcode) or f"Produkt {barcode}", barcode=barcode, quantity=quantity)
+            for barcode, quantity in quantities.items()
+        ]
+        try:
+            with db.begin_nested():
+                outcomes = self._merge_payloads(db, payloads)
+        except IntegrityError:
+            # A concurrent write created one of the names first; the retry merges into it.
+            with db.begin_nested():
+                outcomes = self._merge_payloads(db, payloads)
+        self._touch(db, changed=[item for _, item in outcomes])
+        db.commit()
+        created = sum(1 for outcome, _ in outcomes if outcome == "created")
+        return created, len(outcomes) - created
+
+    def _merge_payloads(self, db: Session, payloads: list[InventoryItemCreate]) -> list[tuple[str, InventoryItem]]:
+        prepared = [
+            (payload, self._normalize_barcode(payload.barcode), self._normalize_name(payload.name))
+            for payload in payloads
+        ]
+        existing = self.repository.find_by_barcodes_or_names(
+            db,
+            self.settings.household_id,
+            barcodes={barcode for _, barcode, _ in prepared if barcode},
+            names={name for _, _, name in prepared if name},
+        )
+        by_barcode: dict[str, InventoryItem] = {}
+        by_name: dict[str, InventoryItem] = {}
+        for item in existing:
+            if item.barcode:
+                by_barcode.setdefault(item.barcode, item)
+            by_name.setdefault(item.normalized_name or name_key(item.name), item)
+
+        # Same precedence as create_item: barcode match first, then name, else a new row.
+        # Existing rows are only read here; their quantities are added below with atomic
+        # increments, so a concurrent adjustment in between isn't overwritten.
+        created: list[InventoryItem] = []
+        deltas: dict[str, int] = {}
+        fills: dict[str, str] = {}
+        outcomes: list[tuple[str, InventoryItem]] = []
+        for payload, barcode, name in prepared:
+            item = by_barcode.get(barcode) if barcode else None
+            if item is None and name:
+                item = by_name.get(name_key(name))
+            if item is None:
+                item = InventoryItem(
+                    household_id=self.settings.household_id,
+                    name=payload.name,
+                    barcode=barcode,
+                    quantity=payload.quantity,
+                    min_quantity=payload.min_quantity,
+                    category=payload.category,
+                )
+                created.append(item)
+                outcomes.append(("created", item))
+            elif item.id is None:
+                # Created earlier in this batch and not flushed yet.
+                if barcode and not item.barcode:
+                    item.barcode = barcode
+                item.quantity += payload.quantity
+                outcomes.append(("merged", item))
+            else:
+                deltas[item.id] = deltas.get(item.id, 0) + payload.quantity
+                if barcode and not item.barcode:
+                    fills.setdefault(item.id, barcode)
+                outcomes.append(("merged", item))
+            if barcode:
+                by_barcode.setdefault(barcode, item)
+            if name:
+                by_name.setdefault(name_key(name), item)
+
+        vanished: dict[str, InventoryItem] = {}
+        for item_id, delta in deltas.items():
+            merged = self.repository.increment_quantity(
+                db, item_id, self.settings.household_id, delta, fill_barcode=fills.get(item_id)
+            )
+            if merged is None:
+                # Deleted since the SELECT above; recreate it with the merged quantity.
+                old = next(item for _, item in outcomes if item.id == item_id)
+                vanished[item_id] = InventoryItem(
+                    household_id=self.settings.household_id,
+                    name=old.name,
+                    barcode=fills.get(item_id) or old.barcode,
+                    quantity=delta,
+                    min_quantity=old.min_quantity,
+                    category=old.category,
+                )
+        self.repository.add_items(db, [*created, *vanished.values()])
+        if not vanished:
+            return outcomes
+        result: list[tuple[str, InventoryItem]] = []
+        recreated: set[str] = set()
+        for outcome, item in outcomes:
+            replacement = vanished.get(item.id)
+            if replacement is not None:
+                outcome = "merged" if item.id in recreated else "created"
+                recreated.add(item.id)
+                item = replacement
+            result.append((outcome, item))
+        return result
 
     def update_item(self, db: Session, item_id: str, payload: InventoryItemUpdate) -> InventoryItem:
-        item = self._get_or_404(db, item_id)
+        if not payload.model_dump(exclude_unset=True):
+            return self._get_or_404(db, item_id)
+        item = self.apply_update(db, item_id, payload)
+        self._touch(db, changed=[item])
+        db.commit()
+        return item
+
+    def apply_update(self, db: Session, item_id: str, payload: InventoryItemUpdate) -> InventoryItem:
         data = payload.model_dump(exclude_unset=True)
-        for key, value in data.items():
-            setattr(item, key, value)
-        return self.repository.update_item(db, item)
+        if not data:
+            return self._get_or_404(db, item_id)
+        try:
+            with db.begin_nested():
+                item = self.repository.update_fields(db, item_id, self.settings.household_id, data)
+        except IntegrityError:
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="An item with this name already exists.")
+        if item is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Item not found.")
+        return item
 
     def delete_item(self, db: Session, item_id: str) -> None:
-        item = self._get_or_404(db, item_id)
-        self.repository.delete_item(db, item)
+        self.apply_delete(db, item_id)
+        self._touch(db, deleted=[item_id])
+        db.commit()
+
+    def apply_delete(self, db: Session, item_id: str) -> None:
+        if not self.repository.delete_by_id(db, item_id, self.settings.household_id):
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Item not found.")
 
     def adjust_quantity(self, db: Session, item_id: str, delta: int) -> InventoryItem:
-        item = self._get_or_404(db, item_id)
-        new_value = item.quantity + delta
-        if new_value < 0:
+        item = self.apply_delta(db, item_id, delta)
+        self._touch(db, changed=[item])
+        db.commit()
+        return item
+
+    def apply_delta(self, db: Session, item_id: str, delta: int) -> InventoryItem:
+        item = self.repository.adjust_quantity(db, item_id, self.settings.household_id, delta)
+        if item is None:
+            # Either the row is missing or the guard refused to go below zero.
+            self._get_or_404(db, item_id)
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Quantity cannot be negative.",
             )
-        item.quantity = new_value
-        return self.repository.update_item(db, item)
+        return item
+
+    def _touch(self, db: Session, changed: Iterable[InventoryItem] = (), deleted: Iterable[str] = ()) -> None:
+        self.versions.bump(db, self.settings.household_id, VERSION_SCOPE)
+        upserts = {item.id: InventoryItemRead.model_validate(item).model_dump(mode="json") for item in changed}
+        self.changes.record(db, VERSION_SCOPE, list(upserts.items()), list(deleted))
 
     def _get_or_404(self, db: Session, item_id: str) -> InventoryItem:
         item = self.repository.get_item(db, item_id, self.settings.household_id)
@@ -75,34 +309,10 @@ class InventoryService:
         return item
 
     def _normalize_barcode(self, barcode: str | None) -> str | None:
-        if not barcode:
-            return None
-        cleaned = "".join(ch for ch in barcode if ch.isdigit())
-        if not cleaned:
-            return None
-        gtin_from_gs1 = self._extract_gtin_from_gs1(cleaned)
-        if gtin_from_gs1:
-            cleaned = gtin_from_gs1
-
-        # Normalize UPC/EAN variants so the same product maps to one key.
-        if len(cleaned) == 14 and cleaned.startswith("0"):
-            cleaned = cleaned[1:]
-        if len(cleaned) == 13 and cleaned.startswith("0"):
-            return cleaned[1:]
-        if len(cleaned) == 12:
-            return cleaned
-        return cleaned
+        return normalize_barcode(barcode)
 
     def _extract_gtin_from_gs1(self, digits: str) -> str | None:
-        marker = "01"
-        marker_index = digits.find(marker)
-        if marker_index == -1:
-            return None
-        start = marker_index + len(marker)
-        end = start + 14
-        if len(digits) < end:
-            return None
-        return digits[start:end]
+        return extract_gtin_from_gs1(digits)
 
     def _normalize_name(self, name: str | None) -> str | None:
         if not name:
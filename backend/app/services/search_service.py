@@ -0,0 +1,97 @@
+import threading
+import time
+
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.repositories.change_log_repository import ChangeLogRepository
+from app.repositories.search_repository import SearchRepository
+from app.schemas.search import SearchHit, SearchSuggestion
+from app.search_index import SearchDoc, SearchIndex, fold, search_index
+from app.services.inventory_service import VERSION_SCOPE
+
+
+# Change-log entries applied per query while catching the index up.
+CATCH_UP_PAGE = 1000
+
+
+class SearchService:
+    def __init__(
+        self,
+        index: SearchIndex | None = None,
+        repository: SearchRepository | None = None,
+        changes: ChangeLogRepository | None = None,
+    ) -> None:
+        self.index = index if index is not None else search_index
+        self.repository = repository or SearchRepository()
+        self.changes = changes or ChangeLogRepository()
+        self.settings = get_settings()
+        self._sync_lock = threading.Lock()
+
+    def search(self, db: Session, query: str, limit: int) -> list[SearchHit]:
+        self.sync(db)
+        return [
+            SearchHit(**match.doc._asdict(), score=match.score)
+            for match in self.index.search(query, limit)
+        ]
+
+    def suggest(self, db: Session, query: str, limit: int) -> list[SearchSuggestion]:
+        self.sync(db)
+        suggestions: dict[str, SearchSuggestion] = {}
+        for match in self.index.search(query, limit * 4):
+            suggestions.setdefault(fold(match.doc.name), SearchSuggestion(text=match.doc.name, kind=match.doc.kind))
+            if len(suggestions) >= limit:
+                break
+        return list(suggestions.values())
+
+    def sync(self, db: Session) -> None:
+        # Every inventory write lands in the change log, so replaying it since the last seen seq
+        # keeps the index current across workers for the cost of one indexed query per search.
+        household_id = self.settings.household_id
+        with self._sync_lock:
+            if self.index.ready and self.index.seq < self.changes.pruned_through(db, household_id):
+                # Entries the index hasn't applied were pruned; only a rebuild is safe.
+                self.index.clear()
+            if not self.index.ready:
+                self._rebuild(db, household_id)
+            else:
+                self._catch_up(db, household_id)
+            if time.monotonic() - self.index.products_refreshed >= self.settings.search_product_refresh_seconds:
+                self._refresh_products(db)
+
+    def _rebuild(self, db: Session, household_id: str) -> None:
+        # The seq is read before the rows: anything committed in between is simply replayed.
+        seq = self.changes.latest_seq(db, household_id)
+        self.index.clear()
+        for row in self.repository.load_items(db, household_id):
+            self.index.put(SearchDoc("item", row.id, row.name, row.category, row.barcode, row.quantity))
+        self.index.seq = seq
+        self._catch_up(db, household_id)
+
+    def _catch_up(self, db: Session, household_id: str) -> None:
+        while True:
+            entries = self.changes.list_since(db, household_id, self.index.seq, CATCH_UP_PAGE)
+            for entry in entries:
+                if entry.entity != VERSION_SCOPE:
+                    continue
+                if entry.op == "delete" or not entry.data:
+                    self.index.remove("item", entry.entity_id)
+                else:
+                    data = entry.data
+                    self.index.put(SearchDoc("item", entry.entity_id, data["name"], data.get("category"), data.get("barcode"), data.get("quantity")))
+            if entries:
+                self.index.seq = entries[-1].seq
+            if len(entries) < CATCH_UP_PAGE:
+                return
+
+    def _refresh_products(self, db: Session) -> None:
+        # The whole found set is reloaded (product_cache keeps it within max_rows), so products
+        # pruned or invalidated there leave the index as well and it stays as bounded as the table.
+        indexed = self.index.docs("product")
+        for row in self.repository.load_products(db):
+            doc = indexed.pop(row.barcode, None)
+            if doc is None or doc.name != row.name:
+                self.index.put(SearchDoc("product", row.barcode, row.name, None, row.barcode, None))
+        for barcode in indexed:
+            self.index.remove("product", barcode)
+        self.index.products_refreshed = time.monotonic()
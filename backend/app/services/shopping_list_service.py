@@ -1,62 +1,245 @@
 import re
+from datetime import datetime
 from typing import Iterable
 
 from fastapi import HTTPException, status
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
 from app.core.config import get_settings
+from app.core.pagination import decode_cursor, encode_cursor
 from app.models.shopping_list_item import ShoppingListItem
+from app.names import name_key
+from app.repositories.household_version_repository import HouseholdVersionRepository
 from app.repositories.shopping_list_repository import ShoppingListRepository
-from app.schemas.shopping_list_item import AlexaImportResult, ShoppingListItemCreate, ShoppingListItemRead, ShoppingListItemUpdate
+from app.schemas.shopping_list_item import (
+    AlexaImportResult,
+    RestockResult,
+    ShoppingListItemCreate,
+    ShoppingListItemRead,
+    ShoppingListItemUpdate,
+)
+from app.services.change_service import ChangeService
+
+
+VERSION_SCOPE = "shopping_list"
+
+# Compiled once at import; the Alexa parser runs these for every utterance part.
+ALEXA_SEPARATOR_PATTERN = re.compile(r"\b(?:und|sowie|plus|mit)\b|[;,]")
+ALEXA_PREFIX_PATTERN = re.compile(r"^(?:(?:bitte|füge|setz|setze|auf|meine|meiner|liste|einkaufsliste)\s+)+", re.IGNORECASE)
+ALEXA_QUANTITY_PATTERN = re.compile(r"^(\d+)\s*(x|mal|stk|stück|packung|packungen)?\s+(.+)$", re.IGNORECASE)
 
 
 class ShoppingListService:
-    def __init__(self, repository: ShoppingListRepository | None = None) -> None:
+    def __init__(
+        self,
+        repository: ShoppingListRepository | None = None,
+        versions: HouseholdVersionRepository | None = None,
+        changes: ChangeService | None = None,
+    ) -> None:
         self.repository = repository or ShoppingListRepository()
+        self.versions = versions or HouseholdVersionRepository()
+        self.changes = changes or ChangeService()
         self.settings = get_settings()
 
     def list_items(self, db: Session) -> Iterable[ShoppingListItem]:
         return self.repository.list_items(db, self.settings.household_id)
 
+    def list_page(
+        self,
+        db: Session,
+        fields: list[str],
+        limit: int | None = None,
+        cursor: str | None = None,
+    ) -> tuple[list, str | None]:
+        after = None
+        if cursor:
+            completed, created_at, item_id = decode_cursor(cursor, 3)
+            after = (bool(completed), created_at, item_id)
+        # Plain column rows, requested fields first; the cursor keys trail when not requested.
+        columns = list(dict.fromkeys([*fields, "completed", "created_at", "id"]))
+        rows = self.repository.list_page(
+            db,
+            self.settings.household_id,
+            columns,
+            limit=limit + 1 if limit else None,
+            after=after,
+        )
+
+        next_cursor = None
+        if limit and len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            next_cursor = encode_cursor([last.completed, last.created_at, last.id])
+        return rows, next_cursor
+
+    def get_item(self, db: Session, item_id: str) -> ShoppingListItem:
+        return self._get_or_404(db, item_id)
+
+    def get_version(self, db: Session) -> int:
+        return self.versions.get_version(db, self.settings.household_id, VERSION_SCOPE)
+
     def create_item(self, db: Session, payload: ShoppingListItemCreate) -> ShoppingListItem:
+        item = self.apply_create(db, payload)
+        self._touch(db, changed=[item])
+        db.commit()
+        return item
+
+    # The apply_* methods run in the caller's transaction; the caller records the change and commits.
+
+    def apply_create(self, db: Session, payload: ShoppingListItemCreate, item_id: str | None = None) -> ShoppingListItem:
         normalized_name = self._normalize_name(payload.name)
-        existing = self.repository.get_item_by_name(db, normalized_name, self.settings.household_id)
-        if existing:
-            existing.quantity += payload.quantity
-            return self.repository.update_item(db, existing)
-
-        item = ShoppingListItem(
-            household_id=self.settings.household_id,
-            name=normalized_name,
-            quantity=payload.quantity,
-            completed=False,
-        )
-        return self.repository.create_item(db, item)
+        item = self.repository.merge_quantity(db, normalized_name, self.settings.household_id, payload.quantity)
+        if item is None:
+            item = ShoppingListItem(
+                household_id=self.settings.household_id,
+                name=normalized_name,
+                quantity=payload.quantity,
+                completed=False,
+            )
+            if item_id:
+                # Client-generated id (offline sync), so later operations can refer to the row.
+                item.id = item_id
+            try:
+                with db.begin_nested():
+                    self.repository.add_items(db, [item])
+            except IntegrityError:
+                # Another request opened the same name first; merge into its row instead.
+                item = self.repository.merge_quantity(db, normalized_name, self.settings.household_id, payload.quantity)
+                if item is None:
+                    raise HTTPException(
+                        status_code=status.HTTP_409_CONFLICT,
+                        detail="A shopping list item with this id already exists.",
+                    )
+        return item
 
     def update_item(self, db: Session, item_id: str, payload: ShoppingListItemUpdate) -> ShoppingListItem:
-        item = self._get_or_404(db, item_id)
+        if not payload.model_dump(exclude_unset=True):
+            return self._get_or_404(db, item_id)
+        item = self.apply_update(db, item_id, payload)
+        self._touch(db, changed=[item])
+        db.commit()
+        return item
+
+    def apply_update(self, db: Session, item_id: str, payload: ShoppingListItemUpdate) -> ShoppingListItem:
         data = payload.model_dump(exclude_unset=True)
         if "name" in data and data["name"] is not None:
             data["name"] = self._normalize_name(data["name"])
-        for key, value in data.items():
-            setattr(item, key, value)
-        return self.repository.update_item(db, item)
+        if not data:
+            return self._get_or_404(db, item_id)
+        try:
+            with db.begin_nested():
+                item = self.repository.update_fields(db, item_id, self.settings.household_id, data)
+        except IntegrityError:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="An open shopping list item with this name already exists.",
+            )
+        if item is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Shopping list item not found.")
+        return item
+
+    def apply_delta(self, db: Session, item_id: str, delta: int) -> ShoppingListItem:
+        item = self.repository.adjust_quantity(db, item_id, self.settings.household_id, delta)
+        if item is None:
+            self._get_or_404(db, item_id)
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Quantity must stay at least 1.")
+        return item
 
     def delete_item(self, db: Session, item_id: str) -> None:
-        item = self._get_or_404(db, item_id)
-        self.repository.delete_item(db, item)
+        self.apply_delete(db, item_id)
+        self._touch(db, deleted=[item_id])
+        db.commit()
+
+    def apply_delete(self, db: Session, item_id: str) -> None:
+        if not self.repository.delete_by_id(db, item_id, self.settings.household_id):
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Shopping list item not found.")
 
     def import_from_alexa(self, db: Session, utterance: str) -> AlexaImportResult:
         parsed = self._parse_alexa_utterance(utterance)
-        created_items: list[ShoppingListItemRead] = []
+        if not parsed:
+            return AlexaImportResult(created_items=[], parsed_names=[])
+
+        # Repeated names in one utterance collapse into a single row, like successive creates would.
+        quantities: dict[str, int] = {}
+        names: dict[str, str] = {}
         for name, quantity in parsed:
-            item = self.create_item(db, ShoppingListItemCreate(name=name, quantity=quantity))
-            created_items.append(ShoppingListItemRead.model_validate(item))
+            key = name_key(name)
+            quantities[key] = quantities.get(key, 0) + quantity
+            names.setdefault(key, name)
 
-        return AlexaImportResult(
-            created_items=created_items,
+        household_id = self.settings.household_id
+        try:
+            with db.begin_nested():
+                items = self._add_quantities(db, household_id, quantities, names)
+        except IntegrityError:
+            # A concurrent request opened one of the names first; the rerun merges into its row.
+            with db.begin_nested():
+                items = self._add_quantities(db, household_id, quantities, names)
+
+        self._touch(db, changed=items.values())
+        result = AlexaImportResult(
+            created_items=[ShoppingListItemRead.model_validate(items[name_key(name)]) for name, _ in parsed],
             parsed_names=[name for name, _ in parsed],
         )
+        db.commit()
+        return result
+
+    def _add_quantities(
+        self,
+        db: Session,
+        household_id: str,
+        quantities: dict[str, int],
+        names: dict[str, str],
+    ) -> dict[str, ShoppingListItem]:
+        # Row id -> name key of the open row each name merges into.
+        targets: dict[str, str] = {}
+        for item in self.repository.find_open_by_names(db, household_id, quantities.keys()):
+            key = item.normalized_name or name_key(item.name)
+            if key not in targets.values():
+                targets[item.id] = key
+
+        # Atomic increments; the quantities reported and logged are the ones the database returns.
+        items: dict[str, ShoppingListItem] = {}
+        increments = {item_id: quantities[key] for item_id, key in targets.items()}
+        for item in self.repository.increment_quantities(db, household_id, increments):
+            items[targets[item.id]] = item
+
+        created = [
+            ShoppingListItem(household_id=household_id, name=names[key], quantity=quantities[key], completed=False)
+            for key in quantities
+            if key not in items
+        ]
+        self.repository.add_items(db, created)
+        items.update((item.normalized_name, item) for item in created)
+        return items
+
+    def restock(self, db: Session) -> RestockResult:
+        household_id = self.settings.household_id
+        try:
+            with db.begin_nested():
+                updated, created = self.repository.restock_from_inventory(db, household_id, datetime.utcnow())
+        except IntegrityError:
+            # A concurrent create opened one of the names between the two statements; the rerun
+            # raises that entry instead of inserting a second one.
+            with db.begin_nested():
+                updated, created = self.repository.restock_from_inventory(db, household_id, datetime.utcnow())
+
+        items = self.repository.list_open_for_low_stock(db, household_id)
+        if updated or created:
+            self._touch(db, changed=[item for item in items if item.id in updated or item.id in created])
+        result = RestockResult(
+            items=[ShoppingListItemRead.model_validate(item) for item in items],
+            created=len(created),
+            updated=len(updated),
+        )
+        db.commit()
+        return result
+
+    def _touch(self, db: Session, changed: Iterable[ShoppingListItem] = (), deleted: Iterable[str] = ()) -> None:
+        self.versions.bump(db, self.settings.household_id, VERSION_SCOPE)
+        upserts = {item.id: ShoppingListItemRead.model_validate(item).model_dump(mode="json") for item in changed}
+        self.changes.record(db, VERSION_SCOPE, list(upserts.items()), list(deleted))
 
     def _get_or_404(self, db: Session, item_id: str) -> ShoppingListItem:
         item = self.repository.get_item(db, item_id, self.settings.household_id)
@@ -72,24 +255,14 @@ class ShoppingListService:
         if not cleaned:
             return []
 
-        normalized = re.sub(r"\b(und|sowie|plus|mit)\b", ",", cleaned)
-        normalized = normalized.replace(";", ",")
-        parts = [part.strip() for part in normalized.split(",") if part.strip()]
-
         parsed: list[tuple[str, int]] = []
-        quantity_pattern = re.compile(r"^(\d+)\s*(x|mal|stk|stück|packung|packungen)?\s+(.+)$", re.IGNORECASE)
-        drop_prefix_pattern = re.compile(r"^(bitte|füge|setz|setze|auf|meine|meiner|liste|einkaufsliste)\s+", re.IGNORECASE)
-
-        for part in parts:
-            candidate = part
-            while True:
-                updated = drop_prefix_pattern.sub("", candidate).strip()
-                if updated == candidate:
-                    break
-                candidate = updated
+        for part in ALEXA_SEPARATOR_PATTERN.split(cleaned):
+            candidate = ALEXA_PREFIX_PATTERN.sub("", part.strip()).strip()
+            if not candidate:
+                continue
 
             quantity = 1
-            match = quantity_pattern.match(candidate)
+            match = ALEXA_QUANTITY_PATTERN.match(candidate)
             if match:
                 quantity = max(1, int(match.group(1)))
                 candidate = match.group(3).strip()
@@ -98,6 +271,6 @@ class ShoppingListService:
             if not candidate:
                 continue
 
-            parsed.append((self._normalize_name(candidate), quantity))
+            parsed.append((self._normalize_name(candidate)[:200], quantity))
 
         return parsed
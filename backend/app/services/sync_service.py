@@ -0,0 +1,196 @@
+import threading
+from datetime import datetime, timedelta
+from typing import NamedTuple
+
+from fastapi import HTTPException, status
+from pydantic import BaseModel, ValidationError
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.models.inventory_item import InventoryItem
+from app.models.shopping_list_item import ShoppingListItem
+from app.repositories.household_version_repository import HouseholdVersionRepository
+from app.repositories.sync_repository import SyncRepository
+from app.schemas.inventory_item import InventoryItemCreate, InventoryItemRead, InventoryItemUpdate
+from app.schemas.shopping_list_item import ShoppingListItemCreate, ShoppingListItemRead, ShoppingListItemUpdate
+from app.schemas.sync import SyncOperation, SyncOperationResult, SyncResult
+from app.services.change_service import ChangeService
+from app.services.inventory_service import VERSION_SCOPE as INVENTORY_SCOPE, InventoryService
+from app.services.shopping_list_service import VERSION_SCOPE as SHOPPING_LIST_SCOPE, ShoppingListService
+
+
+# Prune expired dedup rows every N synced batches instead of on every batch.
+_PRUNE_INTERVAL = 64
+
+
+class SyncEntity(NamedTuple):
+    model: type
+    create: type[BaseModel]
+    update: type[BaseModel]
+    read: type[BaseModel]
+
+
+ENTITIES = {
+    INVENTORY_SCOPE: SyncEntity(InventoryItem, InventoryItemCreate, InventoryItemUpdate, InventoryItemRead),
+    SHOPPING_LIST_SCOPE: SyncEntity(ShoppingListItem, ShoppingListItemCreate, ShoppingListItemUpdate, ShoppingListItemRead),
+}
+
+
+class SyncService:
+    def __init__(
+        self,
+        repository: SyncRepository | None = None,
+        inventory: InventoryService | None = None,
+        shopping_list: ShoppingListService | None = None,
+        versions: HouseholdVersionRepository | None = None,
+        changes: ChangeService | None = None,
+    ) -> None:
+        self.repository = repository or SyncRepository()
+        self.services = {
+            INVENTORY_SCOPE: inventory or InventoryService(),
+            SHOPPING_LIST_SCOPE: shopping_list or ShoppingListService(),
+        }
+        self.versions = versions or HouseholdVersionRepository()
+        self.changes = changes or ChangeService()
+        self.settings = get_settings()
+        self._batches_since_prune = 0
+        self._lock = threading.Lock()
+
+    def apply(self, db: Session, operations: list[SyncOperation]) -> SyncResult:
+        # The batch is one transaction. Each operation runs in its own savepoint, so a rejected
+        # one (missing row, name clash, invalid data) is reported without undoing the others.
+        household_id = self.settings.household_id
+        # op id -> (row id, error) of operations applied or rejected earlier, or earlier in this batch.
+        seen = {
+            op_id: (entry.entity_id, entry.error)
+            for op_id, entry in self.repository.find_seen(db, household_id, {operation.op_id for operation in operations}).items()
+        }
+        # Rows to report (replayed operations included, so a retried batch still gets the state)
+        # and the subset this batch actually wrote.
+        touched: dict[str, dict[str, None]] = {scope: {} for scope in ENTITIES}
+        deleted: dict[str, dict[str, None]] = {scope: {} for scope in ENTITIES}
+        written: dict[str, set[str]] = {scope: set() for scope in ENTITIES}
+        # Client ids of creates that merged into an existing row -> that row's id.
+        aliases: dict[str, str] = {}
+        results: list[SyncOperationResult] = []
+        entries: list[dict] = []
+
+        for operation in operations:
+            if operation.op_id in seen:
+                previous_id, previous_error = seen[operation.op_id]
+                if operation.action == "create" and operation.id and previous_id:
+                    aliases[operation.id] = previous_id
+                results.append(
+                    SyncOperationResult(op_id=operation.op_id, status="duplicate", id=previous_id, error=previous_error)
+                )
+                if previous_id and previous_error is None:
+                    self._mark(touched, deleted, operation, previous_id)
+                continue
+
+            entity_id = None
+            error = None
+            try:
+                with db.begin_nested():
+                    entity_id = self._apply_one(db, operation, aliases)
+            except HTTPException as exc:
+                error = str(exc.detail)
+            except ValidationError as exc:
+                first = exc.errors()[0]
+                error = f"{'.'.join(str(part) for part in first['loc'])}: {first['msg']}"
+            except IntegrityError:
+                error = "Conflicts with an existing item."
+
+            if error is None:
+                self._mark(touched, deleted, operation, entity_id)
+                written[operation.entity].add(entity_id)
+            else:
+                entity_id = aliases.get(operation.id, operation.id) if operation.id else None
+            result = SyncOperationResult(
+                op_id=operation.op_id,
+                status="rejected" if error else "applied",
+                id=entity_id,
+                error=error[:200] if error else None,
+            )
+            results.append(result)
+            seen[operation.op_id] = (result.id, result.error)
+            entries.append({
+                "household_id": household_id,
+                "op_id": operation.op_id,
+                "entity": operation.entity,
+                "entity_id": entity_id,
+                "status": result.status,
+                "error": result.error,
+                "created_at": datetime.utcnow(),
+            })
+
+        # Serialize the final state of every touched row before the commit expires the instances.
+        states = {}
+        for scope, spec in ENTITIES.items():
+            rows = self.repository.get_rows(db, spec.model, household_id, touched[scope])
+            states[scope] = [spec.read.model_validate(row) for row in rows]
+            if written[scope]:
+                self.versions.bump(db, household_id, scope)
+                upserts = [(item.id, item.model_dump(mode="json")) for item in states[scope] if item.id in written[scope]]
+                self.changes.record(db, scope, upserts, [item_id for item_id in deleted[scope] if item_id in written[scope]])
+
+        try:
+            with db.begin_nested():
+                self.repository.record(db, entries)
+        except IntegrityError:
+            # A concurrent request with the same op ids got there first; a retry sees its result.
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="These operations are being synced by another request; retry.",
+            )
+        if self._should_prune():
+            self.repository.prune(db, datetime.utcnow() - timedelta(days=self.settings.sync_op_retention_days))
+        db.commit()
+        return SyncResult(
+            results=results,
+            inventory=states[INVENTORY_SCOPE],
+            shopping_list=states[SHOPPING_LIST_SCOPE],
+            deleted_inventory=list(deleted[INVENTORY_SCOPE]),
+            deleted_shopping_list=list(deleted[SHOPPING_LIST_SCOPE]),
+        )
+
+    def _apply_one(self, db: Session, operation: SyncOperation, aliases: dict[str, str]) -> str:
+        spec = ENTITIES[operation.entity]
+        service = self.services[operation.entity]
+        item_id = aliases.get(operation.id, operation.id) if operation.id else None
+
+        if operation.action == "create":
+            payload = spec.create.model_validate(operation.data or {})
+            if item_id and self.repository.get_rows(db, spec.model, self.settings.household_id, [item_id]):
+                raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="An item with this id already exists.")
+            item = service.apply_create(db, payload, item_id=item_id)
+            if operation.id and item.id != operation.id:
+                aliases[operation.id] = item.id
+            return item.id
+
+        if item_id is None:
+            raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=f"{operation.action} needs an id.")
+        if operation.action == "update":
+            return service.apply_update(db, item_id, spec.update.model_validate(operation.data or {})).id
+        if operation.action == "delta":
+            if not operation.delta:
+                raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="delta needs a non-zero delta.")
+            return service.apply_delta(db, item_id, operation.delta).id
+        service.apply_delete(db, item_id)
+        return item_id
+
+    def _mark(self, touched: dict, deleted: dict, operation: SyncOperation, entity_id: str) -> None:
+        if operation.action == "delete":
+            touched[operation.entity].pop(entity_id, None)
+            deleted[operation.entity][entity_id] = None
+        else:
+            deleted[operation.entity].pop(entity_id, None)
+            touched[operation.entity][entity_id] = None
+
+    def _should_prune(self) -> bool:
+        with self._lock:
+            self._batches_since_prune += 1
+            if self._batches_since_prune < _PRUNE_INTERVAL:
+                return False
+            self._batches_since_prune = 0
+            return True
@@ -0,0 +1,79 @@
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent))
+
+
+def load_corpus() -> list[str]:
+    lines = (BENCH_DIR / "alexa_utterances.txt").read_text(encoding="utf-8").splitlines()
+    return [line for line in lines if line.strip() and not line.startswith("#")]
+
+
+def bench_parser(corpus: list[str], rounds: int) -> dict:
+    from app.services.shopping_list_service import ShoppingListService
+
+    service = ShoppingListService()
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for utterance in corpus:
+            service._parse_alexa_utterance(utterance)
+    elapsed = time.perf_counter() - started
+    calls = rounds * len(corpus)
+    return {"utterances": calls, "seconds": round(elapsed, 4), "utterances_per_second": round(calls / elapsed)}
+
+
+def bench_import(corpus: list[str], rounds: int) -> dict:
+    from fastapi.testclient import TestClient
+
+    import main
+    from app.core.database import engine
+    from app.core.migrations import migrate
+
+    migrate(engine)
+
+    latencies = []
+    with TestClient(main.app) as client:
+        for _ in range(rounds):
+            for utterance in corpus:
+                started = time.perf_counter()
+                response = client.post("/shopping-list/alexa-import", json={"utterance": utterance})
+                latencies.append(time.perf_counter() - started)
+                response.raise_for_status()
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "p50_ms": round(statistics.median(latencies) * 1000, 3),
+        "p99_ms": round(latencies[int(len(latencies) * 0.99) - 1] * 1000, 3),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 3),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Alexa parser throughput and import latency.")
+    parser.add_argument("--parser-rounds", type=int, default=200)
+    parser.add_argument("--import-rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    corpus = load_corpus()
+    with tempfile.TemporaryDirectory() as tmp:
+        # Settings are read at import time, so point the app at a scratch database first.
+        os.environ["DATABASE_URL"] = f"sqlite:///{tmp}/bench.db"
+        results = {
+            "corpus_size": len(corpus),
+            "parser": bench_parser(corpus, args.parser_rounds),
+            "import": bench_import(corpus, args.import_rounds),
+        }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,352 @@
+import argparse
+import asyncio
+import gc
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent))
+
+DEFAULT_BASELINE = BENCH_DIR / "baseline.json"
+
+WORDS = [
+    "Milch", "Butter", "Eier", "Mehl", "Zucker", "Salz", "Reis", "Nudeln", "Tomaten", "Kaffee",
+    "Tee", "Joghurt", "Käse", "Brot", "Äpfel", "Bananen", "Karotten", "Zwiebeln", "Knoblauch", "Öl",
+    "Essig", "Honig", "Marmelade", "Haferflocken", "Linsen", "Bohnen", "Quark", "Sahne", "Senf", "Ketchup",
+]
+VARIANTS = ["bio", "vollkorn", "light", "groß", "klein", "regional", "tiefkühl", "frisch"]
+
+# Raw scanner input for the barcode normalizer: plain EAN/UPC, padded, spaced and GS1 element strings.
+BARCODE_SAMPLES = [
+    "4006381333931",
+    " 4006381333931 ",
+    "036000291452",
+    "0036000291452",
+    "96385074",
+    "4006-3813-3393-1",
+    "]C1010400638133393121ABC123",
+    "(01)04006381333931(10)LOT42",
+    "01040063813339311725123110LOT42",
+    "abc",
+]
+
+
+def ean13(rng: random.Random) -> str:
+    digits = [rng.randrange(10) for _ in range(12)]
+    total = sum(digit * (3 if index % 2 else 1) for index, digit in enumerate(digits))
+    return "".join(map(str, digits)) + str((10 - total % 10) % 10)
+
+
+def load_corpus() -> list[str]:
+    lines = (BENCH_DIR / "alexa_utterances.txt").read_text(encoding="utf-8").splitlines()
+    return [line for line in lines if line.strip() and not line.startswith("#")]
+
+
+def summarize(latencies: list[float], wall: float, errors: int = 0) -> dict:
+    latencies = sorted(latencies) or [0.0]
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "p50_ms": round(statistics.median(latencies) * 1000, 3),
+        "p99_ms": round(latencies[max(0, int(len(latencies) * 0.99) - 1)] * 1000, 3),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 3),
+        "throughput_rps": round(len(latencies) / wall, 1),
+    }
+
+
+def seed(engine, household_id: str, items: int, households: int, rng: random.Random) -> dict:
+    from sqlalchemy import insert
+
+    from app.models.inventory_item import InventoryItem
+    from app.models.shopping_list_item import ShoppingListItem
+    from app.names import name_key
+
+    others = [f"bench-household-{index:04d}" for index in range(households - 1)]
+    owners = [household_id] + others
+    started = datetime.utcnow() - timedelta(days=365)
+
+    inventory = []
+    names_by_household: dict[str, set[str]] = {}
+    for index in range(items):
+        owner = owners[index % len(owners)]
+        name = f"{rng.choice(WORDS)} {rng.choice(VARIANTS)} {index}"
+        names_by_household.setdefault(owner, set()).add(name)
+        min_quantity = rng.choice([0, 0, 0, 1, 2, 5])
+        inventory.append({
+            "id": f"{index:08d}-0000-4000-8000-{rng.getrandbits(48):012x}",
+            "household_id": owner,
+            "name": name,
+            "normalized_name": name_key(name),
+            "barcode": ean13(rng) if rng.random() < 0.7 else None,
+            "quantity": rng.randrange(0, 12),
+            "min_quantity": min_quantity,
+            "category": rng.choice([None, "Kühlschrank", "Vorrat", "Tiefkühler", "Getränke"]),
+            "created_at": started + timedelta(seconds=index * 30),
+        })
+
+    shopping = []
+    for index in range(max(1, items // 10)):
+        owner = owners[index % len(owners)]
+        name = f"{rng.choice(WORDS)} {index}"
+        shopping.append({
+            "id": f"{index:08d}-1111-4000-8000-{rng.getrandbits(48):012x}",
+            "household_id": owner,
+            "name": name,
+            "normalized_name": name_key(name),
+            "quantity": rng.randrange(1, 4),
+            "completed": rng.random() < 0.3,
+            "created_at": started + timedelta(seconds=index * 60),
+        })
+
+    with engine.begin() as connection:
+        connection.execute(insert(InventoryItem.__table__), inventory)
+        connection.execute(insert(ShoppingListItem.__table__), shopping)
+
+    own = [row for row in inventory if row["household_id"] == household_id]
+    return {
+        "ids": [row["id"] for row in own],
+        "names": [row["name"] for row in own],
+        "barcodes": [row["barcode"] for row in own if row["barcode"]],
+        "household_items": len(own),
+    }
+
+
+async def measure(client, specs: list[tuple], concurrency: int, warmup: int, before=None) -> dict:
+    async def send(spec) -> float | None:
+        method, url, body = spec
+        if before is not None:
+            before()
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, url, json=body)
+        except Exception:
+            return None
+        elapsed = time.perf_counter() - started
+        return elapsed if response.status_code < 400 else None
+
+    for spec in specs[:warmup]:
+        await send(spec)
+
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    latencies: list[float] = []
+    errors = 0
+
+    async def bounded(spec) -> None:
+        nonlocal errors
+        async with semaphore:
+            elapsed = await send(spec)
+        if elapsed is None:
+            errors += 1
+        else:
+            latencies.append(elapsed)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(bounded(spec) for spec in specs[warmup:]))
+    return summarize(latencies, time.perf_counter() - started, errors)
+
+
+async def bench_api(args, rng: random.Random) -> tuple[dict, dict]:
+    import httpx
+
+    from app.core.config import get_settings
+    from app.core.database import engine
+    from app.core.migrations import migrate
+    from app.list_cache import list_cache
+    from app.main import app
+    from app.openfoodfacts_stub import app as stub_app
+    from app.product_lookup import openfoodfacts
+
+    migrate(engine)
+    seeded = seed(engine, get_settings().household_id, args.items, args.households, rng)
+    # Lookups that miss the local catalog and cache go to the in-process stub, never the internet.
+    openfoodfacts.transport = httpx.ASGITransport(app=stub_app)
+    await openfoodfacts.aclose()
+
+    n = args.requests
+    corpus = load_corpus()
+    new_names = [f"{rng.choice(WORDS)} neu {index}" for index in range(n)]
+    creates = []
+    for index in range(n):
+        roll = rng.random()
+        if roll < 0.5:
+            payload = {"name": rng.choice(seeded["names"]).upper(), "quantity": 1}
+        elif roll < 0.75 and seeded["barcodes"]:
+            payload = {"name": "Scan", "barcode": rng.choice(seeded["barcodes"]), "quantity": 1}
+        else:
+            payload = {"name": new_names[index], "quantity": 1}
+        creates.append(("POST", "/items", payload))
+    lookup_codes = [ean13(rng) for _ in range(n)]
+
+    scenarios: dict[str, dict] = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        warmup = min(10, n // 10)
+        run = lambda specs, **kwargs: measure(client, specs, args.concurrency, warmup, **kwargs)
+        scenarios["list_items"] = await run([("GET", "/items", None)] * n, before=list_cache.clear_memory)
+        scenarios["list_items_cached"] = await run([("GET", "/items", None)] * n)
+        scenarios["list_items_page"] = await run([("GET", "/items?limit=100", None)] * n, before=list_cache.clear_memory)
+        scenarios["list_shopping"] = await run([("GET", "/shopping-list", None)] * n, before=list_cache.clear_memory)
+        scenarios["create_dedup"] = await run(creates)
+        scenarios["increment"] = await run([("POST", f"/items/{rng.choice(seeded['ids'])}/increment", None) for _ in range(n)])
+        scenarios["alexa_import"] = await run([("POST", "/shopping-list/alexa-import", {"utterance": corpus[index % len(corpus)]}) for index in range(n)])
+        scenarios["lookup_upstream"] = await run([("GET", f"/products/lookup/{code}", None) for code in lookup_codes])
+        scenarios["lookup_cached"] = await run([("GET", f"/products/lookup/{code}", None) for code in lookup_codes])
+    await openfoodfacts.aclose()
+
+    meta = {"items": args.items, "households": args.households, "household_items": seeded["household_items"]}
+    return scenarios, meta
+
+
+def bench_micro(rounds: int) -> dict:
+    from app.services.inventory_service import InventoryService
+    from app.services.shopping_list_service import ShoppingListService
+
+    inventory = InventoryService()
+    shopping = ShoppingListService()
+    corpus = load_corpus()
+
+    def timed(fn, inputs: list, repeat: int = 5) -> dict:
+        for value in inputs:
+            fn(value)
+        # Best of several runs, as timeit does: the minimum is the least disturbed by other load.
+        best = float("inf")
+        gc.disable()
+        try:
+            for _ in range(repeat):
+                started = time.perf_counter()
+                for _ in range(rounds):
+                    for value in inputs:
+                        fn(value)
+                best = min(best, time.perf_counter() - started)
+        finally:
+            gc.enable()
+        calls = rounds * len(inputs)
+        return {"calls": calls, "ns_per_op": round(best / calls * 1e9, 1), "ops_per_second": round(calls / best)}
+
+    return {
+        "normalize_barcode": timed(inventory._normalize_barcode, BARCODE_SAMPLES),
+        "parse_alexa_utterance": timed(shopping._parse_alexa_utterance, corpus),
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float, tail_tolerance: float) -> list[str]:
+    checks = {"scenarios": {"p50_ms": tolerance, "p99_ms": tail_tolerance}, "micro": {"ns_per_op": tolerance}}
+    regressions = []
+    for name, current in results.get("scenarios", {}).items():
+        reference = baseline.get("scenarios", {}).get(name, {})
+        if current.get("errors", 0) > reference.get("errors", 0):
+            regressions.append(f"scenarios.{name}.errors: {reference.get('errors', 0)} -> {current['errors']}")
+    for section, metrics in checks.items():
+        for name, current in results.get(section, {}).items():
+            reference = baseline.get(section, {}).get(name)
+            if not reference:
+                continue
+            for metric, allowed in metrics.items():
+                before, after = reference.get(metric), current.get(metric)
+                if before and after is not None and after > before * (1 + allowed):
+                    regressions.append(f"{section}.{name}.{metric}: {before} -> {after} (+{(after / before - 1) * 100:.0f}%)")
+    return regressions
+
+
+def run_once(args) -> dict:
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        # Settings are read at import time, so point the app at a scratch database first.
+        os.environ["DATABASE_URL"] = f"sqlite:///{tmp}/bench.db"
+        os.environ["SQLITE_PROFILE"] = args.sqlite_profile
+        # Micro-benchmarks first, before the API run leaves a large heap behind.
+        micro = bench_micro(args.micro_rounds)
+        scenarios, meta = asyncio.run(bench_api(args, rng))
+    return {
+        "meta": {
+            **meta,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "sqlite_profile": args.sqlite_profile,
+            "seed": args.seed,
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "machine": platform.machine(),
+        },
+        "scenarios": scenarios,
+        "micro": micro,
+    }
+
+
+def run_subprocess(args) -> dict:
+    command = [
+        sys.executable, __file__,
+        "--items", str(args.items),
+        "--households", str(args.households),
+        "--requests", str(args.requests),
+        "--concurrency", str(args.concurrency),
+        "--micro-rounds", str(args.micro_rounds),
+        "--seed", str(args.seed),
+        "--sqlite-profile", args.sqlite_profile,
+        "--baseline", os.devnull,
+    ]
+    completed = subprocess.run(command, check=True, capture_output=True, text=True)
+    return json.loads(completed.stdout)
+
+
+def merge_runs(runs: list[dict]) -> dict:
+    merged = {"meta": {**runs[0]["meta"], "runs": len(runs)}}
+    for section in ("scenarios", "micro"):
+        merged[section] = {
+            name: {metric: statistics.median(run[section][name][metric] for run in runs) for metric in values}
+            for name, values in runs[0][section].items()
+        }
+    return merged
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="API latency and service micro-benchmarks against a seeded scratch database.")
+    parser.add_argument("--items", type=int, default=10000, help="inventory rows to seed across all households")
+    parser.add_argument("--households", type=int, default=20)
+    parser.add_argument("--requests", type=int, default=300, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--micro-rounds", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--sqlite-profile", default="performance", help="SQLITE_PROFILE for the scratch database")
+    parser.add_argument("--runs", type=int, default=1, help="repeat in fresh processes and keep the median of each metric")
+    parser.add_argument("--output", help="write the JSON results here as well as to stdout")
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE))
+    parser.add_argument("--update-baseline", action="store_true", help="store these results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="allowed p50 / ns_per_op slowdown")
+    parser.add_argument("--tail-tolerance", type=float, default=2.0, help="allowed p99 slowdown")
+    args = parser.parse_args()
+
+    if args.runs > 1:
+        results = merge_runs([run_subprocess(args) for _ in range(args.runs)])
+    else:
+        results = run_once(args)
+
+    baseline_path = Path(args.baseline)
+    if args.update_baseline:
+        baseline_path.write_text(json.dumps(results, indent=2) + "\n", encoding="utf-8")
+    elif baseline_path.is_file():
+        baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+        results["regressions"] = compare(results, baseline, args.tolerance, args.tail_tolerance)
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        Path(args.output).write_text(output + "\n", encoding="utf-8")
+    print(output)
+    if results.get("regressions"):
+        print("\n".join(["Regressions against the baseline:", *results["regressions"]]), file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+import argparse
+import asyncio
+import importlib
+import json
+import os
+import platform
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+
+BENCH_DIR = Path(__file__).resolve().parent
+BACKEND_DIR = BENCH_DIR.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+DEFAULT_BASELINE = BENCH_DIR / "cold_start_baseline.json"
+METRICS = ("process_ms", "import_ms", "startup_ms", "first_request_ms", "first_db_request_ms")
+# Only needed by a few endpoints; loading them at import time is a cold-start regression.
+LAZY_MODULES = ("httpx", "PIL")
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+async def lifespan_startup(app) -> None:
+    messages = [{"type": "lifespan.startup"}]
+    started = asyncio.get_running_loop().create_future()
+
+    async def receive():
+        if messages:
+            return messages.pop()
+        await asyncio.Event().wait()
+
+    async def send(message):
+        if message["type"] == "lifespan.startup.failed":
+            started.set_exception(RuntimeError(message.get("message", "startup failed")))
+        elif message["type"] == "lifespan.startup.complete":
+            started.set_result(None)
+
+    task = asyncio.ensure_future(app({"type": "lifespan", "asgi": {"version": "3.0"}}, receive, send))
+    await started
+    task.cancel()
+
+
+async def request(app, path: str) -> int:
+    # A bare ASGI call, so the measurement doesn't pull in an HTTP client library.
+    status = [0]
+    body_sent = [False]
+
+    async def receive():
+        if not body_sent[0]:
+            body_sent[0] = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await asyncio.Event().wait()
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            status[0] = message["status"]
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 0),
+        "server": ("bench", 80),
+    }
+    await app(scope, receive, send)
+    return status[0]
+
+
+def child(entry: str) -> dict:
+    # Runs in a fresh interpreter: import the app, start it and serve its first requests.
+    module_name, _, attribute = entry.partition(":")
+    started = time.perf_counter()
+    app = getattr(importlib.import_module(module_name), attribute or "app")
+    imported = time.perf_counter()
+
+    async def serve() -> dict:
+        await lifespan_startup(app)
+        ready = time.perf_counter()
+        health = await request(app, "/health")
+        first = time.perf_counter()
+        items = await request(app, "/items")
+        first_db = time.perf_counter()
+        return {
+            "import_ms": round((imported - started) * 1000, 1),
+            "startup_ms": round((ready - imported) * 1000, 1),
+            "first_request_ms": round((first - ready) * 1000, 1),
+            "first_db_request_ms": round((first_db - first) * 1000, 1),
+            "statuses": [health, items],
+        }
+
+    result = asyncio.run(serve())
+    result["lazy_modules_loaded"] = sorted(name for name in LAZY_MODULES if name in sys.modules)
+    return result
+
+
+def run_child(entry: str, env: dict) -> dict:
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, __file__, "--child", "--entry", entry],
+        check=True,
+        capture_output=True,
+        text=True,
+        cwd=BACKEND_DIR,
+        env=env,
+    )
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    # Interpreter start to exit, as a process manager sees it.
+    result["process_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return result
+
+
+def slowest_imports(entry: str, env: dict, top: int) -> list[dict]:
+    module_name = entry.partition(":")[0]
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module_name}"],
+        check=True,
+        capture_output=True,
+        text=True,
+        cwd=BACKEND_DIR,
+        env=env,
+    )
+    rows = []
+    for line in completed.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            own, cumulative, indent, name = match.groups()
+            rows.append({"module": name, "cumulative_ms": int(cumulative) / 1000, "self_ms": int(own) / 1000, "depth": len(indent) // 2})
+    return sorted(rows, key=lambda row: -row["self_ms"])[:top]
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    regressions = []
+    for metric in METRICS:
+        before, after = baseline.get("timings", {}).get(metric), results["timings"].get(metric)
+        if before and after is not None and after > before * (1 + tolerance):
+            regressions.append(f"timings.{metric}: {before} -> {after} (+{(after / before - 1) * 100:.0f}%)")
+    for name in results["lazy_modules_loaded"]:
+        if name not in baseline.get("lazy_modules_loaded", []):
+            regressions.append(f"lazy_modules_loaded: {name} is now imported at startup")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Cold start: import, startup and first-request latency of the API in fresh processes.")
+    parser.add_argument("--entry", default="app.main:app", help="ASGI app to start, module:attribute")
+    parser.add_argument("--runs", type=int, default=7, help="fresh processes to start; the median of each metric is kept")
+    parser.add_argument("--top", type=int, default=15, help="slowest imports to list")
+    parser.add_argument("--output", help="write the JSON results here as well as to stdout")
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE))
+    parser.add_argument("--update-baseline", action="store_true", help="store these results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.3, help="allowed slowdown per metric")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(child(args.entry)))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {**os.environ, "DATABASE_URL": f"sqlite:///{tmp}/cold.db", "PYTHONPATH": str(BACKEND_DIR)}
+        env.pop("PYTHONDONTWRITEBYTECODE", None)
+        subprocess.run([sys.executable, "-m", "app.cli", "migrate"], check=True, capture_output=True, cwd=BACKEND_DIR, env=env)
+        # One throwaway start so bytecode caches exist, as they do in a built image.
+        run_child(args.entry, env)
+        runs = [run_child(args.entry, env) for _ in range(args.runs)]
+        imports = slowest_imports(args.entry, env, args.top)
+
+    results = {
+        "meta": {
+            "entry": args.entry,
+            "runs": args.runs,
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+        },
+        "timings": {metric: statistics.median(run[metric] for run in runs) for metric in METRICS},
+        "statuses": runs[0]["statuses"],
+        "lazy_modules_loaded": runs[0]["lazy_modules_loaded"],
+        "slowest_imports": imports,
+    }
+
+    baseline_path = Path(args.baseline)
+    if args.update_baseline:
+        baseline_path.write_text(json.dumps({key: results[key] for key in ("meta", "timings", "lazy_modules_loaded")}, indent=2) + "\n", encoding="utf-8")
+    elif baseline_path.is_file():
+        baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+        results["regressions"] = compare(results, baseline, args.tolerance)
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        Path(args.output).write_text(output + "\n", encoding="utf-8")
+    print(output)
+    if results.get("regressions"):
+        print("\n".join(["Regressions against the baseline:", *results["regressions"]]), file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
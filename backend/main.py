@@ -1,20 +1,7 @@
 from app.main import app
-import requests
-
-__all__ = ["app"]
+from app.routers.debug import router as debug_router
 
+# Development entry point: the API plus debug routes. Deployments run the lean `app.main:app`.
+app.include_router(debug_router)
 
-@app.get("/debug/off")
-def debug_openfoodfacts():
-    try:
-        r = requests.get(
-            "https://world.openfoodfacts.org/api/v0/product/5449000000996.json",
-            timeout=5,
-        )
-        return {
-            "status_code": r.status_code,
-            "ok": r.ok,
-            "json": r.json().get("product", {}).get("product_name")
-        }
-    except Exception as e:
-        return {"error": str(e)}
+__all__ = ["app"]